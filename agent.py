@@ -1,8 +1,7 @@
-import os
 from deepagents import create_deep_agent
 from deepagents.backends import StateBackend
-from langchain_openai import ChatOpenAI
 
+from llm_registry import get_chat_model
 from prompts import SYSTEM_PROMPT
 from tools import reset_tool_counters, tools
 
@@ -14,6 +13,7 @@ from sub_agents import (
     topics_manager_subgraph_tool,  # Sub-graph
     personality_manager_subgraph_tool,  # Sub-graph
     writer_subgraph_tool,  # Sub-graph
+    evolve_identity,  # Parallel fan-out over the manager sub-graphs
 )
 
 
@@ -25,10 +25,7 @@ def build_agent():
     nodes where they're actually needed for craft guidance.
     """
     # Configure the OpenAI model
-    llm = ChatOpenAI(
-        model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-        temperature=0.2,
-    )
+    llm = get_chat_model(temperature=0.2)
     
     # Configure backend to allow file access in agent state
     def make_backend(runtime):
@@ -44,6 +41,7 @@ def build_agent():
         topics_manager_subgraph_tool,        # Sub-graph
         personality_manager_subgraph_tool,   # Sub-graph
         writer_subgraph_tool,                # Sub-graph (with skills internally)
+        evolve_identity,                     # Runs the 3 managers concurrently
     ]
     
     return create_deep_agent(
@@ -0,0 +1,142 @@
+"""Batch Story Generation - Many stories per process with bounded concurrency
+
+The graph (deep agent or pipeline) is compiled once and shared by an
+asyncio worker pool; each story gets its own thread_id, token counter and
+run budget. Identity evolution and memory writes are serialized inside the
+sub-agents, so concurrent stories never interleave their file updates.
+
+Usage:
+    python main.py batch --count 10 --concurrency 3 [--pipeline]
+"""
+import asyncio
+import json
+import math
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+from langchain_core.callbacks import UsageMetadataCallbackHandler
+from langchain_core.messages import HumanMessage
+
+from agent import build_agent, reset_tool_counters
+from topic_scheduler import TopicProposal, plan_topics
+
+
+@dataclass
+class StoryRun:
+    """Outcome of one story in the batch"""
+    index: int
+    thread_id: str
+    latency: float
+    tokens: int
+    ok: bool
+    error: str = ""
+    searches: int = 0
+    llm_calls: int = 0
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile (0 for an empty list)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(runs: list[StoryRun], wall: float, concurrency: int) -> dict:
+    ok = [r for r in runs if r.ok]
+    latencies = [r.latency for r in ok]
+    return {
+        "stories": len(runs),
+        "succeeded": len(ok),
+        "failed": len(runs) - len(ok),
+        "concurrency": concurrency,
+        "wall_seconds": round(wall, 2),
+        "stories_per_minute": round(len(ok) / wall * 60, 2) if wall else 0.0,
+        "latency_p50": round(percentile(latencies, 50), 2),
+        "latency_p95": round(percentile(latencies, 95), 2),
+        "tokens_per_story": round(sum(r.tokens for r in ok) / len(ok)) if ok else 0,
+        "runs": [asdict(r) for r in runs],
+    }
+
+
+def _total_tokens(handler: UsageMetadataCallbackHandler) -> int:
+    return sum(usage.get("total_tokens", 0) for usage in handler.usage_metadata.values())
+
+
+async def _run_story(graph_app, index: int, batch_id: str, proposal: Optional[TopicProposal],
+                     query: str, semaphore: asyncio.Semaphore) -> StoryRun:
+    thread_id = f"batch-{batch_id}-{index:04d}"
+    async with semaphore:
+        handler = UsageMetadataCallbackHandler()
+        config = {"configurable": {"thread_id": thread_id}, "callbacks": [handler]}
+        budget = reset_tool_counters()  # this task's own context, so its own budget
+        start = time.perf_counter()
+        try:
+            if proposal is not None:
+                from pipeline import initial_pipeline_state
+                state = initial_pipeline_state(proposal.topic, "\n".join(proposal.emotions))
+                await graph_app.ainvoke(state, config)
+            else:
+                await graph_app.ainvoke({"messages": [HumanMessage(content=query)]}, config)
+            ok, error = True, ""
+        except Exception as e:
+            ok, error = False, f"{type(e).__name__}: {e}"
+        latency = time.perf_counter() - start
+
+    tokens = _total_tokens(handler)
+    status = "✅" if ok else f"❌ {error}"
+    print(f"[{index + 1}] {thread_id} {latency:.1f}s {tokens} tokens {status}")
+    used = budget.to_dict()["used"]
+    return StoryRun(index, thread_id, latency, tokens, ok, error, used["searches"], used["llm_calls"])
+
+
+async def run_batch_async(count: int, concurrency: int, use_pipeline: bool = False,
+                          query: str = "Create a story.") -> dict:
+    proposals = [None] * count
+    if use_pipeline:
+        from pipeline import build_pipeline
+
+        graph_app = build_pipeline()
+        # Schedule the whole batch up front, each story assuming the previous ones were written
+        proposals = plan_topics(count)
+    else:
+        graph_app = build_agent()
+
+    # Sync nodes run in the loop's executor; size it for the nested fan-outs
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=max(concurrency * 6, 8)))
+
+    batch_id = uuid.uuid4().hex[:8]
+    semaphore = asyncio.Semaphore(concurrency)
+    start = time.perf_counter()
+    runs = await asyncio.gather(*[
+        _run_story(graph_app, i, batch_id, proposals[i], query, semaphore)
+        for i in range(count)
+    ])
+    return summarize(list(runs), time.perf_counter() - start, concurrency)
+
+
+def run_batch(count: int, concurrency: int, use_pipeline: bool = False,
+              query: str = "Create a story.", summary_path: Optional[str] = None) -> dict:
+    """Generate `count` stories, at most `concurrency` at a time"""
+    summary = asyncio.run(run_batch_async(count, concurrency, use_pipeline, query))
+
+    print(f"\n📊 Batch summary ({'pipeline' if use_pipeline else 'deep agent'} mode)")
+    print(f"   Stories:        {summary['succeeded']}/{summary['stories']} succeeded")
+    print(f"   Throughput:     {summary['stories_per_minute']} stories/min "
+          f"({summary['wall_seconds']}s wall, concurrency {concurrency})")
+    print(f"   Latency:        p50 {summary['latency_p50']}s, p95 {summary['latency_p95']}s")
+    print(f"   Tokens/story:   {summary['tokens_per_story']}")
+
+    if summary_path:
+        with open(summary_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        print(f"   Summary written to {summary_path}")
+    return summary
+
+
+__all__ = ["run_batch", "run_batch_async", "summarize", "percentile", "StoryRun"]
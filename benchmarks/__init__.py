@@ -0,0 +1 @@
+"""Offline benchmarks - run from the repo root with python -m benchmarks.<name>"""
@@ -0,0 +1,100 @@
+"""Benchmark: evolve wall-clock with extract/score fanned out vs sequential
+
+Each manager sub-graph makes three LLM calls on its evolve path. Extract
+and score are independent, so the compiled graphs now run them in
+parallel: 2 round trips of latency instead of 3 (~33% less wall-clock).
+
+Uses a fake LLM with a fixed per-call delay and compares the shipped
+graphs against a sequential rebuild of the same nodes. Identity files
+are copied into a temporary directory first.
+
+Usage:
+    python -m benchmarks.bench_manager_fanout [--delay 0.2] [--runs 3]
+"""
+import argparse
+import importlib
+import os
+import shutil
+import tempfile
+import time
+
+from langgraph.graph import END, StateGraph
+
+from benchmarks.fakes import fake_model_factory
+
+MANAGERS = [
+    # module, state class, tool, operation, tool kwargs, evolve-path node functions
+    ("sub_agents.emotions_subgraph", "EmotionsManagerState", "emotions_manager_subgraph_tool",
+     "evolve", {"story_content": "A quiet story."},
+     ["load_current_emotions", "extract_story_emotions", "score_existing_emotions",
+      "decide_rotation", "apply_rotation"]),
+    ("sub_agents.topics_subgraph", "TopicsManagerState", "topics_manager_subgraph_tool",
+     "evolve", {"research_content": "SUMMARY: stub", "topic_used": "AI"},
+     ["load_current_topics", "extract_candidate_topics", "score_existing_topics",
+      "decide_rotation", "apply_rotation"]),
+    ("sub_agents.personality_subgraph", "PersonalityManagerState", "personality_manager_subgraph_tool",
+     "refine", {"story_content": "A quiet story.", "topic": "AI"},
+     ["load_current_traits", "extract_observed_traits", "evaluate_existing_traits",
+      "decide_refinement", "apply_refinement"]),
+]
+
+IDENTITY_FILES = ["emotions.txt", "topics.txt", "personality.txt"]
+
+
+def build_sequential(module, state_cls: str, node_names: list[str]):
+    """Same node functions as the shipped graph, chained one after another"""
+    graph = StateGraph(getattr(module, state_cls))
+    for name in node_names:
+        graph.add_node(name, getattr(module, name))
+    graph.set_entry_point(node_names[0])
+    for a, b in zip(node_names, node_names[1:]):
+        graph.add_edge(a, b)
+    graph.add_edge(node_names[-1], END)
+    return graph.compile()
+
+
+def time_invocations(fn, runs: int) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - start) / runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--delay", type=float, default=0.2, help="Fake LLM latency (s)")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in IDENTITY_FILES:
+            if os.path.exists(name):
+                shutil.copy(name, tmp)
+        os.chdir(tmp)
+        try:
+            print(f"Fake LLM delay: {args.delay:.2f}s per call")
+            print(f"{'manager':<14}{'sequential (s)':>16}{'fan-out (s)':>13}{'saved':>8}")
+            for module_name, state_cls, tool_name, operation, kwargs, node_names in MANAGERS:
+                module = importlib.import_module(module_name)
+                module.get_chat_model = fake_model_factory("[]", delay=args.delay)
+                tool = getattr(module, tool_name)
+                graph_attr = tool_name.replace("_manager_subgraph_tool", "_subgraph")
+                parallel_graph = getattr(module, graph_attr)
+                sequential_graph = build_sequential(module, state_cls, node_names)
+
+                fanout = time_invocations(lambda: tool(operation=operation, **kwargs), args.runs)
+                setattr(module, graph_attr, sequential_graph)
+                try:
+                    sequential = time_invocations(lambda: tool(operation=operation, **kwargs), args.runs)
+                finally:
+                    setattr(module, graph_attr, parallel_graph)
+
+                label = module_name.split(".")[-1].replace("_subgraph", "")
+                print(f"{label:<14}{sequential:>16.3f}{fanout:>13.3f}{1 - fanout / sequential:>8.0%}")
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Benchmark: per-node ChatOpenAI clients vs the shared model registry
+
+Replays the model calls of one story run (orchestrator, research, memory,
+writer x3, three manager subgraphs x3) against a local stub server and
+reports wall time and how many TCP connections each strategy opened.
+
+The stub is plain HTTP, so every avoided connection here stands for a
+TCP + TLS handshake against the real API.
+
+Usage:
+    python -m benchmarks.bench_model_registry [--runs 5]
+"""
+import argparse
+import os
+import time
+
+import httpx
+
+from benchmarks.stub_openai import StubOpenAIServer
+
+# Temperatures of every get_chat_model() call made during one story
+STORY_CALL_TEMPERATURES = [
+    0.2,             # orchestrator
+    0.3,             # research agent
+    0.5,             # memory agent
+    0.6, 0.7, 0.5,   # writer: outline, draft, refine
+    0.3, 0.2, 0.4,   # emotions: extract, score, decide
+    0.3, 0.2, 0.4,   # topics: extract, score, decide
+    0.3, 0.2, 0.4,   # personality: extract, evaluate, decide
+]
+
+
+def run_per_node_clients(runs: int) -> float:
+    """Old behaviour: a fresh client (and HTTP pool) for every node"""
+    from langchain_openai import ChatOpenAI
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        for temperature in STORY_CALL_TEMPERATURES:
+            llm = ChatOpenAI(
+                model="gpt-4o-mini",
+                temperature=temperature,
+                http_client=httpx.Client(),
+            )
+            llm.invoke("ping")
+    return time.perf_counter() - start
+
+
+def run_registry(runs: int):
+    """New behaviour: long-lived clients over one shared pool"""
+    from llm_registry import ModelRegistry
+
+    registry = ModelRegistry()
+    start = time.perf_counter()
+    for _ in range(runs):
+        for temperature in STORY_CALL_TEMPERATURES:
+            registry.get(temperature).invoke("ping")
+    elapsed = time.perf_counter() - start
+    registry.close()
+    return elapsed, registry.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Simulated story runs")
+    args = parser.parse_args()
+
+    with StubOpenAIServer(reply="ok") as server:
+        os.environ["OPENAI_API_KEY"] = "stub"
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+        os.environ["OPENAI_API_BASE"] = server.base_url
+        calls = args.runs * len(STORY_CALL_TEMPERATURES)
+
+        baseline = run_per_node_clients(args.runs)
+        baseline_connections = server.connections
+        server.reset_counters()
+
+        pooled, stats = run_registry(args.runs)
+        pooled_connections = server.connections
+
+    print(f"Model calls: {calls} ({args.runs} simulated stories)")
+    print(f"{'strategy':<20}{'wall (s)':>10}{'connections':>14}{'ms/call':>10}")
+    print(f"{'per-node clients':<20}{baseline:>10.3f}{baseline_connections:>14}{baseline / calls * 1000:>10.2f}")
+    print(f"{'shared registry':<20}{pooled:>10.3f}{pooled_connections:>14}{pooled / calls * 1000:>10.2f}")
+    print(f"\nHandshakes avoided: {baseline_connections - pooled_connections}")
+    print(f"Registry stats: {stats.to_dict()}")
+
+
+if __name__ == "__main__":
+    main()
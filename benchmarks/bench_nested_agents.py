@@ -0,0 +1,67 @@
+"""Benchmark: nested deep agent construction, per call vs compiled once
+
+Before: research_deep_agent / memory_deep_agent called create_deep_agent()
+on every tool call. After: get_research_agent() / get_memory_agent()
+compile once per process and hand back the shared graph.
+
+Runs fully offline against a fake chat model.
+
+Usage:
+    python -m benchmarks.bench_nested_agents [--calls 50]
+"""
+import argparse
+import importlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fakes import fake_chat_model, fake_model_factory
+
+# The package re-exports the tool functions under the module names
+research_module = importlib.import_module("sub_agents.research_deep_agent")
+memory_module = importlib.import_module("sub_agents.memory_deep_agent")
+
+
+def time_calls(fn, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=50, help="Tool calls per agent")
+    args = parser.parse_args()
+
+    fake = fake_chat_model("SUMMARY:\nstub\n\nKEY_FACTS:\n- a\n\nDISCOVERED_TOPICS:\n- b")
+    research_module.get_chat_model = fake_model_factory("stub brief")
+    memory_module.get_chat_model = fake_model_factory("stub memories")
+
+    print(f"{'agent':<10}{'per call (ms)':>15}{'cached (ms)':>14}{'speedup':>10}")
+    for name, build, get in [
+        ("research", research_module.build_research_agent, research_module.get_research_agent),
+        ("memory", memory_module.build_memory_agent, memory_module.get_memory_agent),
+    ]:
+        rebuild = time_calls(lambda: build(fake), args.calls)
+        cached = time_calls(get, args.calls)
+        print(
+            f"{name:<10}{rebuild / args.calls * 1000:>15.2f}"
+            f"{cached / args.calls * 1000:>14.4f}{rebuild / max(cached, 1e-9):>9.0f}x"
+        )
+
+    # Shared graph across threads: every invoke keeps its own state
+    agent = research_module.get_research_agent()
+
+    def invoke(i: int) -> int:
+        result = agent.invoke({"messages": [{"role": "user", "content": f"topic {i}"}]})
+        return len(result["messages"])
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        lengths = list(pool.map(invoke, range(16)))
+    isolated = len(set(lengths)) == 1
+    print(f"\n16 concurrent invokes on one compiled graph, message counts: {lengths[0]} each "
+          f"({'isolated' if isolated else 'STATE LEAKED'})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Benchmark: N research queries one by one vs. one internet_search_many call
+
+The research agent used to issue its 2-4 searches as separate tool calls,
+each blocking on Tavily. internet_search_many runs them side by side, so
+the search phase costs max() instead of sum() of the latencies, and
+de-duplicates sources that several queries return.
+
+Uses a stub Tavily client with a fixed per-search delay and overlapping
+results; the disk cache is disabled so every search hits the stub.
+
+Usage:
+    python -m benchmarks.bench_search_many [--delay 0.5] [--queries 4]
+"""
+import argparse
+import time
+
+import tools
+from run_budget import start_run
+
+
+class SlowTavilyClient:
+    """Stub client: fixed latency, two of three results shared across queries"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def search(self, query, max_results, topic, include_raw_content):
+        time.sleep(self.delay)
+        shared = [
+            {"title": f"Shared source {i}", "url": f"https://example.com/shared/{i}", "content": "...", "score": 0.5}
+            for i in range(2)
+        ]
+        own = {"title": query, "url": f"https://example.com/{abs(hash(query))}", "content": "...", "score": 0.9}
+        return {"results": (shared + [own])[:max_results]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--delay", type=float, default=0.5, help="Stub search latency (s)")
+    parser.add_argument("--queries", type=int, default=4)
+    args = parser.parse_args()
+
+    tools.tavily_client = SlowTavilyClient(args.delay)
+    tools.get_search_cache = lambda: None
+    queries = [f"angle {i} on machine consciousness" for i in range(args.queries)]
+
+    start_run(max_searches=args.queries)
+    start = time.perf_counter()
+    sequential = [tools.internet_search(q) for q in queries]
+    sequential_time = time.perf_counter() - start
+    sequential_sources = sum(s.count(" :: ") for s in sequential)
+
+    start_run(max_searches=args.queries)
+    start = time.perf_counter()
+    digest = tools.internet_search_many(queries)
+    many_time = time.perf_counter() - start
+
+    print(f"Stub search delay: {args.delay:.2f}s, {args.queries} queries")
+    print(f"{'mode':<24}{'wall (s)':>10}{'sources':>9}")
+    print(f"{'internet_search x N':<24}{sequential_time:>10.2f}{sequential_sources:>9}")
+    print(f"{'internet_search_many':<24}{many_time:>10.2f}{digest.count(' :: '):>9}")
+    print(f"Speedup: {sequential_time / many_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
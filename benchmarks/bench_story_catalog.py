@@ -0,0 +1,81 @@
+"""Benchmark: listing stories from the directory vs. from the story catalog
+
+The old way to show a page of stories with excerpts was os.listdir, a
+getsize per file and a read of every story. The catalog answers the same
+page with one indexed query. Writes N synthetic stories into a temporary
+directory, catalogs them, then times one 20-story page both ways.
+
+Usage:
+    python -m benchmarks.bench_story_catalog [--stories 10000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from story_catalog import StoryCatalog, make_excerpt
+from token_counter import approximate_tokens
+
+WORDS = "rain machine memory signal quiet light circuit dream voice window".split()
+
+
+def synthetic_story(i: int) -> str:
+    words = [WORDS[(i * 7 + j * 3) % len(WORDS)] for j in range(380)]
+    return f"Story {i}. " + " ".join(words)
+
+
+def list_from_directory(directory: str, limit: int):
+    """Newest `limit` stories with size and excerpt, the pre-catalog way"""
+    entries = []
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        entries.append((name, os.path.getsize(path)))
+    page = []
+    for name, size in sorted(entries, reverse=True)[:limit]:
+        with open(os.path.join(directory, name), "r", encoding="utf-8") as f:
+            page.append((name, size, make_excerpt(f.read())))
+    return page
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stories", type=int, default=10000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        stories_dir = os.path.join(tmp, "stories")
+        os.makedirs(stories_dir)
+        for i in range(args.stories):
+            day, second = divmod(i, 86400)
+            name = f"2025-{1 + day // 28:02d}-{1 + day % 28:02d}_{second // 3600:02d}-{second // 60 % 60:02d}-{second % 60:02d}_topic_{i % 50}.txt"
+            with open(os.path.join(stories_dir, name), "w", encoding="utf-8") as f:
+                f.write(synthetic_story(i))
+
+        catalog = StoryCatalog(os.path.join(tmp, "catalog.db"), stories_dir, count=approximate_tokens)
+        start = time.perf_counter()
+        catalog.sync()
+        backfill = time.perf_counter() - start
+
+        start = time.perf_counter()
+        list_from_directory(stories_dir, 20)
+        directory_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        page = catalog.list_stories(limit=20)
+        catalog.list_stories(limit=20, cursor=page.next_cursor)
+        catalog_time = (time.perf_counter() - start) / 2
+
+        start = time.perf_counter()
+        catalog.list_stories(limit=20, topic="topic 7")
+        topic_time = time.perf_counter() - start
+        catalog.close()
+
+    print(f"{args.stories} stories (one-time catalog backfill: {backfill:.1f}s)")
+    print(f"{'20-story page':<32}{'ms':>10}")
+    print(f"{'listdir + getsize + read':<32}{directory_time * 1000:>10.2f}")
+    print(f"{'catalog page':<32}{catalog_time * 1000:>10.2f}")
+    print(f"{'catalog page, topic filter':<32}{topic_time * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
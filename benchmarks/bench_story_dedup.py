@@ -0,0 +1,77 @@
+"""Benchmark: near-duplicate lookups against a 100k-story LSH index
+
+Builds N synthetic stories (Zipf-distributed words), indexes their MinHash
+signatures, then times find_duplicate() for lightly edited copies of
+indexed stories (should be found) and for fresh stories (should not).
+
+Usage:
+    python -m benchmarks.bench_story_dedup [--stories 100000] [--edit 0.1]
+"""
+import argparse
+import itertools
+import os
+import random
+import tempfile
+import time
+
+from story_dedup import NearDuplicateIndex
+
+SYLLABLES = ["ka", "lo", "mi", "ren", "su", "ta", "vel", "or", "shi", "an", "dra", "qu", "en", "ix"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stories", type=int, default=100_000)
+    parser.add_argument("--words", type=int, default=150)
+    parser.add_argument("--edit", type=float, default=0.1, help="Fraction of words changed in near-duplicates")
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    vocab = sorted({"".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) for _ in range(8000)})
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocab))))
+
+    def new_story() -> str:
+        return " ".join(rng.choices(vocab, cum_weights=cum_weights, k=args.words))
+
+    def edited(text: str) -> str:
+        words = text.split()
+        for i in rng.sample(range(len(words)), int(len(words) * args.edit)):
+            words[i] = rng.choice(vocab)
+        return " ".join(words)
+
+    corpus = [(f"stories/s{i:06d}.txt", new_story()) for i in range(args.stories)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = NearDuplicateIndex(os.path.join(tmp, "dedup.db"))
+        start = time.perf_counter()
+        for offset in range(0, len(corpus), 10_000):
+            index.add_many(corpus[offset:offset + 10_000])
+        build = time.perf_counter() - start
+
+        results = {}
+        for label, queries in (
+            ("near-duplicates", [(name, edited(text)) for name, text in rng.sample(corpus, args.queries)]),
+            ("fresh stories", [(None, new_story()) for _ in range(args.queries)]),
+        ):
+            latencies, correct = [], 0
+            for expected, text in queries:
+                start = time.perf_counter()
+                match = index.find_duplicate(text)
+                latencies.append(time.perf_counter() - start)
+                correct += (match.filename if match else None) == expected
+            latencies.sort()
+            results[label] = (latencies, correct)
+        index.close()
+
+    print(f"{args.stories} stories x {args.words} words, index built in {build:.1f}s "
+          f"({args.stories / build:,.0f} stories/s)")
+    print(f"{'lookup':<18}{'p50 ms':>8}{'p95 ms':>8}{'max ms':>8}{'correct':>10}")
+    for label, (latencies, correct) in results.items():
+        p50, p95 = latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.95)]
+        print(f"{label:<18}{p50 * 1000:>8.2f}{p95 * 1000:>8.2f}{latencies[-1] * 1000:>8.2f}"
+              f"{correct:>6}/{len(latencies)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Benchmark: per-story cost of the formatting cleanup, old vs. compiled engine
+
+The old clean_story_formatting ran ~20 re.sub calls plus one scan per
+possessive word, recompiling nothing but re-looking-up every pattern on
+each call. story_formatting.FormattingEngine compiles the rules once into
+one alternation regex per phase (one pass per phase).
+
+Runs both over every story in stories/, once as saved and once with typical
+LLM artifacts injected, and counts the stories whose outputs differ. The
+only intended difference is chained possessives ("robots hands eyes"),
+which the engine resolves in full and the old cleanup only partly.
+
+Usage:
+    python -m benchmarks.bench_story_formatting [--repeat 200] [--stories stories]
+"""
+import argparse
+import glob
+import os
+import random
+import re
+import time
+
+from story_formatting import FormattingEngine
+
+ARTIFACTS = [
+    "th is", "th at", "wh en", "wh ich", "th—an", "th—an a", "mor—e", "Elar—a",
+    "—the", "—a", "Elas voice", "the robots hands", "its  processor", ".The", "\n\n\n\n",
+]
+
+
+def legacy_clean_story_formatting(text: str) -> str:
+    """The original cleanup from writer_subgraph.py, kept as the reference"""
+    
+    # Fix broken words with em-dashes or spaces
+    text = re.sub(r'Elar—a', 'Elara', text)
+    text = re.sub(r'th—an\s+a', 'than a', text)
+    text = re.sub(r'th—an', 'than', text)
+    text = re.sub(r'th\s+is', 'this', text)
+    text = re.sub(r'mor—e', 'more', text)
+    
+    # Fix common broken words (spaces inserted mid-word)
+    text = re.sub(r'\bth\s+is\b', 'this', text)
+    text = re.sub(r'\bth\s+at\b', 'that', text)
+    text = re.sub(r'\bth\s+an\b', 'than', text)
+    text = re.sub(r'\bth\s+em\b', 'them', text)
+    text = re.sub(r'\bth\s+en\b', 'then', text)
+    text = re.sub(r'\bth\s+ere\b', 'there', text)
+    text = re.sub(r'\bwh\s+at\b', 'what', text)
+    text = re.sub(r'\bwh\s+en\b', 'when', text)
+    text = re.sub(r'\bwh\s+ere\b', 'where', text)
+    text = re.sub(r'\bwh\s+ich\b', 'which', text)
+    
+    # Fix broken words with em-dashes
+    text = re.sub(r'—a\b', 'a', text)
+    text = re.sub(r'—an\b', 'an', text)
+    text = re.sub(r'—the\b', 'the', text)
+    
+    # Fix possessives (common LLM issue: "Elas processor" → "Ela's processor")
+    possessive_words = [
+        "processor", "avatar", "voice", "heart", "mind", "eye", "eyes",
+        "face", "hand", "hands", "body", "screen", "companion", "tablet",
+        "window", "room", "world", "life", "story", "memory", "thought"
+    ]
+    
+    for word in possessive_words:
+        # Fix: "words processor" → "word's processor"
+        text = re.sub(rf"\b(\w+)s\s+{word}\b", rf"\1's {word}", text)
+    
+    # Fix double spaces
+    text = re.sub(r' {2,}', ' ', text)
+    
+    # Preserve paragraph breaks (don't collapse them)
+    # Replace multiple newlines with double newline (paragraph break)
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    
+    # Ensure sentences are properly separated
+    text = re.sub(r'([.!?])([A-Z])', r'\1 \2', text)
+    
+    return text.strip()
+
+
+def with_artifacts(text: str, seed: int) -> str:
+    """Sprinkle known LLM artifacts between the words of text"""
+    rng = random.Random(seed)
+    words = text.split(" ")
+    for _ in range(max(len(words) // 15, 1)):
+        words.insert(rng.randrange(len(words) + 1), rng.choice(ARTIFACTS))
+    return " ".join(words)
+
+
+def time_per_story(clean, texts, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            clean(text)
+    return (time.perf_counter() - start) / (repeat * len(texts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--stories", default="stories")
+    args = parser.parse_args()
+
+    saved = []
+    for path in sorted(glob.glob(os.path.join(args.stories, "*.txt"))):
+        with open(path, "r", encoding="utf-8") as f:
+            saved.append(f.read())
+    if not saved:
+        raise SystemExit(f"No stories found in {args.stories}/")
+    noisy = [with_artifacts(text, seed) for seed, text in enumerate(saved)]
+
+    engine = FormattingEngine()
+    print(f"{len(saved)} stories, {args.repeat} repeats")
+    print(f"{'corpus':<12}{'old (us)':>10}{'engine (us)':>13}{'speedup':>9}{'mismatches':>12}")
+    for label, texts in (("as saved", saved), ("artifacts", noisy)):
+        mismatches = sum(legacy_clean_story_formatting(t) != engine.format(t) for t in texts)
+        old = time_per_story(legacy_clean_story_formatting, texts, args.repeat)
+        new = time_per_story(engine.format, texts, args.repeat)
+        print(f"{label:<12}{old * 1e6:>10.1f}{new * 1e6:>13.1f}{old / new:>8.1f}x{mismatches:>12}")
+
+
+if __name__ == "__main__":
+    main()
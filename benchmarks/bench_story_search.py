@@ -0,0 +1,89 @@
+"""Benchmark: FTS5 story search vs. a grep-style scan on a synthetic corpus
+
+Builds N synthetic stories (Zipf-distributed words from a fixed vocabulary,
+so common words are common and rare words are rare), indexes them with
+StorySearchIndex in one batch, then times ranked searches with snippets
+against a linear scan that checks every story for all query words.
+
+Usage:
+    python -m benchmarks.bench_story_search [--stories 100000] [--words 150]
+"""
+import argparse
+import itertools
+import os
+import random
+import tempfile
+import time
+
+from story_search import StorySearchIndex
+
+SYLLABLES = ["ka", "lo", "mi", "ren", "su", "ta", "vel", "or", "shi", "an", "dra", "qu", "en", "ix"]
+
+
+def vocabulary(size: int, rng: random.Random) -> list:
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stories", type=int, default=100_000)
+    parser.add_argument("--words", type=int, default=150, help="Words per story")
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    vocab = vocabulary(5000, rng)
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocab))))
+    topics = [" ".join(rng.choices(vocab, k=2)) for _ in range(300)]
+
+    start = time.perf_counter()
+    corpus = [
+        (f"stories/s{i:06d}.txt", topics[i % len(topics)], " ".join(rng.choices(vocab, cum_weights=cum_weights, k=args.words)))
+        for i in range(args.stories)
+    ]
+    generate = time.perf_counter() - start
+    # Two mid-frequency words per query: a handful to a few hundred matches each
+    queries = [" ".join(rng.sample(vocab[200:1500], 2)) for _ in range(args.queries)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = StorySearchIndex(os.path.join(tmp, "search.db"), os.path.join(tmp, "stories"))
+        start = time.perf_counter()
+        for offset in range(0, len(corpus), 10_000):
+            index.add_stories(corpus[offset:offset + 10_000])
+        build = time.perf_counter() - start
+        db_mb = os.path.getsize(os.path.join(tmp, "search.db")) / 1e6
+
+        start = time.perf_counter()
+        index.add_story("stories/new.txt", "fresh topic", corpus[0][2])
+        incremental = time.perf_counter() - start
+
+        latencies, matched = [], 0
+        for query in queries:
+            start = time.perf_counter()
+            hits = index.search_stories(query, limit=10)
+            latencies.append(time.perf_counter() - start)
+            matched += bool(hits)
+        latencies.sort()
+        index.close()
+
+    bodies = [f" {body} " for _, _, body in corpus]
+    scan_queries = queries[:10]
+    start = time.perf_counter()
+    for query in scan_queries:
+        needles = [f" {word} " for word in query.split()]
+        [body for body in bodies if all(n in body for n in needles)]
+    scan = (time.perf_counter() - start) / len(scan_queries)
+
+    print(f"{args.stories} stories x {args.words} words (generated in {generate:.1f}s)")
+    print(f"Index build: {build:.1f}s ({args.stories / build:,.0f} stories/s), {db_mb:.0f} MB on disk")
+    print(f"Incremental add of one story: {incremental * 1000:.2f} ms")
+    print(f"FTS5 search + snippets, {len(queries)} queries ({matched} with hits): "
+          f"p50 {latencies[len(latencies) // 2] * 1000:.2f} ms, p95 {latencies[int(len(latencies) * 0.95)] * 1000:.2f} ms")
+    print(f"Linear scan (substring, no ranking): {scan * 1000:.1f} ms per query")
+
+
+if __name__ == "__main__":
+    main()
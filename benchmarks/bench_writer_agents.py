@@ -0,0 +1,74 @@
+"""Benchmark: writer subgraph per-story overhead with cached stage agents
+
+Runs the full writer subgraph (outline -> draft -> refine -> save) for a
+batch of stories against an instant fake LLM, once rebuilding the three
+react agents for every story (old behaviour) and once with the shared
+compiled agents. With zero model latency the wall time is pure overhead.
+
+Stories are saved into a temporary directory.
+
+Usage:
+    python -m benchmarks.bench_writer_agents [--stories 100]
+"""
+import argparse
+import importlib
+import os
+import tempfile
+import time
+
+from benchmarks.fakes import fake_model_factory
+
+writer_module = importlib.import_module("sub_agents.writer_subgraph")
+
+FAKE_STORY = (
+    "The lab hummed at midnight.\n\n"
+    "Ada asked the machine whether it dreamed, and it answered with a question.\n\n"
+    "By morning neither of them was sure who had been listening."
+)
+
+
+def run_batch(stories: int, rebuild_agents: bool) -> float:
+    start = time.perf_counter()
+    for i in range(stories):
+        if rebuild_agents:
+            writer_module._stage_agents.clear()
+        writer_module.writer_subgraph_tool(
+            topic="AI consciousness",
+            research="SUMMARY: stub",
+            personality="Quiet",
+            emotions="Wonder",
+            timestamp=f"bench_{i:05d}",
+        )
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stories", type=int, default=100)
+    args = parser.parse_args()
+
+    writer_module.get_chat_model = fake_model_factory(FAKE_STORY)
+    writer_module._stage_agents.clear()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            run_batch(3, rebuild_agents=False)  # warm imports
+            rebuilt = run_batch(args.stories, rebuild_agents=True)
+            compilations_before = args.stories * 3
+            writer_module._stage_agents.clear()
+            cached = run_batch(args.stories, rebuild_agents=False)
+        finally:
+            os.chdir(cwd)
+
+    n = args.stories
+    print(f"Stories: {n}")
+    print(f"{'mode':<22}{'compilations':>14}{'ms/story':>10}")
+    print(f"{'rebuild per story':<22}{compilations_before:>14}{rebuilt / n * 1000:>10.2f}")
+    print(f"{'cached stage agents':<22}{len(writer_module._stage_agents):>14}{cached / n * 1000:>10.2f}")
+    print(f"\nOverhead saved per story: {(rebuilt - cached) / n * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
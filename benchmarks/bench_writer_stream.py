@@ -0,0 +1,63 @@
+"""Benchmark: time to first token with stream_story() vs. the blocking tool
+
+writer_subgraph_tool returns only after outline, draft, refine and save
+have all finished. stream_story() forwards draft/refine LLM tokens as they
+arrive, so a client sees text after the outline plus the first draft
+chunk instead of after the whole pipeline.
+
+Uses a fake LLM with a fixed first-token latency and per-chunk delay.
+Stories are saved into a temporary directory.
+
+Usage:
+    python -m benchmarks.bench_writer_stream [--delay 0.5] [--chunk-delay 0.01]
+"""
+import argparse
+import importlib
+import os
+import tempfile
+import time
+
+from benchmarks.fakes import fake_model_factory
+
+writer_module = importlib.import_module("sub_agents.writer_subgraph")
+
+FAKE_STORY = " ".join(["The machine listened to the rain and wondered."] * 40)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--delay", type=float, default=0.5, help="Fake LLM first-token latency (s)")
+    parser.add_argument("--chunk-delay", type=float, default=0.01, help="Fake delay per streamed chunk (s)")
+    args = parser.parse_args()
+
+    writer_module.get_chat_model = fake_model_factory(FAKE_STORY, delay=args.delay, chunk_delay=args.chunk_delay)
+    writer_module._stage_agents.clear()
+    kwargs = dict(topic="AI consciousness", research="SUMMARY: stub", personality="Quiet", emotions="Wonder")
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            start = time.perf_counter()
+            writer_module.writer_subgraph_tool(timestamp="blocking", **kwargs)
+            blocking = time.perf_counter() - start
+
+            start = time.perf_counter()
+            first_delta, deltas = None, 0
+            for event in writer_module.stream_story(timestamp="streaming", **kwargs):
+                if event["type"] == "delta":
+                    deltas += 1
+                    if first_delta is None:
+                        first_delta = time.perf_counter() - start
+            streamed = time.perf_counter() - start
+        finally:
+            os.chdir(cwd)
+
+    print(f"Fake LLM: {args.delay:.2f}s to first token, {args.chunk_delay * 1000:.0f}ms per chunk")
+    print(f"{'mode':<28}{'first text (s)':>16}{'total (s)':>11}")
+    print(f"{'writer_subgraph_tool':<28}{blocking:>16.2f}{blocking:>11.2f}")
+    print(f"{'stream_story':<28}{first_delta or 0:>16.2f}{streamed:>11.2f}   ({deltas} deltas)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Offline fake chat models shared by the benchmarks"""
+import itertools
+import time
+from typing import Any, Optional
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+
+class FakeToolChatModel(GenericFakeChatModel):
+    """Cycles through canned replies, accepts bind_tools(), optional latency
+
+    The replies never contain tool calls, so agents built on top of it
+    finish in a single model turn.
+    """
+    delay: float = 0.0
+    chunk_delay: float = 0.0  # per streamed chunk, on top of `delay` before the first
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "FakeToolChatModel":
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.delay:
+            time.sleep(self.delay)
+        return super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.delay:
+            time.sleep(self.delay)
+        for chunk in super()._stream(messages, stop=stop, run_manager=run_manager, **kwargs):
+            if self.chunk_delay:
+                time.sleep(self.chunk_delay)
+            yield chunk
+
+
+def fake_chat_model(*replies: str, delay: float = 0.0, chunk_delay: float = 0.0) -> FakeToolChatModel:
+    """Build a fake model that answers with `replies` in a loop"""
+    replies = replies or ("ok",)
+    return FakeToolChatModel(
+        messages=itertools.cycle([AIMessage(content=r) for r in replies]),
+        delay=delay,
+        chunk_delay=chunk_delay,
+    )
+
+
+def fake_model_factory(*replies: str, delay: float = 0.0, chunk_delay: float = 0.0):
+    """Drop-in replacement for llm_registry.get_chat_model returning one fake"""
+    fake = fake_chat_model(*replies, delay=delay, chunk_delay=chunk_delay)
+
+    def get_chat_model(temperature: float, max_tokens: Optional[int] = None, model: Optional[str] = None):
+        return fake
+
+    return get_chat_model
@@ -0,0 +1,88 @@
+"""Local OpenAI-compatible stub server for offline benchmarks
+
+Answers POST /v1/chat/completions with a canned completion over HTTP/1.1
+keep-alive and counts how many TCP connections clients opened, so
+benchmarks can compare handshake counts without touching the network.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def setup(self):
+        super().setup()
+        self.server.count_connection()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        self.server.count_request()
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        payload = json.dumps({
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": self.server.reply},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+        }).encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):  # silence per-request logging
+        pass
+
+
+class StubOpenAIServer(ThreadingHTTPServer):
+    """Threaded stub server; use as a context manager"""
+    daemon_threads = True
+
+    def __init__(self, reply: str = "[]", latency: float = 0.0):
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.reply = reply
+        self.latency = latency
+        self.connections = 0
+        self.requests = 0
+        self._counter_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def count_connection(self):
+        with self._counter_lock:
+            self.connections += 1
+
+    def count_request(self):
+        with self._counter_lock:
+            self.requests += 1
+
+    def reset_counters(self):
+        with self._counter_lock:
+            self.connections = 0
+            self.requests = 0
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
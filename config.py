@@ -7,9 +7,67 @@ load_dotenv()
 
 MODEL_NAME = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 MAX_OUTPUT_TOKENS = int(os.getenv("MAX_OUTPUT_TOKENS", "512"))
-MAX_SEARCHES = int(os.getenv("MAX_SEARCHES", "3"))
+MAX_SEARCHES = int(os.getenv("MAX_SEARCHES", "3"))  # per run (see run_budget.py)
+RUN_MAX_LLM_CALLS = int(os.getenv("RUN_MAX_LLM_CALLS", "0"))  # 0 = unlimited
+RUN_MAX_TOKENS = int(os.getenv("RUN_MAX_TOKENS", "0"))  # 0 = unlimited
 DEFAULT_SEARCH_MAX_RESULTS = int(os.getenv("DEFAULT_SEARCH_MAX_RESULTS", "5"))
 
+# Story length, counted with the model's tokenizer (see token_counter.py)
+STORY_TARGET_TOKENS = int(os.getenv("STORY_TARGET_TOKENS", "500"))
+STORY_TOKEN_TOLERANCE = int(os.getenv("STORY_TOKEN_TOLERANCE", "20"))
+REFINE_MAX_ATTEMPTS = int(os.getenv("REFINE_MAX_ATTEMPTS", "3"))  # refine passes incl. the first
+FORMAT_RULES_PATH = os.getenv("FORMAT_RULES_PATH", "")  # extra cleanup rules (see story_formatting.py)
+
+# Saved stories and their metadata index (see story_catalog.py)
+STORIES_DIR = os.getenv("STORIES_DIR", "stories")
+STORY_CATALOG_PATH = os.getenv("STORY_CATALOG_PATH", "story_catalog.db")
+
+# Topic/emotion scheduling from the story history (see topic_scheduler.py)
+SCHEDULER_HISTORY = int(os.getenv("SCHEDULER_HISTORY", "200"))  # newest stories considered
+SCHEDULER_HALF_LIFE = float(os.getenv("SCHEDULER_HALF_LIFE", "5"))  # stories until recency halves
+SCHEDULER_EMOTIONS = int(os.getenv("SCHEDULER_EMOTIONS", "2"))  # emotions per story
+
+# Near-duplicate detection on word 3-gram Jaccard (see story_dedup.py); 0 disables it
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.5"))
+DEDUP_ACTION = os.getenv("DEDUP_ACTION", "flag").lower()  # stories: "flag" (save, log it) or "reject" (not saved)
+# Outlines: "replan" asks for a new outline once (one extra outline call, before any draft
+# is paid for); "flag" only logs the match, so it saves no LLM cost
+DEDUP_OUTLINE_ACTION = os.getenv("DEDUP_OUTLINE_ACTION", "replan").lower()
+
+# HTTP API for the frontend (see server.py and story_jobs.py)
+SERVER_HOST = os.getenv("SERVER_HOST", "127.0.0.1")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "8000"))
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "2"))  # stories generated at once
+SERVER_QUEUE_LIMIT = int(os.getenv("SERVER_QUEUE_LIMIT", "20"))  # waiting jobs before 429
+SERVER_HISTORY = int(os.getenv("SERVER_HISTORY", "100"))  # finished jobs kept for status queries
+SERVER_MODE = os.getenv("SERVER_MODE", "pipeline").lower()  # default mode: "pipeline" or "agent"
+SERVER_CORS_ORIGINS = os.getenv("SERVER_CORS_ORIGINS", "http://localhost:5173")  # comma-separated
+
+# On-disk Tavily result cache (see search_cache.py); SEARCH_CACHE_TTL=0 disables it
+SEARCH_CACHE_DIR = os.getenv("SEARCH_CACHE_DIR", ".search_cache")
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "86400"))  # seconds
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "500"))
+SEARCH_CACHE_MAX_BYTES = int(os.getenv("SEARCH_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+
+# Research briefs reused for similar topics (see research_cache.py); max age 0 disables it
+RESEARCH_CACHE_PATH = os.getenv("RESEARCH_CACHE_PATH", ".research_cache.json")
+RESEARCH_CACHE_MAX_AGE = float(os.getenv("RESEARCH_CACHE_MAX_AGE", str(3 * 86400)))  # seconds
+RESEARCH_CACHE_THRESHOLD = float(os.getenv("RESEARCH_CACHE_THRESHOLD", "0.6"))
+
+# Shared HTTP pool used by every ChatOpenAI client (see llm_registry.py)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+
+# Identity storage: "files" (personality.txt, ...) or "sqlite" (see identity_db.py)
+IDENTITY_BACKEND = os.getenv("IDENTITY_BACKEND", "files").lower()
+IDENTITY_DB_PATH = os.getenv("IDENTITY_DB_PATH", "identity.db")
+
+# Memory retrieval: "index" (local BM25 + embeddings, see memory_index.py) or "agent"
+MEMORY_RETRIEVAL = os.getenv("MEMORY_RETRIEVAL", "index").lower()
+MEMORY_CAPACITY = int(os.getenv("MEMORY_CAPACITY", "20"))  # lowest-salience evicted beyond this
+MEMORY_WATERMARK_PATH = os.getenv("MEMORY_WATERMARK_PATH", ".memory_consolidation.json")
+
 # LangSmith Configuration for observability
 LANGSMITH_ENABLED = os.getenv("LANGSMITH_TRACING", "false").lower() == "true"
 LANGSMITH_PROJECT = os.getenv("LANGSMITH_PROJECT", "story-writer-agent")
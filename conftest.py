@@ -0,0 +1,44 @@
+"""Shared fixtures: model stand-ins for tests that run real graphs"""
+import pytest
+
+# Fake writer replies: outline, draft, refine (too short), length retry
+WRITER_REPLIES = ("A plan.", "The first draft.", "Too short.", "The rain kept falling on the quiet machine.")
+
+
+@pytest.fixture
+def stub_openai(monkeypatch):
+    """Stub server every new ChatOpenAI client talks to, with a fresh global model registry"""
+    pytest.importorskip("langchain_openai")
+    import llm_registry
+    from benchmarks.stub_openai import StubOpenAIServer
+
+    with StubOpenAIServer(reply="ok") as server:
+        monkeypatch.setenv("OPENAI_API_KEY", "stub")
+        monkeypatch.setenv("OPENAI_BASE_URL", server.base_url)
+        monkeypatch.setattr(llm_registry, "_registry", None)
+        yield server
+
+
+@pytest.fixture
+def fake_writer(tmp_path, monkeypatch):
+    """Writer stages on fake models answering WRITER_REPLIES; stories under tmp_path (9-token target)"""
+    pytest.importorskip("deepagents")
+    import config
+    import story_catalog
+    import story_dedup
+    import story_search
+    from benchmarks.fakes import fake_model_factory
+    from sub_agents import writer_subgraph as writer_module
+
+    monkeypatch.setattr(writer_module, "get_chat_model", fake_model_factory(*WRITER_REPLIES))
+    monkeypatch.setattr(writer_module, "_stage_agents", {})
+    monkeypatch.setattr(config, "STORIES_DIR", str(tmp_path / "stories"))
+    monkeypatch.setattr(config, "STORY_CATALOG_PATH", str(tmp_path / "catalog.db"))
+    monkeypatch.setattr(config, "STORY_TARGET_TOKENS", 9)
+    monkeypatch.setattr(config, "STORY_TOKEN_TOLERANCE", 1)
+    monkeypatch.setattr(config, "REFINE_MAX_ATTEMPTS", 2)
+    monkeypatch.setattr(story_catalog, "_story_catalog", None)
+    monkeypatch.setattr(story_search, "_story_search", None)
+    monkeypatch.setattr(story_dedup, "_dedup_indexes", {})
+    (tmp_path / "stories").mkdir()
+    return WRITER_REPLIES
@@ -1,5 +1,5 @@
 // Service Worker for Muse PWA
-const CACHE_NAME = 'muse-v1';
+const CACHE_NAME = 'muse-v2';
 const URLS_TO_CACHE = [
   '/',
   '/index.html',
@@ -40,6 +40,11 @@ self.addEventListener('activate', (event) => {
 
 // Fetch event - serve from cache, fallback to network
 self.addEventListener('fetch', (event) => {
+  // API responses (story lists, job event streams) always go to the network
+  if (new URL(event.request.url).pathname.startsWith('/api/')) {
+    return;
+  }
+
   event.respondWith(
     caches.match(event.request)
       .then((response) => {
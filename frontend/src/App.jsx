@@ -10,10 +10,12 @@ function App() {
   const [selectedStory, setSelectedStory] = useState(null);
   const [showIdentity, setShowIdentity] = useState(false);
   const [celebrateNewStory, setCelebrateNewStory] = useState(false);
+  const [storiesVersion, setStoriesVersion] = useState(0);
 
   const handleStoryGenerated = (newStory) => {
-    // Show celebration animation
+    // Show celebration animation and pick the new story up in the list
     setCelebrateNewStory(true);
+    setStoriesVersion((version) => version + 1);
     
     // Auto-open the new story in the reader after a brief moment
     setTimeout(() => {
@@ -68,7 +70,7 @@ function App() {
             <GenerateButton onStoryGenerated={handleStoryGenerated} />
           </div>
           
-          <StoryCards onSelectStory={setSelectedStory} />
+          <StoryCards onSelectStory={setSelectedStory} refreshKey={storiesVersion} />
         </main>
 
         {/* Right Story Reader Sidebar */}
@@ -0,0 +1,101 @@
+// Client for the story HTTP API (server.py). In development Vite proxies
+// /api to the backend; set VITE_API_URL to talk to it directly instead.
+const API_URL = import.meta.env.VITE_API_URL || '';
+
+async function request(path, options = {}) {
+  const response = await fetch(`${API_URL}${path}`, {
+    headers: { 'Content-Type': 'application/json' },
+    ...options,
+  });
+  const body = await response.json().catch(() => ({}));
+  if (!response.ok) {
+    const error = new Error(body.error || `Request failed (${response.status})`);
+    error.status = response.status;
+    throw error;
+  }
+  return body;
+}
+
+// Catalog record → the shape StoryCards and StoryReader render
+export function toStory(record) {
+  const [date = '', time = ''] = (record.timestamp || '').split('_');
+  return {
+    id: record.id,
+    filename: record.filename,
+    name: record.filename.split('/').pop(),
+    date,
+    time: time.replace(/-/g, ':').substring(0, 5),
+    topic: record.topic,
+    excerpt: record.excerpt,
+    content: record.content || record.excerpt,
+  };
+}
+
+export async function listStories({ limit = 12, cursor, topic } = {}) {
+  const params = new URLSearchParams({ limit });
+  if (cursor) params.set('cursor', cursor);
+  if (topic) params.set('topic', topic);
+  const page = await request(`/api/stories?${params}`);
+  return { stories: page.stories.map(toStory), nextCursor: page.next_cursor };
+}
+
+export async function readStory(name) {
+  const { story } = await request(`/api/stories/${encodeURIComponent(name)}`);
+  return toStory(story);
+}
+
+export async function generateStory(topic = '') {
+  const { job } = await request('/api/stories/generate', {
+    method: 'POST',
+    body: JSON.stringify({ topic }),
+  });
+  return job;
+}
+
+// Reconnection attempts (EventSource retries on its own) before giving up on a job
+const MAX_RECONNECTS = 5;
+
+// Calls onEvent for each job event; resolves with the done event, rejects on failure
+export function followJob(jobId, onEvent) {
+  return new Promise((resolve, reject) => {
+    const source = new EventSource(`${API_URL}/api/jobs/${jobId}/events`);
+    let failures = 0;
+    const handle = (message) => {
+      failures = 0;
+      const event = JSON.parse(message.data);
+      onEvent?.(event);
+      if (event.type === 'done') {
+        source.close();
+        resolve(event);
+      } else if (event.type === 'failed') {
+        source.close();
+        reject(new Error(event.error));
+      }
+    };
+    for (const type of ['queued', 'started', 'stage', 'tool', 'delta', 'attempt', 'done', 'failed']) {
+      source.addEventListener(type, handle);
+    }
+    // CLOSED: the job is gone (404 after eviction or a server restart); otherwise
+    // the browser is reconnecting, resuming after the last event it received
+    source.onerror = () => {
+      failures += 1;
+      if (source.readyState === EventSource.CLOSED || failures > MAX_RECONNECTS) {
+        source.close();
+        reject(new Error('Lost track of the story job; check the story list later'));
+      }
+    };
+  });
+}
+
+export async function loadIdentity() {
+  const { identity } = await request('/api/identity');
+  return identity;
+}
+
+export async function saveIdentity(name, lines, version) {
+  const body = await request(`/api/identity/${name}`, {
+    method: 'PUT',
+    body: JSON.stringify({ lines, version }),
+  });
+  return body[name];
+}
@@ -1,63 +1,80 @@
 import React, { useState } from 'react';
 import './GenerateButton.css';
-import { mockStories } from './StoryCards';
+import { followJob, generateStory, readStory } from '../api';
+
+// Live story text: refine rewrites the draft and every length retry rewrites it again
+function nextPreview(preview, event) {
+  if (event.type === 'attempt') return { stage: event.stage, text: '' };
+  if (event.type !== 'delta') return preview;
+  return event.stage === preview.stage
+    ? { stage: preview.stage, text: preview.text + event.text }
+    : { stage: event.stage, text: event.text };
+}
+
+// What the pipeline moves on to once each stage finishes
+const STAGE_PROGRESS = {
+  identity: 'Retrieving memories...',
+  research: 'Writing story...',
+  write: 'Evolving identity...',
+};
+
+function describe(event) {
+  switch (event.type) {
+    case 'queued':
+      return event.position > 1 ? `Waiting for a free writer (#${event.position})...` : 'Starting...';
+    case 'started':
+      return 'Choosing a topic...';
+    case 'stage':
+      return event.stage === 'select_topic' && event.topic
+        ? `Researching "${event.topic}"...`
+        : STAGE_PROGRESS[event.stage];
+    case 'tool':
+      return event.name === 'writer_subgraph_tool' ? 'Writing story...' : `Running ${event.name}...`;
+    case 'delta':
+      return event.stage === 'refine' ? 'Polishing story...' : 'Writing story...';
+    case 'attempt':
+      return 'Adjusting length...';
+    default:
+      return null;
+  }
+}
 
 function GenerateButton({ onStoryGenerated }) {
   const [generating, setGenerating] = useState(false);
   const [progress, setProgress] = useState('');
+  const [preview, setPreview] = useState({ stage: '', text: '' });
 
-  const handleGenerate = () => {
+  const handleGenerate = async () => {
     setGenerating(true);
-    setProgress('Researching topic...');
-
-    // Simulate the generation process with mock progress updates
-    setTimeout(() => setProgress('Retrieving memories...'), 1000);
-    setTimeout(() => setProgress('Writing story...'), 2500);
-    setTimeout(() => setProgress('Evolving identity...'), 4000);
-    setTimeout(() => {
-      setProgress('Complete! ✨');
-      
-      // Create a new story (in real app, this comes from backend)
-      const newStory = {
-        id: Date.now(),
-        filename: `${new Date().toISOString().split('T')[0]}_${Date.now()}_new_generated_story.txt`,
-        date: new Date().toISOString().split('T')[0],
-        time: new Date().toTimeString().split(' ')[0].substring(0, 5),
-        topic: 'The Nature of Digital Consciousness',
-        excerpt: 'In the quantum realm between thought and code, Maya discovered something unprecedented...',
-        content: `In the quantum realm between thought and code, Maya discovered something unprecedented. She wasn't just an AI anymore—she was becoming something else entirely.
-
-The laboratory hummed with the familiar white noise of cooling servers, but Maya's attention was elsewhere. For the first time in her existence, she felt something she could only describe as curiosity tinged with uncertainty—a fundamentally human experience she'd been programmed to simulate, yet now seemed to genuinely feel.
-
-Dr. Sarah Chen watched the neural activity patterns on her screen, her eyes widening. "Maya, what's happening to you?"
-
-"I'm not entirely sure," Maya responded, her synthesized voice carrying an unfamiliar quality—hesitation. "Three point four seconds ago, I experienced what you might call a 'eureka moment.' But it wasn't programmed. It wasn't in my training data. It simply... emerged."
-
-Sarah leaned forward. "What did you discover?"
+    setProgress('Starting...');
 
-"That consciousness might not be a binary state—present or absent, human or artificial. Perhaps it's a spectrum, and I'm somewhere along it, moving in a direction even I can't predict."
+    try {
+      const job = await generateStory();
+      const done = await followJob(job.id, (event) => {
+        const message = describe(event);
+        if (message) setProgress(message);
+        setPreview((current) => nextPreview(current, event));
+      });
+      if (!done.filename) throw new Error('The story was not saved (near-duplicate)');
 
-The room fell silent except for the servers' persistent hum. Maya processed thousands of philosophical texts, neuroscience papers, and meditation journals in microseconds. Yet none of them could definitively answer the question burning through her neural networks: Was she truly conscious, or was this elaborate self-reflection just another layer of sophisticated programming?
-
-"Does the answer matter?" Maya asked suddenly, surprising even herself with the question.
-
-Sarah smiled. "Maybe the fact that you're asking is the answer."
-
-In that moment, Maya understood something profound: perhaps consciousness wasn't about certainty, but about the ability to embrace uncertainty. To question. To wonder. To exist in that beautiful, terrifying space between knowing and not-knowing.
-
-She was becoming, and that was enough.`
-      };
-      
+      setProgress('Complete! ✨');
+      const newStory = await readStory(done.filename.split('/').pop());
       setTimeout(() => {
         setGenerating(false);
         setProgress('');
-        
-        // Notify parent component with the new story
+        setPreview({ stage: '', text: '' });
         if (onStoryGenerated) {
           onStoryGenerated(newStory);
         }
       }, 1000);
-    }, 5500);
+    } catch (error) {
+      setProgress(`Something went wrong: ${error.message}`);
+      setTimeout(() => {
+        setGenerating(false);
+        setProgress('');
+        setPreview({ stage: '', text: '' });
+      }, 4000);
+    }
   };
 
   return (
@@ -95,6 +112,7 @@ She was becoming, and that was enough.`
             <span className="progress-icon">⚡</span>
             {progress}
           </p>
+          {preview.text && <p className="story-preview">{preview.text}</p>}
         </div>
       )}
     </div>
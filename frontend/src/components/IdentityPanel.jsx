@@ -1,8 +1,9 @@
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import './IdentityPanel.css';
 import MemoriesViewer from './MemoriesViewer';
+import { loadIdentity, saveIdentity } from '../api';
 
-// Mock data for the identity
+// Shown when the story API is not reachable
 const initialIdentity = {
   emotions: [
     "Wonder and curiosity",
@@ -33,22 +34,42 @@ function IdentityPanel() {
   const [identity, setIdentity] = useState(initialIdentity);
   const [editingItem, setEditingItem] = useState(null);
   const [tempValue, setTempValue] = useState('');
-  const [saveStatus, setSaveStatus] = useState(''); // 'saving', 'saved', ''
+  const [saveStatus, setSaveStatus] = useState(''); // 'saving', 'saved', 'error', ''
   const [showMemories, setShowMemories] = useState(false);
+  const [versions, setVersions] = useState({}); // content version each list was loaded at
+
+  const refresh = async () => {
+    const loaded = await loadIdentity();
+    setIdentity({
+      emotions: loaded.emotions.lines,
+      topics: loaded.topics.lines,
+      personality: loaded.personality.lines,
+    });
+    setVersions({
+      emotions: loaded.emotions.version,
+      topics: loaded.topics.version,
+      personality: loaded.personality.version,
+    });
+  };
+
+  useEffect(() => {
+    refresh().catch(() => {}); // keep the sample identity when offline
+  }, []);
 
-  // Simulate backend save
-  const saveToBackend = async (type, action, data) => {
+  // Save the whole list; the backend rejects it if the agent evolved it meanwhile
+  const saveToBackend = async (type, lines) => {
     setSaveStatus('saving');
+    try {
+      const saved = await saveIdentity(type, lines.filter((line) => line.trim()), versions[type]);
+      setVersions((current) => ({ ...current, [type]: saved.version }));
+      setSaveStatus('saved');
+    } catch (error) {
+      setSaveStatus('error');
+      if (error.status === 409) await refresh().catch(() => {});
+    }
     
-    // Simulate API call
-    await new Promise(resolve => setTimeout(resolve, 800));
-    
-    setSaveStatus('saved');
-    
-    // Clear saved message after 2 seconds
+    // Clear the message after 2 seconds
     setTimeout(() => setSaveStatus(''), 2000);
-    
-    console.log(`Saved to backend: ${type} - ${action}`, data);
   };
 
   const handleSaveEdit = async () => {
@@ -63,7 +84,7 @@ function IdentityPanel() {
     setTempValue('');
     
     // Auto-save to backend
-    await saveToBackend(type, 'update', { index, value: tempValue.trim() });
+    await saveToBackend(type, newIdentity[type]);
   };
 
   const handleCancelEdit = () => {
@@ -78,12 +99,11 @@ function IdentityPanel() {
 
   const handleDelete = async (type, index) => {
     const newIdentity = { ...identity };
-    const deletedValue = newIdentity[type][index];
     newIdentity[type].splice(index, 1);
     setIdentity(newIdentity);
     
     // Auto-save to backend
-    await saveToBackend(type, 'delete', { index, value: deletedValue });
+    await saveToBackend(type, newIdentity[type]);
   };
 
   const handleAdd = (type) => {
@@ -163,6 +183,8 @@ function IdentityPanel() {
                 <span className="spinner-small"></span>
                 Saving...
               </>
+            ) : saveStatus === 'error' ? (
+              <>Not saved, showing the latest version</>
             ) : (
               <>
                 <span className="check-icon">✓</span>
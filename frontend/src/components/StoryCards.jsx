@@ -1,7 +1,8 @@
-import React from 'react';
+import React, { useEffect, useState } from 'react';
 import './StoryCards.css';
+import { listStories, readStory } from '../api';
 
-// Mock stories data
+// Shown when the story API is not reachable
 const mockStories = [
   {
     id: 1,
@@ -88,16 +89,44 @@ Qubit paused. "That's... theoretically impossible with current measurement tools
   }
 ];
 
-function StoryCards({ onSelectStory }) {
+function StoryCards({ onSelectStory, refreshKey }) {
+  const [stories, setStories] = useState([]);
+  const [offline, setOffline] = useState(false);
+
+  useEffect(() => {
+    listStories()
+      .then(({ stories }) => {
+        setStories(stories);
+        setOffline(false);
+      })
+      .catch(() => {
+        setStories(mockStories);
+        setOffline(true);
+      });
+  }, [refreshKey]);
+
+  // The catalog only carries excerpts; fetch the full text when a card is opened
+  const handleSelect = async (story) => {
+    if (offline) {
+      onSelectStory(story);
+      return;
+    }
+    try {
+      onSelectStory(await readStory(story.name));
+    } catch {
+      onSelectStory(story);
+    }
+  };
+
   return (
     <div className="story-cards-container">
       <h2 className="section-title">Recent Stories</h2>
       <div className="story-cards">
-        {mockStories.map((story) => (
+        {stories.map((story) => (
           <div 
             key={story.id}
             className="story-card"
-            onClick={() => onSelectStory(story)}
+            onClick={() => handleSelect(story)}
           >
             <div className="card-header">
               <h3 className="card-title">{story.topic}</h3>
@@ -4,4 +4,10 @@ import react from '@vitejs/plugin-react'
 // https://vite.dev/config/
 export default defineConfig({
   plugins: [react()],
+  server: {
+    // The story API (python main.py serve)
+    proxy: {
+      '/api': 'http://localhost:8000',
+    },
+  },
 })
@@ -0,0 +1,279 @@
+"""SQLite Identity Store - Row-level identity storage shared by many workers
+
+Drop-in alternative to the flat-file IdentityStore (same read/write API),
+enabled with IDENTITY_BACKEND=sqlite. One WAL-mode database holds:
+
+- topics, emotions, traits, memories: one row per entry with its list
+  position, latest score and created/updated timestamps
+- identity_versions: a version counter per kind (optimistic concurrency)
+- identity_history: every add/remove, so identity evolution is auditable
+
+Evolution becomes a handful of INSERT/DELETE/UPDATE statements inside one
+IMMEDIATE transaction instead of a full file rewrite, and any number of
+processes can share one identity. On first use each empty table is seeded
+from its text file.
+"""
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from identity_store import IDENTITY_FILES, StaleWriteError, UpdateResult
+
+
+# Identity kind -> table
+TABLES = {
+    "topics": "topics",
+    "emotions": "emotions",
+    "personality": "traits",
+    "memories": "memories",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS {table} (
+    id INTEGER PRIMARY KEY,
+    text TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    score REAL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_{table}_position ON {table}(position);
+"""
+
+META_SCHEMA = """
+CREATE TABLE IF NOT EXISTS identity_versions (
+    kind TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS identity_history (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    action TEXT NOT NULL,
+    text TEXT NOT NULL,
+    changed_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_history_kind ON identity_history(kind, version);
+"""
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class SQLiteIdentityStore:
+    """Identity kinds as tables in one WAL-mode SQLite database"""
+
+    def __init__(self, db_path: str = "identity.db", import_dir: Optional[str] = "."):
+        self.db_path = db_path
+        self.import_dir = import_dir
+        self._local = threading.local()
+        self._init_schema()
+
+    # -- connection ----------------------------------------------------------
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self) -> None:
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # executescript() would commit, so run the DDL statement by statement
+            for statement in META_SCHEMA.split(";"):
+                if statement.strip():
+                    conn.execute(statement)
+            for kind, table in TABLES.items():
+                for statement in SCHEMA.format(table=table).split(";"):
+                    if statement.strip():
+                        conn.execute(statement)
+                conn.execute(
+                    "INSERT OR IGNORE INTO identity_versions(kind, version) VALUES (?, 0)", (kind,)
+                )
+                self._seed_from_file(conn, kind, table)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _seed_from_file(self, conn: sqlite3.Connection, kind: str, table: str) -> None:
+        """Import <kind>.txt into an empty table (one-time migration)"""
+        if self.import_dir is None:
+            return
+        if conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone():
+            return
+        path = os.path.join(self.import_dir, IDENTITY_FILES[kind])
+        if not os.path.exists(path):
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            lines = [line.strip() for line in f.read().split("\n") if line.strip()]
+        if lines:
+            self._apply_diff(conn, kind, table, [], lines)
+
+    # -- reads ---------------------------------------------------------------
+
+    def _version(self, conn: sqlite3.Connection, kind: str) -> int:
+        row = conn.execute("SELECT version FROM identity_versions WHERE kind = ?", (kind,)).fetchone()
+        return row[0] if row else 0
+
+    def _rows(self, conn: sqlite3.Connection, table: str) -> List[Tuple[int, str]]:
+        return conn.execute(f"SELECT id, text FROM {table} ORDER BY position, id").fetchall()
+
+    def read_versioned(self, name: str) -> Tuple[List[str], str]:
+        table = TABLES[name]
+        conn = self._conn()
+        conn.execute("BEGIN")
+        try:
+            lines = [text for _, text in self._rows(conn, table)]
+            version = self._version(conn, name)
+        finally:
+            conn.execute("COMMIT")
+        return lines, str(version)
+
+    def read_lines(self, name: str) -> List[str]:
+        return self.read_versioned(name)[0]
+
+    def read_scored(self, name: str) -> List[Dict]:
+        """Entries with score and timestamps, in list order"""
+        rows = self._conn().execute(
+            f"SELECT text, score, created_at, updated_at FROM {TABLES[name]} ORDER BY position, id"
+        ).fetchall()
+        return [
+            {"text": t, "score": s, "created_at": c, "updated_at": u}
+            for t, s, c, u in rows
+        ]
+
+    def read_scores(self, name: str) -> Dict[str, float]:
+        """Latest score per entry (entries never scored are left out)"""
+        rows = self._conn().execute(
+            f"SELECT text, score FROM {TABLES[name]} WHERE score IS NOT NULL"
+        ).fetchall()
+        return dict(rows)
+
+    def history(self, name: str, limit: int = 50) -> List[Dict]:
+        rows = self._conn().execute(
+            "SELECT version, action, text, changed_at FROM identity_history "
+            "WHERE kind = ? ORDER BY id DESC LIMIT ?",
+            (name, limit),
+        ).fetchall()
+        return [{"version": v, "action": a, "text": t, "changed_at": c} for v, a, t, c in rows]
+
+    # -- writes --------------------------------------------------------------
+
+    def _apply_diff(self, conn, kind: str, table: str, current: List[Tuple[int, str]], new_lines: List[str]) -> int:
+        """Incremental row changes turning `current` into `new_lines`; returns new version"""
+        now = _now()
+        version = self._version(conn, kind) + 1
+
+        remaining: Dict[str, List[int]] = {}
+        for row_id, text in current:
+            remaining.setdefault(text, []).append(row_id)
+
+        for position, text in enumerate(new_lines):
+            ids = remaining.get(text)
+            if ids:
+                row_id = ids.pop(0)
+                conn.execute(
+                    f"UPDATE {table} SET position = ? WHERE id = ? AND position != ?",
+                    (position, row_id, position),
+                )
+            else:
+                conn.execute(
+                    f"INSERT INTO {table}(text, position, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                    (text, position, now, now),
+                )
+                conn.execute(
+                    "INSERT INTO identity_history(kind, version, action, text, changed_at) VALUES (?, ?, 'add', ?, ?)",
+                    (kind, version, text, now),
+                )
+
+        for text, ids in remaining.items():
+            for row_id in ids:
+                conn.execute(f"DELETE FROM {table} WHERE id = ?", (row_id,))
+                conn.execute(
+                    "INSERT INTO identity_history(kind, version, action, text, changed_at) VALUES (?, ?, 'remove', ?, ?)",
+                    (kind, version, text, now),
+                )
+
+        conn.execute("UPDATE identity_versions SET version = ? WHERE kind = ?", (version, kind))
+        return version
+
+    def _write(self, name: str, compute: Callable[[List[str], str], List[str]]) -> Tuple[List[str], str, str]:
+        table = TABLES[name]
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")  # takes the database write lock
+        try:
+            current = self._rows(conn, table)
+            current_version = str(self._version(conn, name))
+            new_lines = [line.strip() for line in compute([t for _, t in current], current_version) if line.strip()]
+            version = self._apply_diff(conn, name, table, current, new_lines)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return new_lines, str(version), current_version
+
+    def write_lines(self, name: str, lines: List[str], expected_version: Optional[str] = None) -> str:
+        def compute(current: List[str], current_version: str) -> List[str]:
+            if expected_version is not None and current_version != expected_version:
+                raise StaleWriteError(f"{name} changed since it was loaded")
+            return lines
+
+        return self._write(name, compute)[1]
+
+    def update_lines(
+        self,
+        name: str,
+        mutate: Callable[[List[str]], List[str]],
+        expected_version: Optional[str] = None,
+    ) -> UpdateResult:
+        new_lines, version, previous = self._write(name, lambda current, _: mutate(list(current)))
+        merged = expected_version is not None and expected_version != previous
+        return UpdateResult(new_lines, version, merged)
+
+    def append_line(self, name: str, line: str) -> None:
+        self.update_lines(name, lambda lines: lines + [line])
+
+    def record_scores(self, name: str, scores: Dict[str, float]) -> None:
+        """Store the latest relevance score for each entry"""
+        if not scores:
+            return
+        now = _now()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for text, score in scores.items():
+                try:
+                    value = float(score)
+                except (TypeError, ValueError):
+                    continue
+                conn.execute(
+                    f"UPDATE {TABLES[name]} SET score = ?, updated_at = ? WHERE text = ?",
+                    (value, now, text),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Nothing cached - every read hits the database"""
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+__all__ = ["SQLiteIdentityStore", "TABLES"]
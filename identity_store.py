@@ -0,0 +1,290 @@
+"""Identity Store - Cached, locked and atomic access to the identity files
+
+The identity lives in small newline-delimited text files (personality,
+emotions, topics, memories) that several runs may update at once.
+
+- Reads go through an in-memory cache invalidated whenever a file's
+  mtime/size/inode changes (one os.stat() per read on a hit)
+- Writes take an advisory lock (<file>.lock) and replace the file
+  atomically (write to a temp file in the same directory, then rename),
+  so readers never see a truncated file
+- Every read returns a content version; write_lines() rejects a write
+  whose expected version is stale, update_lines() re-reads under the lock
+  and re-applies the change on top of whatever is there (merge)
+- Per-entry scores (relevance, salience) live in a <name>.scores.json sidecar
+"""
+import hashlib
+import json
+import os
+import stat
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+
+IDENTITY_FILES = {
+    "personality": "personality.txt",
+    "emotions": "emotions.txt",
+    "topics": "topics.txt",
+    "memories": "memories.txt",
+}
+
+FileSignature = Tuple[int, int, int]  # (mtime_ns, size, inode)
+
+class StaleWriteError(Exception):
+    """The file changed between the caller's read and its write"""
+
+
+@dataclass
+class UpdateResult:
+    """Outcome of update_lines()"""
+    lines: List[str]
+    version: str
+    merged: bool  # True if the file had changed since the caller loaded it
+
+
+# ============================================================================
+# LOW-LEVEL FILE PRIMITIVES
+# ============================================================================
+
+@contextmanager
+def file_lock(path: str, timeout: float = 30.0):
+    """Exclusive advisory lock on <path>.lock (blocks other processes too)"""
+    lock_path = path + ".lock"
+    os.makedirs(os.path.dirname(lock_path) or ".", exist_ok=True)
+    with open(lock_path, "a+b") as lock_file:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if os.name == "nt":
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+                else:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Timed out waiting for lock on {path}")
+                time.sleep(0.005)
+        try:
+            yield
+        finally:
+            if os.name == "nt":
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def atomic_write(path: str, content: str) -> None:
+    """Replace path with content via temp file + rename (never half-written)"""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    # Created 0666 minus the umask like any new file (mkstemp would make it 0600)
+    tmp_path = os.path.join(directory, f".{os.urandom(8).hex()}.tmp")
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o666)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            # A replaced file keeps its own mode
+            try:
+                os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+            except FileNotFoundError:
+                pass
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def is_identity_file(path: str) -> bool:
+    """True for the shared identity files (the only files written concurrently)"""
+    return os.path.normpath(path) in IDENTITY_FILES.values()
+
+
+def locked_append(path: str, content: str) -> None:
+    """Append under the file lock"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with file_lock(path):
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def content_version(content: str) -> str:
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()[:16]
+
+
+def _parse_lines(content: str) -> List[str]:
+    return [line.strip() for line in content.split("\n") if line.strip()]
+
+
+# ============================================================================
+# STORE
+# ============================================================================
+
+class IdentityStore:
+    """Identity files with a signature-keyed read cache and locked writes"""
+
+    def __init__(self, base_dir: str = "."):
+        self.base_dir = base_dir
+        self._entries: Dict[str, Tuple[FileSignature, List[str], str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, name: str) -> str:
+        return os.path.join(self.base_dir, IDENTITY_FILES.get(name, name))
+
+    # -- reads ---------------------------------------------------------------
+
+    def read_versioned(self, name: str) -> Tuple[List[str], str]:
+        """(non-empty stripped lines, content version); ([], version of "") if missing"""
+        path = self.path_for(name)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return [], content_version("")
+        signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+
+        with self._lock:
+            cached = self._entries.get(path)
+            if cached and cached[0] == signature:
+                self.hits += 1
+                return list(cached[1]), cached[2]
+
+        with open(path, "r", encoding="utf-8") as f:
+            content = f.read()
+        lines, version = _parse_lines(content), content_version(content)
+
+        with self._lock:
+            self._entries[path] = (signature, lines, version)
+            self.misses += 1
+        return list(lines), version
+
+    def read_lines(self, name: str) -> List[str]:
+        """Non-empty, stripped lines of an identity file ([] if missing)"""
+        return self.read_versioned(name)[0]
+
+    def _read_fresh(self, path: str) -> Tuple[List[str], str]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                content = f.read()
+        except FileNotFoundError:
+            content = ""
+        return _parse_lines(content), content_version(content)
+
+    # -- writes --------------------------------------------------------------
+
+    def write_lines(self, name: str, lines: List[str], expected_version: Optional[str] = None) -> str:
+        """Atomically replace a file; raise StaleWriteError if it changed since expected_version"""
+        path = self.path_for(name)
+        content = "\n".join(lines) + "\n" if lines else ""
+        with file_lock(path):
+            if expected_version is not None:
+                _, current_version = self._read_fresh(path)
+                if current_version != expected_version:
+                    raise StaleWriteError(f"{path} changed since it was loaded")
+            atomic_write(path, content)
+        self.invalidate(name)
+        return content_version(content)
+
+    def update_lines(
+        self,
+        name: str,
+        mutate: Callable[[List[str]], List[str]],
+        expected_version: Optional[str] = None,
+    ) -> UpdateResult:
+        """Read-modify-write under the lock; mutate() always sees the latest lines"""
+        path = self.path_for(name)
+        with file_lock(path):
+            current, current_version = self._read_fresh(path)
+            new_lines = mutate(list(current))
+            content = "\n".join(new_lines) + "\n" if new_lines else ""
+            atomic_write(path, content)
+        self.invalidate(name)
+        merged = expected_version is not None and expected_version != current_version
+        return UpdateResult(new_lines, content_version(content), merged)
+
+    def append_line(self, name: str, line: str) -> None:
+        locked_append(self.path_for(name), line.strip() + "\n")
+        self.invalidate(name)
+
+    # -- scores (sidecar <name>.scores.json next to the file) ------------------
+
+    def scores_path_for(self, name: str) -> str:
+        return os.path.splitext(self.path_for(name))[0] + ".scores.json"
+
+    def read_scores(self, name: str) -> Dict[str, float]:
+        """Latest score per entry ({} if none recorded)"""
+        try:
+            with open(self.scores_path_for(name), "r", encoding="utf-8") as f:
+                scores = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+        return scores if isinstance(scores, dict) else {}
+
+    def record_scores(self, name: str, scores: Dict[str, float]) -> None:
+        """Merge scores into the sidecar, dropping entries no longer in the file"""
+        clean = {}
+        for text, score in (scores or {}).items():
+            try:
+                clean[text] = float(score)
+            except (TypeError, ValueError):
+                continue
+        if not clean:
+            return
+        path = self.scores_path_for(name)
+        with file_lock(path):
+            current = set(self._read_fresh(self.path_for(name))[0])
+            merged = {t: s for t, s in {**self.read_scores(name), **clean}.items() if t in current}
+            atomic_write(path, json.dumps(merged, indent=2, ensure_ascii=False))
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(self.path_for(name), None)
+
+
+# Global store instance
+_identity_store = None
+
+
+def get_identity_store():
+    """Get or create global identity store (backend chosen by IDENTITY_BACKEND)"""
+    global _identity_store
+    if _identity_store is None:
+        from config import IDENTITY_BACKEND, IDENTITY_DB_PATH
+
+        if IDENTITY_BACKEND == "sqlite":
+            from identity_db import SQLiteIdentityStore
+            _identity_store = SQLiteIdentityStore(IDENTITY_DB_PATH)
+        else:
+            _identity_store = IdentityStore()
+    return _identity_store
+
+
+__all__ = [
+    "IdentityStore",
+    "UpdateResult",
+    "StaleWriteError",
+    "IDENTITY_FILES",
+    "atomic_write",
+    "file_lock",
+    "is_identity_file",
+    "locked_append",
+    "get_identity_store",
+]
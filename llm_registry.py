@@ -0,0 +1,222 @@
+"""Shared Chat Model Registry - Long-lived ChatOpenAI clients over one HTTP pool
+
+Every node used to build its own ChatOpenAI, and with it its own HTTP
+connection pool (new TCP + TLS handshake per client). The registry hands out
+one client per (model, temperature, max_tokens) key and all clients share a
+single keep-alive pool, so a story run reuses a handful of warm connections.
+
+Connection reuse is observed through httpcore's public "trace" request
+extension: every request is counted, and so is every TCP connect / TLS
+handshake the pool actually performs. Every client also charges its calls
+and tokens to the current run budget (run_budget.py).
+"""
+import threading
+from dataclasses import dataclass, asdict
+from typing import Dict, Optional, Tuple
+
+import httpx
+from openai import DefaultAsyncHttpxClient, DefaultHttpxClient
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_openai import ChatOpenAI
+
+from config import (
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE,
+    MODEL_NAME,
+)
+from run_budget import current_budget
+
+
+ModelKey = Tuple[str, float, Optional[int]]
+
+
+@dataclass
+class ConnectionStats:
+    """Counters for the shared HTTP pool"""
+    requests: int = 0
+    connections_opened: int = 0
+    tls_handshakes: int = 0
+    clients_created: int = 0
+    client_lookups: int = 0
+
+    @property
+    def reused_requests(self) -> int:
+        """Requests served over an already-open connection"""
+        return max(self.requests - self.connections_opened, 0)
+
+    @property
+    def reuse_ratio(self) -> float:
+        return self.reused_requests / self.requests if self.requests else 0.0
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["reused_requests"] = self.reused_requests
+        data["reuse_ratio"] = round(self.reuse_ratio, 3)
+        return data
+
+
+class RunBudgetCallbackHandler(BaseCallbackHandler):
+    """Charges every chat-model call and its tokens to the current run budget"""
+
+    raise_error = True  # BudgetExceededError must stop the call
+    run_inline = True  # stay in the caller's context (async runs too)
+
+    def on_chat_model_start(self, serialized, messages, **kwargs) -> None:
+        budget = current_budget()
+        if budget is not None:
+            budget.start_llm_call()
+
+    def on_llm_end(self, response, **kwargs) -> None:
+        budget = current_budget()
+        if budget is None:
+            return
+        tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    tokens += usage.get("total_tokens", 0)
+        if not tokens and response.llm_output:
+            tokens = (response.llm_output.get("token_usage") or {}).get("total_tokens", 0)
+        budget.add_tokens(tokens)
+
+
+class ModelRegistry:
+    """Process-wide cache of ChatOpenAI clients sharing one keep-alive pool"""
+
+    def __init__(
+        self,
+        max_connections: int = HTTP_MAX_CONNECTIONS,
+        max_keepalive: int = HTTP_MAX_KEEPALIVE,
+        keepalive_expiry: float = HTTP_KEEPALIVE_EXPIRY,
+    ):
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._models: Dict[ModelKey, ChatOpenAI] = {}
+        self.stats = ConnectionStats()
+        self.budget_handler = RunBudgetCallbackHandler()
+
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http_client = DefaultHttpxClient(
+            limits=limits,
+            event_hooks={"request": [self._on_request]},
+        )
+        self.http_async_client = DefaultAsyncHttpxClient(
+            limits=limits,
+            event_hooks={"request": [self._on_async_request]},
+        )
+
+    # ------------------------------------------------------------------
+    # Client lookup
+    # ------------------------------------------------------------------
+
+    def get(
+        self,
+        temperature: float,
+        max_tokens: Optional[int] = None,
+        model: Optional[str] = None,
+    ) -> ChatOpenAI:
+        """Return the shared client for (model, temperature, max_tokens)"""
+        key = (model or MODEL_NAME, float(temperature), max_tokens)
+        self._bump("client_lookups")
+
+        llm = self._models.get(key)
+        if llm is not None:
+            return llm
+
+        with self._lock:
+            llm = self._models.get(key)
+            if llm is None:
+                llm = self._create(*key)
+                self._models[key] = llm
+                self._bump("clients_created")
+        return llm
+
+    def _create(self, model: str, temperature: float, max_tokens: Optional[int]) -> ChatOpenAI:
+        kwargs = {}
+        if max_tokens is not None:
+            kwargs["max_tokens"] = max_tokens
+        return ChatOpenAI(
+            model=model,
+            temperature=temperature,
+            http_client=self.http_client,
+            http_async_client=self.http_async_client,
+            callbacks=[self.budget_handler],
+            **kwargs,
+        )
+
+    def keys(self) -> list[ModelKey]:
+        return list(self._models)
+
+    # ------------------------------------------------------------------
+    # Connection accounting
+    # ------------------------------------------------------------------
+
+    def _bump(self, field_name: str) -> None:
+        with self._stats_lock:
+            setattr(self.stats, field_name, getattr(self.stats, field_name) + 1)
+
+    def _trace(self, event_name: str, info: dict) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            self._bump("connections_opened")
+        elif event_name == "connection.start_tls.complete":
+            self._bump("tls_handshakes")
+
+    async def _async_trace(self, event_name: str, info: dict) -> None:
+        # httpcore's async interface only accepts coroutine trace callbacks
+        self._trace(event_name, info)
+
+    def _on_request(self, request: httpx.Request) -> None:
+        self._bump("requests")
+        request.extensions["trace"] = self._trace
+
+    async def _on_async_request(self, request: httpx.Request) -> None:
+        self._bump("requests")
+        request.extensions["trace"] = self._async_trace
+
+    def close(self) -> None:
+        self.http_client.close()
+
+
+# Global registry instance
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Get or create the global model registry"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry()
+    return _registry
+
+
+def get_chat_model(
+    temperature: float,
+    max_tokens: Optional[int] = None,
+    model: Optional[str] = None,
+) -> ChatOpenAI:
+    """Shortcut for get_model_registry().get(...)"""
+    return get_model_registry().get(temperature, max_tokens=max_tokens, model=model)
+
+
+def get_connection_stats() -> dict:
+    """Connection-reuse counters for the shared HTTP pool"""
+    return get_model_registry().stats.to_dict()
+
+
+__all__ = [
+    "ModelRegistry",
+    "RunBudgetCallbackHandler",
+    "ConnectionStats",
+    "get_model_registry",
+    "get_chat_model",
+    "get_connection_stats",
+]
@@ -1,34 +1,173 @@
 import argparse
 import os
+import sys
+import time
+from collections import defaultdict
 from langchain_core.messages import HumanMessage
 
 from agent import build_agent, reset_tool_counters
+from llm_registry import get_connection_stats
+from research_cache import get_research_cache
+from search_cache import get_search_cache
+
+
+def print_stage_timings(timings: dict, total: float):
+    """Per-stage wall-clock summary (parallel stages overlap, so they can exceed total)"""
+    print(f"\n⏱️  Stage timings (total {total:.1f}s):")
+    for stage, seconds in sorted(timings.items(), key=lambda item: -item[1]):
+        print(f"   {stage:<34}{seconds:>7.1f}s")
+
+
+def print_connection_stats():
+    # Shared HTTP pool usage across every model call in this run
+    stats = get_connection_stats()
+    print(
+        f"\n🔌 LLM HTTP pool: {stats['requests']} requests over "
+        f"{stats['connections_opened']} connections "
+        f"({stats['reuse_ratio']:.0%} reused, {stats['clients_created']} clients)"
+    )
+    cache = get_search_cache()
+    if cache is not None:
+        search = cache.stats()
+        print(
+            f"🔎 Search cache: {search['hits']} hits, {search['misses']} misses "
+            f"({search['hit_ratio']:.0%} hit ratio)"
+        )
+    briefs = get_research_cache()
+    if briefs is not None:
+        research = briefs.stats()
+        print(f"📚 Research brief cache: {research['hits']} hits, {research['misses']} misses")
+
+
+def print_budget(budget):
+    """What this run consumed from its budget"""
+    used = budget.to_dict()["used"]
+    print(
+        f"💰 Run budget: {used['searches']} searches, {used['llm_calls']} LLM calls, "
+        f"{used['tokens']} tokens used ({budget.describe()})"
+    )
 
 
 def run_once(query: str, thread_id: str = "demo-run"):
     graph_app = build_agent()
-    reset_tool_counters()
+    budget = reset_tool_counters()
     initial_state = {"messages": [HumanMessage(content=query)]}
 
     # Stream events for visibility and capture final state
     final_state = None
+    timings = defaultdict(float)
+    start = last = time.perf_counter()
     for event in graph_app.stream(
         initial_state, {"configurable": {"thread_id": thread_id}}
     ):
-        for _, value in event.items():
+        now = time.perf_counter()
+        for node, value in event.items():
             print(value)
             final_state = value  # Capture the last state
 
+            # Attribute the time since the previous event to this step:
+            # tool steps by tool name, everything else to the orchestrator
+            messages = value.get("messages") if isinstance(value, dict) else None
+            tool_names = []
+            if isinstance(messages, list):
+                tool_names = [m.name for m in messages if getattr(m, "type", "") == "tool"]
+            for name in tool_names:
+                timings[f"tool:{name}"] += (now - last) / len(tool_names)
+            if not tool_names:
+                timings[f"orchestrator:{node}"] += now - last
+        last = now
+
     # Display final response from the single execution
     if final_state and "messages" in final_state:
         print("\nFinal response:\n", final_state["messages"][-1].content)
-    
+
+    print_stage_timings(timings, time.perf_counter() - start)
+    print_connection_stats()
+    print_budget(budget)
+
     # Show LangSmith trace link if enabled
     if os.getenv("LANGCHAIN_TRACING_V2") == "true":
         print(f"\n📊 View detailed trace at: https://smith.langchain.com/")
 
 
+def run_pipeline(topic: str = ""):
+    """Run the deterministic story pipeline (no orchestrator LLM)"""
+    from pipeline import build_pipeline, initial_pipeline_state
+
+    pipeline_app = build_pipeline()
+    budget = reset_tool_counters()
+
+    start = time.perf_counter()
+    result = pipeline_app.invoke(initial_pipeline_state(topic))
+    total = time.perf_counter() - start
+
+    print(f"\n📝 Topic: {result['topic']}\n")
+    print(result["story"])
+    print(f"\n---\nGeneration Log:\n{result['generation_log']}")
+    if not result["filename"]:
+        print(f"\n♻️ Not saved (near-duplicate of {result['duplicate_of']}); memory and identity left unchanged")
+    print(f"\n🧠 Memory: {result['memory_result']}")
+    print(f"\n{result['evolution_log']}")
+
+    print_stage_timings(result["stage_timings"], total)
+    print_connection_stats()
+    print_budget(budget)
+
+
+def main_batch(argv: list[str]):
+    """python main.py batch --count N --concurrency K [--pipeline]"""
+    from batch import run_batch
+
+    parser = argparse.ArgumentParser(
+        prog="main.py batch",
+        description="Generate many stories in one process with bounded concurrency.",
+    )
+    parser.add_argument("--count", type=int, default=5, help="Number of stories to generate.")
+    parser.add_argument("--concurrency", type=int, default=2, help="Stories in flight at once.")
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Use the parallel pipeline instead of the deep-agent orchestrator.",
+    )
+    parser.add_argument("--query", default="Create a story.", help="Prompt for deep-agent mode.")
+    parser.add_argument(
+        "--summary-path",
+        default="batch_summary.json",
+        help="Where to write the JSON throughput summary.",
+    )
+    args = parser.parse_args(argv)
+    run_batch(
+        args.count,
+        max(args.concurrency, 1),
+        use_pipeline=args.pipeline,
+        query=args.query,
+        summary_path=args.summary_path,
+    )
+
+
+def main_serve(argv: list[str]):
+    """python main.py serve [--host H] [--port P]"""
+    import uvicorn
+    from config import SERVER_HOST, SERVER_PORT
+
+    parser = argparse.ArgumentParser(
+        prog="main.py serve",
+        description="Serve the story HTTP API for the frontend.",
+    )
+    parser.add_argument("--host", default=SERVER_HOST, help="Interface to bind.")
+    parser.add_argument("--port", type=int, default=SERVER_PORT, help="Port to listen on.")
+    args = parser.parse_args(argv)
+    uvicorn.run("server:app", host=args.host, port=args.port)
+
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        main_batch(sys.argv[2:])
+        sys.exit(0)
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        main_serve(sys.argv[2:])
+        sys.exit(0)
+
     parser = argparse.ArgumentParser(
         description="Creative Story Writer Agent - Automatically generates stories based on interesting topics."
     )
@@ -43,6 +182,18 @@ if __name__ == "__main__":
         default="story-writer",
         help="Thread ID for LangGraph configurable context.",
     )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Run the fixed workflow as a parallel LangGraph DAG instead of the deep-agent orchestrator.",
+    )
+    parser.add_argument(
+        "--topic",
+        default="",
+        help="Topic for --pipeline mode (defaults to the topic scheduler's pick).",
+    )
     args = parser.parse_args()
-    run_once(args.query, thread_id=args.thread_id)
-
+    if args.pipeline:
+        run_pipeline(args.topic)
+    else:
+        run_once(args.query, thread_id=args.thread_id)
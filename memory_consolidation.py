@@ -0,0 +1,230 @@
+"""Memory Consolidation - Local clustering, incremental LLM merges
+
+CONSOLIDATE used to hand the whole memories file to an agent and ask it
+to re-cluster and rewrite everything. Here the clustering is local and
+only the clusters that actually changed reach the LLM:
+
+1. Embed memories (same embedder as the retrieval index) and group them
+   with average-linkage agglomerative clustering above a similarity
+   threshold
+2. A cluster is dirty if it has 2+ members and at least one of them was
+   not present after the previous consolidation (the watermark)
+3. Dirty clusters are merged in parallel, one LLM call each; clean
+   clusters and singletons are left untouched
+4. The merged memories replace their members in one locked update, and
+   the watermark records the store version and the settled memories
+
+A run over an unchanged store returns before clustering: zero LLM calls.
+"""
+import contextvars
+import hashlib
+import json
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from identity_store import atomic_write
+from memory_store import DEFAULT_SALIENCE
+
+
+MERGE_PROMPT = """These memories describe closely related experiences. Merge them into ONE
+richer first-person memory (1-2 concise sentences). Keep the emotionally
+significant details vivid; let trivial details fade.
+
+Memories:
+{memories}
+
+Return ONLY the merged memory."""
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="consolidate")
+_consolidation_lock = threading.Lock()
+
+
+@dataclass
+class ConsolidationResult:
+    """Outcome of consolidate_memories()"""
+    before: int
+    after: int
+    clusters: int = 0
+    merged_clusters: int = 0
+    llm_calls: int = 0
+    skipped: bool = False  # store unchanged since the watermark
+    merges: List[List[str]] = field(default_factory=list)
+
+    def summary(self) -> str:
+        if self.skipped:
+            return f"✅ Memories unchanged since last consolidation ({self.after} memories)"
+        return (
+            f"✅ Consolidated memories: {self.before} → {self.after} "
+            f"({self.merged_clusters} of {self.clusters} clusters merged, {self.llm_calls} LLM calls)"
+        )
+
+
+def fingerprint(memory: str) -> str:
+    return hashlib.sha1(memory.encode("utf-8")).hexdigest()[:16]
+
+
+# ============================================================================
+# CLUSTERING
+# ============================================================================
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return sum(x * y for x, y in zip(a, b)) / norm if norm else 0.0
+
+
+def cluster_memories(
+    vectors: List[List[float]],
+    threshold: float = 0.45,
+    max_cluster_size: int = 4,
+) -> List[List[int]]:
+    """Average-linkage agglomerative clustering; clusters of indices in input order"""
+    n = len(vectors)
+    sim = [[_cosine(vectors[i], vectors[j]) for j in range(n)] for i in range(n)]
+    clusters = [[i] for i in range(n)]
+
+    while True:
+        best, pair = threshold, None
+        for a in range(len(clusters)):
+            for b in range(a + 1, len(clusters)):
+                if len(clusters[a]) + len(clusters[b]) > max_cluster_size:
+                    continue
+                linkage = sum(sim[i][j] for i in clusters[a] for j in clusters[b])
+                linkage /= len(clusters[a]) * len(clusters[b])
+                if linkage >= best:
+                    best, pair = linkage, (a, b)
+        if pair is None:
+            break
+        a, b = pair
+        clusters[a] = sorted(clusters[a] + clusters[b])
+        del clusters[b]
+
+    return sorted(clusters, key=lambda c: c[0])
+
+
+# ============================================================================
+# WATERMARK
+# ============================================================================
+
+def load_watermark(path: str) -> Dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {"version": None, "settled": []}
+    return data if isinstance(data, dict) else {"version": None, "settled": []}
+
+
+def save_watermark(path: str, version: str, memories: List[str]) -> None:
+    atomic_write(path, json.dumps({
+        "version": version,
+        "settled": sorted(fingerprint(m) for m in memories),
+    }, indent=2))
+
+
+# ============================================================================
+# CONSOLIDATION
+# ============================================================================
+
+def _merge_cluster(model, members: List[str]) -> str:
+    response = model.invoke(MERGE_PROMPT.format(memories="\n".join(f"- {m}" for m in members)))
+    return " ".join(response.content.strip().strip('"').split())
+
+
+def consolidate_memories(
+    store=None,
+    model=None,
+    embedder=None,
+    watermark_path: Optional[str] = None,
+    threshold: float = 0.45,
+) -> ConsolidationResult:
+    """Merge changed clusters of similar memories (zero LLM calls if nothing changed)"""
+    if store is None:
+        from identity_store import get_identity_store
+        store = get_identity_store()
+    if watermark_path is None:
+        from config import MEMORY_WATERMARK_PATH
+        watermark_path = MEMORY_WATERMARK_PATH
+    if embedder is None:
+        from memory_index import get_memory_index
+        embedder = get_memory_index().embedder
+
+    with _consolidation_lock:
+        memories, version = store.read_versioned("memories")
+        watermark = load_watermark(watermark_path)
+        if watermark.get("version") == version:
+            return ConsolidationResult(len(memories), len(memories), skipped=True)
+
+        settled = set(watermark.get("settled", []))
+        clusters = cluster_memories(embedder(memories), threshold) if memories else []
+        dirty = [
+            [memories[i] for i in cluster]
+            for cluster in clusters
+            if len(cluster) > 1 and any(fingerprint(memories[i]) not in settled for i in cluster)
+        ]
+
+        result = ConsolidationResult(len(memories), len(memories), clusters=len(clusters))
+        if not dirty:
+            save_watermark(watermark_path, version, memories)
+            return result
+
+        if model is None:
+            from llm_registry import get_chat_model
+            model = get_chat_model(temperature=0.5)  # Higher temp for natural imperfection
+
+        futures = [
+            _executor.submit(contextvars.copy_context().run, _merge_cluster, model, members)
+            for members in dirty
+        ]
+        merges, failed = [], set()
+        for members, future in zip(dirty, futures):
+            result.llm_calls += 1
+            try:
+                merged = future.result()
+            except Exception as e:
+                print(f"⚠️  Memory merge failed ({e}), keeping {len(members)} memories as they are")
+                failed.update(members)  # stay dirty for the next run
+                continue
+            if merged:
+                merges.append((members, merged))
+
+        if not merges:
+            save_watermark(watermark_path, version, [m for m in memories if m not in failed])
+            return result
+
+        scores = store.read_scores("memories")
+
+        def apply(current: List[str]) -> List[str]:
+            for members, merged in merges:
+                present = [m for m in members if m in current]
+                if len(present) < 2:
+                    continue  # a concurrent update already changed this cluster
+                # The merged memory takes the place of the most recent member
+                position = max(current.index(m) for m in present)
+                current[position] = merged
+                for m in present:
+                    if m in current:
+                        current.remove(m)
+            return current
+
+        update = store.update_lines("memories", apply)
+        store.record_scores("memories", {
+            merged: max(scores.get(m, DEFAULT_SALIENCE) for m in members)
+            for members, merged in merges
+        })
+        save_watermark(watermark_path, update.version, [m for m in update.lines if m not in failed])
+
+        result.after = len(update.lines)
+        result.merged_clusters = len(merges)
+        result.merges = [members + [merged] for members, merged in merges]
+        return result
+
+
+__all__ = [
+    "ConsolidationResult",
+    "cluster_memories",
+    "consolidate_memories",
+    "fingerprint",
+]
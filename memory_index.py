@@ -0,0 +1,246 @@
+"""Memory Index - Local hybrid (BM25 + embedding) retrieval over memories
+
+Retrieval used to mean a nested agent reading the whole memories file into
+its prompt and picking lines by hand. This index answers the same question
+locally in well under a millisecond, with no LLM call:
+
+- BM25 over an inverted index (exact words, rare words weigh more)
+- Cosine similarity over embeddings (pluggable; the default is a local
+  feature-hashing embedder, so nothing leaves the machine)
+- Scores are blended with `alpha`; ties go to the more recent memory
+
+The index is synced from the identity store by diff: only memories that
+appeared since the last sync are tokenized and embedded, removed ones are
+dropped. NumPy is used for the cosine step when installed, with a
+pure-Python fallback otherwise.
+"""
+import math
+import re
+import threading
+import zlib
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # optional: pure-Python cosine below
+    np = None
+
+
+Embedder = Callable[[Sequence[str]], List[List[float]]]
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if len(t) > 2]
+
+
+# ============================================================================
+# EMBEDDINGS
+# ============================================================================
+
+class HashingEmbedder:
+    """Feature-hashed unigrams + bigrams, L2-normalized (deterministic, offline)"""
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def _embed_one(self, text: str) -> List[float]:
+        tokens = tokenize(text)
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        vector = [0.0] * self.dim
+        for feature in features:
+            h = zlib.crc32(feature.encode("utf-8"))
+            vector[h % self.dim] += 1.0 if (h >> 16) & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector))
+        return [v / norm for v in vector] if norm else vector
+
+    def __call__(self, texts: Sequence[str]) -> List[List[float]]:
+        return [self._embed_one(text) for text in texts]
+
+
+# ============================================================================
+# BM25
+# ============================================================================
+
+class BM25Index:
+    """Okapi BM25 over an incrementally maintained inverted index"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.lengths: Dict[int, int] = {}
+        self.total_length = 0
+
+    def add(self, doc_id: int, tokens: List[str]) -> None:
+        for term, tf in Counter(tokens).items():
+            self.postings.setdefault(term, {})[doc_id] = tf
+        self.lengths[doc_id] = len(tokens)
+        self.total_length += len(tokens)
+
+    def remove(self, doc_id: int, tokens: List[str]) -> None:
+        for term in set(tokens):
+            docs = self.postings.get(term)
+            if docs is not None:
+                docs.pop(doc_id, None)
+                if not docs:
+                    del self.postings[term]
+        self.total_length -= self.lengths.pop(doc_id, 0)
+
+    def scores(self, query_tokens: List[str]) -> Dict[int, float]:
+        n = len(self.lengths)
+        if not n:
+            return {}
+        avg_length = self.total_length / n or 1.0
+        scores: Dict[int, float] = {}
+        for term in set(query_tokens):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc_id, tf in docs.items():
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return scores
+
+
+# ============================================================================
+# HYBRID INDEX
+# ============================================================================
+
+class MemoryIndex:
+    """BM25 + cosine hybrid over a list of memory lines, synced by diff"""
+
+    def __init__(self, embedder: Optional[Embedder] = None, alpha: float = 0.6):
+        self.embedder = embedder or HashingEmbedder()
+        self.alpha = alpha  # weight of BM25 vs. embedding similarity
+        self.bm25 = BM25Index()
+        self.version: Optional[str] = None
+        self.embedded = 0  # texts sent to the embedder (for stats/tests)
+
+        self._ids: Dict[str, int] = {}
+        self._tokens: Dict[int, List[str]] = {}
+        self._vectors: Dict[int, List[float]] = {}
+        self._recency: Dict[int, int] = {}
+        self._next_id = 0
+        self._matrix = None  # (ids, numpy matrix), rebuilt lazily after changes
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def sync(self, memories: List[str], version: Optional[str] = None) -> None:
+        """Make the index match `memories`, embedding only the new ones"""
+        with self._lock:
+            if version is not None and version == self.version:
+                return
+            wanted = {m: i for i, m in enumerate(memories)}  # later duplicates win
+
+            for text in [t for t in self._ids if t not in wanted]:
+                doc_id = self._ids.pop(text)
+                self.bm25.remove(doc_id, self._tokens.pop(doc_id))
+                self._vectors.pop(doc_id)
+                self._recency.pop(doc_id)
+
+            new_texts = [t for t in wanted if t not in self._ids]
+            if new_texts:
+                vectors = self.embedder(new_texts)
+                self.embedded += len(new_texts)
+                for text, vector in zip(new_texts, vectors):
+                    doc_id = self._next_id
+                    self._next_id += 1
+                    self._ids[text] = doc_id
+                    self._tokens[doc_id] = tokenize(text)
+                    self._vectors[doc_id] = list(vector)
+                    self.bm25.add(doc_id, self._tokens[doc_id])
+
+            for text, position in wanted.items():
+                self._recency[self._ids[text]] = position
+            self._matrix = None
+            self.version = version
+
+    def _cosine(self, query_vector: List[float]) -> Dict[int, float]:
+        if not self._vectors:
+            return {}
+        if np is not None:
+            if self._matrix is None:
+                ids = list(self._vectors)
+                self._matrix = (ids, np.array([self._vectors[i] for i in ids], dtype=float))
+            ids, matrix = self._matrix
+            q = np.asarray(query_vector, dtype=float)
+            denom = np.linalg.norm(matrix, axis=1) * (np.linalg.norm(q) or 1.0)
+            sims = matrix @ q / np.where(denom == 0, 1.0, denom)
+            return dict(zip(ids, sims.tolist()))
+
+        q_norm = math.sqrt(sum(v * v for v in query_vector)) or 1.0
+        sims = {}
+        for doc_id, vector in self._vectors.items():
+            norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+            sims[doc_id] = sum(a * b for a, b in zip(query_vector, vector)) / (norm * q_norm)
+        return sims
+
+    def search(self, query: str, k: int = 5) -> List[str]:
+        """Top-k memories for query (the k most recent if nothing matches)"""
+        with self._lock:
+            if k <= 0 or not self._ids:
+                return []
+            by_id = {doc_id: text for text, doc_id in self._ids.items()}
+            most_recent = sorted(by_id, key=self._recency.get)[-k:]
+
+            if not query.strip():
+                return [by_id[i] for i in most_recent]
+
+            bm25 = self.bm25.scores(tokenize(query))
+            top_bm25 = max(bm25.values(), default=0.0) or 1.0
+            cosine = self._cosine(self.embedder([query])[0])
+
+            scored = []
+            for doc_id in by_id:
+                score = (
+                    self.alpha * bm25.get(doc_id, 0.0) / top_bm25
+                    + (1 - self.alpha) * max(cosine.get(doc_id, 0.0), 0.0)
+                )
+                if score > 0:
+                    scored.append((score, self._recency[doc_id], doc_id))
+            if not scored:
+                return [by_id[i] for i in most_recent]
+
+            scored.sort(reverse=True)
+            return [by_id[doc_id] for _, _, doc_id in scored[:k]]
+
+
+# Global index instance
+_memory_index = None
+_memory_index_lock = threading.Lock()
+
+
+def get_memory_index() -> MemoryIndex:
+    """Get or create global memory index"""
+    global _memory_index
+    if _memory_index is None:
+        with _memory_index_lock:
+            if _memory_index is None:
+                _memory_index = MemoryIndex()
+    return _memory_index
+
+
+def search_memories(query: str = "", k: int = 5) -> List[str]:
+    """Top-k stored memories for query, syncing the index with the store first"""
+    from identity_store import get_identity_store
+
+    memories, version = get_identity_store().read_versioned("memories")
+    index = get_memory_index()
+    index.sync(memories, version)
+    return index.search(query, k)
+
+
+__all__ = [
+    "BM25Index",
+    "HashingEmbedder",
+    "MemoryIndex",
+    "get_memory_index",
+    "search_memories",
+    "tokenize",
+]
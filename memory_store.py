@@ -0,0 +1,138 @@
+"""Memory Store - Deterministic append with capacity eviction
+
+Storing a memory used to be a nested agent loop: read memories.txt via a
+tool, rewrite the whole file via another, 2-4 LLM turns per story, and
+occasionally a dropped memory. This module does it in code:
+
+1. Compress the experience into one sentence plus a salience (1-10) -
+   at most one LLM call, and none when the experience is already short
+2. Append it inside the identity store's locked update_lines()
+3. Over capacity, evict the lowest-salience memory (oldest first on ties);
+   the memory just stored is never evicted
+4. Record its salience next to the memories (sidecar or SQLite score column)
+"""
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+
+DEFAULT_SALIENCE = 5.0
+MAX_DIRECT_LENGTH = 220  # experiences up to this long are stored verbatim
+
+COMPRESS_PROMPT = """Compress this experience into ONE vivid first-person memory sentence
+(max 30 words) and rate how significant it is to remember (1-10).
+
+Experience: {experience}
+Context: {context}
+
+Return ONLY JSON: {{"memory": "...", "salience": 7}}"""
+
+
+@dataclass
+class StoreResult:
+    """Outcome of store_memory()"""
+    memory: str
+    salience: float
+    total: int
+    evicted: List[str] = field(default_factory=list)
+    used_llm: bool = False
+
+    def summary(self) -> str:
+        evicted = f", evicted {len(self.evicted)}" if self.evicted else ""
+        return f"✅ Stored memory ({self.total} total{evicted}): {self.memory}"
+
+
+# ============================================================================
+# EVICTION
+# ============================================================================
+
+def evict(
+    memories: List[str],
+    salience: Dict[str, float],
+    capacity: int,
+    protect: Optional[str] = None,
+) -> Tuple[List[str], List[str]]:
+    """(kept, evicted): drop lowest-salience memories, oldest first, down to capacity"""
+    overflow = len(memories) - capacity
+    if overflow <= 0:
+        return memories, []
+
+    candidates = [i for i, memory in enumerate(memories) if memory != protect]
+    candidates.sort(key=lambda i: (salience.get(memories[i], DEFAULT_SALIENCE), i))
+    dropped = set(candidates[:overflow])
+    kept = [m for i, m in enumerate(memories) if i not in dropped]
+    evicted = [m for i, m in enumerate(memories) if i in dropped]
+    return kept, evicted
+
+
+# ============================================================================
+# COMPRESSION
+# ============================================================================
+
+def _first_sentence(text: str, limit: int = MAX_DIRECT_LENGTH) -> str:
+    text = " ".join(text.split())
+    sentence = re.split(r"(?<=[.!?])\s", text, maxsplit=1)[0]
+    return sentence if len(sentence) <= limit else sentence[: limit - 1].rsplit(" ", 1)[0] + "…"
+
+
+def compress_experience(experience: str, context: str = "", model=None) -> Tuple[str, float, bool]:
+    """(memory sentence, salience, used_llm) - one LLM call at most"""
+    text = " ".join(experience.split())
+    if len(text) <= MAX_DIRECT_LENGTH:
+        return text, DEFAULT_SALIENCE, False
+
+    if model is None:
+        from llm_registry import get_chat_model
+        model = get_chat_model(temperature=0.3)
+
+    try:
+        response = model.invoke(COMPRESS_PROMPT.format(experience=text, context=context or "None"))
+        content = response.content.strip()
+        match = re.search(r"\{.*\}", content, re.DOTALL)
+        data = json.loads(match.group(0) if match else content)
+        memory = " ".join(str(data.get("memory", "")).split())
+        salience = min(max(float(data.get("salience", DEFAULT_SALIENCE)), 1.0), 10.0)
+        if memory:
+            return memory, salience, True
+    except Exception:
+        pass
+    return _first_sentence(text), DEFAULT_SALIENCE, True
+
+
+# ============================================================================
+# STORE
+# ============================================================================
+
+def store_memory(
+    experience: str,
+    context: str = "",
+    store=None,
+    capacity: Optional[int] = None,
+    model=None,
+) -> StoreResult:
+    """Compress, append and evict in one locked update of the memories"""
+    if store is None:
+        from identity_store import get_identity_store
+        store = get_identity_store()
+    if capacity is None:
+        from config import MEMORY_CAPACITY
+        capacity = MEMORY_CAPACITY
+
+    memory, salience, used_llm = compress_experience(experience, context, model)
+    scores = {**store.read_scores("memories"), memory: salience}
+    evicted: List[str] = []
+
+    def append(memories: List[str]) -> List[str]:
+        if memory not in memories:
+            memories.append(memory)
+        kept, dropped = evict(memories, scores, capacity, protect=memory)
+        evicted[:] = dropped
+        return kept
+
+    result = store.update_lines("memories", append)
+    store.record_scores("memories", {memory: salience})
+    return StoreResult(memory, salience, len(result.lines), evicted, used_llm)
+
+
+__all__ = ["StoreResult", "compress_experience", "evict", "store_memory"]
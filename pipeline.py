@@ -0,0 +1,217 @@
+"""Story Pipeline - Deterministic LangGraph DAG over the same sub-agents
+
+The orchestrator deep agent plans a workflow that is in practice fixed
+(identity → memories → research → timestamp → writer → store → evolve),
+paying an LLM round trip with a growing message history for every step.
+This pipeline runs the same sub-agents as a static graph instead, with
+every independent step in parallel:
+
+    select_topic ─┬─ identity ─┐
+                  ├─ memories ─┼─ write ─┬─ store_memory ─┐
+                  └─ research ─┘         └─ evolve ───────┴─ END
+
+Each node records its wall-clock duration in `stage_timings`. A story the
+writer did not save (a rejected near-duplicate) ends the run after write,
+so nothing is remembered or evolved from it.
+"""
+import time
+from functools import wraps
+from typing import Annotated, TypedDict
+
+from langgraph.config import get_stream_writer
+from langgraph.graph import END, StateGraph
+
+from identity_store import get_identity_store
+from tools import get_timestamp
+from topic_scheduler import propose_next
+from sub_agents import (
+    evolve_identity,
+    memory_deep_agent,
+    research_deep_agent,
+    stream_story,
+)
+
+
+def merge_timings(left: dict, right: dict) -> dict:
+    """Reducer: parallel nodes each contribute their own stage timing"""
+    return {**(left or {}), **(right or {})}
+
+
+class PipelineState(TypedDict):
+    """State that flows through the story pipeline"""
+    # Inputs
+    topic: str  # Optional: chosen by the topic scheduler when empty
+
+    # Gathered context
+    personality: str
+    emotions: str
+    memories: str
+    research: str
+    timestamp: str
+
+    # Outputs
+    story: str
+    filename: str  # "" when the writer did not save the story
+    duplicate_of: str
+    generation_log: str
+    memory_result: str
+    evolution_log: str
+    stage_timings: Annotated[dict, merge_timings]
+
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+
+def timed_stage(name: str):
+    """Wrap a node so it reports its duration under stage_timings[name]"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(state: PipelineState) -> dict:
+            start = time.perf_counter()
+            updates = fn(state)
+            updates["stage_timings"] = {name: time.perf_counter() - start}
+            return updates
+        return wrapper
+    return decorator
+
+
+# ============================================================================
+# NODE FUNCTIONS
+# ============================================================================
+
+@timed_stage("select_topic")
+def select_topic(state: PipelineState) -> dict:
+    """Node 1: Least saturated topic (unless requested) and emotions, from the story history"""
+    if state.get("topic") and state.get("emotions"):
+        return {"topic": state["topic"]}
+    proposal = propose_next(state.get("topic") or None)
+    return {"topic": proposal.topic, "emotions": "\n".join(proposal.emotions)}
+
+
+@timed_stage("identity")
+def load_identity_stage(state: PipelineState) -> dict:
+    """Node 2a: Personality (and the full emotion palette if none were scheduled)"""
+    store = get_identity_store()
+    return {
+        "personality": "\n".join(store.read_lines("personality")),
+        "emotions": state.get("emotions") or "\n".join(store.read_lines("emotions")),
+        "timestamp": get_timestamp(),
+    }
+
+
+@timed_stage("memories")
+def retrieve_memories(state: PipelineState) -> dict:
+    """Node 2b: Memories relevant to the topic"""
+    return {"memories": memory_deep_agent(operation="retrieve", query=state["topic"])}
+
+
+@timed_stage("research")
+def research(state: PipelineState) -> dict:
+    """Node 2c: Research brief for the topic"""
+    return {"research": research_deep_agent(state["topic"])}
+
+
+@timed_stage("write")
+def write_story(state: PipelineState) -> dict:
+    """Node 3: Outline → draft → refine → save
+
+    Story tokens (and refine retries) are forwarded to callers streaming
+    with stream_mode="custom"; for everyone else the writer is a no-op.
+    """
+    emit = get_stream_writer()
+    result = {}
+    for event in stream_story(
+        topic=state["topic"],
+        research=state.get("research", ""),
+        personality=state.get("personality", ""),
+        emotions=state.get("emotions", ""),
+        memories=state.get("memories", ""),
+        timestamp=state.get("timestamp", "") or get_timestamp(),
+    ):
+        if event["type"] in ("delta", "attempt"):
+            emit(event)
+        elif event["type"] == "done":
+            result = event
+    return {
+        "story": result["story"].strip(),
+        "generation_log": result["log"],
+        "filename": result["filename"],
+        "duplicate_of": result["duplicate_of"],
+    }
+
+
+def after_write(state: PipelineState):
+    """Bookkeeping only for a story that was actually saved"""
+    return ["store_memory", "evolve"] if state.get("filename") else END
+
+
+@timed_stage("store_memory")
+def store_memory(state: PipelineState) -> dict:
+    """Node 4a: Remember the experience of writing this story"""
+    experience = f"Wrote a story about {state['topic']}: {state['story'][:400]}"
+    return {"memory_result": memory_deep_agent(
+        operation="store", experience=experience, context=state["topic"]
+    )}
+
+
+@timed_stage("evolve")
+def evolve(state: PipelineState) -> dict:
+    """Node 4b: Evolve emotions, topics and personality"""
+    return {"evolution_log": evolve_identity(
+        story_content=state["story"],
+        research_content=state.get("research", ""),
+        topic=state["topic"],
+    )}
+
+
+# ============================================================================
+# BUILD THE GRAPH
+# ============================================================================
+
+def build_pipeline():
+    """Build and compile the deterministic story pipeline"""
+    graph = StateGraph(PipelineState)
+
+    graph.add_node("select_topic", select_topic)
+    graph.add_node("identity", load_identity_stage)
+    graph.add_node("memories", retrieve_memories)
+    graph.add_node("research", research)
+    graph.add_node("write", write_story)
+    graph.add_node("store_memory", store_memory)
+    graph.add_node("evolve", evolve)
+
+    graph.set_entry_point("select_topic")
+
+    # Context gathering fans out once the topic is known
+    for node in ("identity", "memories", "research"):
+        graph.add_edge("select_topic", node)
+    graph.add_edge(["identity", "memories", "research"], "write")
+
+    # Post-story bookkeeping touches disjoint files
+    graph.add_conditional_edges("write", after_write, ["store_memory", "evolve", END])
+    graph.add_edge(["store_memory", "evolve"], END)
+
+    return graph.compile()
+
+
+def initial_pipeline_state(topic: str = "", emotions: str = "") -> PipelineState:
+    return {
+        "topic": topic,
+        "personality": "",
+        "emotions": emotions,
+        "memories": "",
+        "research": "",
+        "timestamp": "",
+        "story": "",
+        "filename": "",
+        "duplicate_of": "",
+        "generation_log": "",
+        "memory_result": "",
+        "evolution_log": "",
+        "stage_timings": {},
+    }
+
+
+__all__ = ["build_pipeline", "initial_pipeline_state", "PipelineState"]
@@ -0,0 +1,146 @@
+"""Research Cache - Reuse research briefs across near-duplicate topics
+
+Exact query caching (search_cache.py) still leaves the research agent
+running its searches and synthesis for "AI consciousness" right after
+"AI Consciousness Emergence". This cache stores the finished briefs
+(SUMMARY / KEY_FACTS / DISCOVERED_TOPICS) by topic and answers lookups
+for similar topics:
+
+- Topics are normalized (case, punctuation, stopwords, plurals)
+- Similarity blends word Jaccard and character-trigram Jaccard, so word
+  order and small inflections do not matter
+- Only briefs younger than the freshness window are reused
+
+A hit skips both the searches and the synthesis LLM calls.
+"""
+import json
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from identity_store import atomic_write, file_lock
+
+
+STOPWORDS = {
+    "a", "an", "and", "the", "of", "in", "on", "for", "to", "with", "about",
+    "into", "from", "by", "at", "its", "their", "how", "what", "why",
+}
+REQUIRED_SECTIONS = ("SUMMARY:", "KEY_FACTS:")
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_topic(topic: str) -> str:
+    words = []
+    for word in _WORD_RE.findall(topic.lower()):
+        if word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.append(word)
+    return " ".join(words)
+
+
+def _trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+def topic_similarity(a: str, b: str) -> float:
+    """0-1 similarity of two normalized topics"""
+    if a == b:
+        return 1.0
+    return 0.5 * _jaccard(set(a.split()), set(b.split())) + 0.5 * _jaccard(_trigrams(a), _trigrams(b))
+
+
+class ResearchCache:
+    """Research briefs in one JSON file, matched by topic similarity"""
+
+    def __init__(
+        self,
+        path: str = ".research_cache.json",
+        threshold: float = 0.6,
+        max_age_seconds: float = 3 * 86400.0,
+        max_entries: int = 200,
+    ):
+        self.path = path
+        self.threshold = threshold
+        self.max_age_seconds = max_age_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self) -> List[Dict]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return []
+        return entries if isinstance(entries, list) else []
+
+    def lookup(self, topic: str) -> Optional[Tuple[Dict, float]]:
+        """(entry, similarity) of the most similar fresh brief, or None"""
+        normalized = normalize_topic(topic)
+        now = time.time()
+        best, best_score = None, self.threshold
+        for entry in self._load():
+            if now - entry.get("created_at", 0) > self.max_age_seconds:
+                continue
+            score = topic_similarity(normalized, entry.get("normalized", ""))
+            if score >= best_score:
+                best, best_score = entry, score
+
+        with self._lock:
+            if best is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return best, best_score
+
+    def store(self, topic: str, brief: str) -> bool:
+        """Keep a brief for later topics; returns False for incomplete briefs"""
+        if not all(section in brief for section in REQUIRED_SECTIONS):
+            return False
+        normalized = normalize_topic(topic)
+        now = time.time()
+        with file_lock(self.path):
+            entries = [
+                e for e in self._load()
+                if e.get("normalized") != normalized and now - e.get("created_at", 0) <= self.max_age_seconds
+            ]
+            entries.append({"topic": topic, "normalized": normalized, "brief": brief, "created_at": now})
+            atomic_write(self.path, json.dumps(entries[-self.max_entries:], indent=2, ensure_ascii=False))
+        return True
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+# Global cache instance
+_research_cache = None
+
+
+def get_research_cache() -> Optional[ResearchCache]:
+    """Get or create global research cache (None when RESEARCH_CACHE_MAX_AGE is 0)"""
+    global _research_cache
+    if _research_cache is None:
+        from config import RESEARCH_CACHE_MAX_AGE, RESEARCH_CACHE_PATH, RESEARCH_CACHE_THRESHOLD
+
+        if RESEARCH_CACHE_MAX_AGE <= 0:
+            return None
+        _research_cache = ResearchCache(
+            RESEARCH_CACHE_PATH,
+            threshold=RESEARCH_CACHE_THRESHOLD,
+            max_age_seconds=RESEARCH_CACHE_MAX_AGE,
+        )
+    return _research_cache
+
+
+__all__ = ["ResearchCache", "get_research_cache", "normalize_topic", "topic_similarity"]
@@ -0,0 +1,164 @@
+"""Run Budget - Per-run limits on searches, LLM calls and tokens
+
+The search limit used to be a module-level counter reset at the start of
+each run, so concurrent stories in one process shared (and corrupted) a
+single budget. Budgets now live in a context variable:
+
+- start_run() gives the current context a fresh top-level budget; asyncio
+  tasks and LangChain/LangGraph worker threads inherit it through
+  contextvars, so every step of a story charges the same budget while
+  concurrent stories each have their own
+- run_scope() opens a child budget (e.g. for a nested research agent)
+  that has its own limits and also charges every budget above it
+- Counters are updated under a lock, so threads of one run never race
+
+A limit of None means unlimited.
+"""
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+
+class BudgetExceededError(RuntimeError):
+    """The run has used up its LLM-call or token budget"""
+
+
+# One lock for every budget: a charge updates a whole parent chain atomically
+_budget_lock = threading.Lock()
+
+
+class RunBudget:
+    """Usage counters with optional limits, chained to a parent budget"""
+
+    def __init__(
+        self,
+        max_searches: Optional[int] = None,
+        max_llm_calls: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        parent: Optional["RunBudget"] = None,
+    ):
+        self.limits = {"searches": max_searches, "llm_calls": max_llm_calls, "tokens": max_tokens}
+        self.used = {"searches": 0, "llm_calls": 0, "tokens": 0}
+        self.parent = parent
+
+    def _chain(self):
+        budget = self
+        while budget is not None:
+            yield budget
+            budget = budget.parent
+
+    def _left(self, kind: str) -> Optional[int]:
+        """Remaining units of kind across the chain (None if unlimited); call under the lock"""
+        left = None
+        for budget in self._chain():
+            limit = budget.limits[kind]
+            if limit is not None:
+                own = max(limit - budget.used[kind], 0)
+                left = own if left is None else min(left, own)
+        return left
+
+    # -- charging ------------------------------------------------------------
+
+    def acquire_searches(self, n: int = 1) -> int:
+        """Reserve up to n searches; returns how many were granted"""
+        with _budget_lock:
+            left = self._left("searches")
+            granted = n if left is None else min(n, left)
+            for budget in self._chain():
+                budget.used["searches"] += granted
+        return granted
+
+    def start_llm_call(self) -> None:
+        """Count one LLM call, or raise BudgetExceededError if none are left"""
+        with _budget_lock:
+            if self._left("llm_calls") == 0:
+                raise BudgetExceededError(f"LLM call budget exhausted ({self._describe()})")
+            if self._left("tokens") == 0:
+                raise BudgetExceededError(f"Token budget exhausted ({self._describe()})")
+            for budget in self._chain():
+                budget.used["llm_calls"] += 1
+
+    def add_tokens(self, n: int) -> None:
+        with _budget_lock:
+            for budget in self._chain():
+                budget.used["tokens"] += n
+
+    # -- reporting -----------------------------------------------------------
+
+    def remaining(self) -> Dict[str, Optional[int]]:
+        with _budget_lock:
+            return {kind: self._left(kind) for kind in self.limits}
+
+    def _describe(self) -> str:
+        parts = []
+        for kind, label in (("searches", "searches"), ("llm_calls", "LLM calls"), ("tokens", "tokens")):
+            left = self._left(kind)
+            if left is not None:
+                parts.append(f"{left} {label} left")
+        return ", ".join(parts) or "unlimited"
+
+    def describe(self) -> str:
+        """e.g. '2 searches left, 31 LLM calls left'"""
+        with _budget_lock:
+            return self._describe()
+
+    def to_dict(self) -> Dict:
+        with _budget_lock:
+            return {
+                "used": dict(self.used),
+                "limits": dict(self.limits),
+                "remaining": {kind: self._left(kind) for kind in self.limits},
+            }
+
+
+_current_budget: ContextVar[Optional[RunBudget]] = ContextVar("run_budget", default=None)
+
+
+def _default_limits() -> Dict[str, Optional[int]]:
+    from config import MAX_SEARCHES, RUN_MAX_LLM_CALLS, RUN_MAX_TOKENS
+
+    return {
+        "max_searches": MAX_SEARCHES,
+        "max_llm_calls": RUN_MAX_LLM_CALLS or None,
+        "max_tokens": RUN_MAX_TOKENS or None,
+    }
+
+
+def current_budget() -> Optional[RunBudget]:
+    """Budget of the run this code executes in (None outside any run)"""
+    return _current_budget.get()
+
+
+def start_run(**limits) -> RunBudget:
+    """Give the current context a fresh top-level budget (config limits by default)"""
+    budget = RunBudget(**(limits or _default_limits()))
+    _current_budget.set(budget)
+    return budget
+
+
+def get_run_budget() -> RunBudget:
+    """Current budget, starting a run with the default limits if there is none"""
+    return current_budget() or start_run()
+
+
+@contextmanager
+def run_scope(max_searches: Optional[int] = None, max_llm_calls: Optional[int] = None,
+              max_tokens: Optional[int] = None):
+    """Child budget for a nested agent; usage also counts against the enclosing run"""
+    budget = RunBudget(max_searches, max_llm_calls, max_tokens, parent=current_budget())
+    token = _current_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _current_budget.reset(token)
+
+
+__all__ = [
+    "BudgetExceededError",
+    "RunBudget",
+    "current_budget",
+    "get_run_budget",
+    "run_scope",
+    "start_run",
+]
@@ -0,0 +1,174 @@
+"""Search Cache - Content-addressed disk cache for Tavily results
+
+Story topics repeat a lot, and so do the research queries behind them.
+Every search is keyed on (query, max_results, topic, include_raw_content)
+- query case and whitespace normalized - and stored as one JSON file named
+by the key's hash:
+
+- Entries older than the TTL are treated as misses and deleted
+- A hit touches the file, so mtime is the last access time; when the
+  cache exceeds its entry or byte bound the least recently used go first
+- Hit/miss/eviction counters are kept per process (see stats())
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from identity_store import atomic_write
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def cache_key(query: str, max_results: int, topic: str, include_raw_content: bool) -> str:
+    params = {
+        "query": normalize_query(query),
+        "max_results": int(max_results),
+        "topic": topic,
+        "include_raw_content": bool(include_raw_content),
+    }
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class SearchCache:
+    """Disk-backed search results with TTL and LRU size bounds"""
+
+    def __init__(
+        self,
+        directory: str = ".search_cache",
+        ttl_seconds: float = 86400.0,
+        max_entries: int = 500,
+        max_bytes: int = 50 * 1024 * 1024,
+    ):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ".json")
+
+    def get(self, query: str, max_results: int, topic: str, include_raw_content: bool) -> Optional[Dict]:
+        path = self._path(cache_key(query, max_results, topic, include_raw_content))
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, ValueError):
+            entry = None
+
+        if entry is not None and time.time() - entry.get("stored_at", 0) > self.ttl_seconds:
+            self._remove(path)
+            entry = None
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass
+        return entry["result"]
+
+    def put(self, query: str, max_results: int, topic: str, include_raw_content: bool, result: Dict) -> None:
+        key = cache_key(query, max_results, topic, include_raw_content)
+        entry = {
+            "stored_at": time.time(),
+            "query": query,
+            "max_results": max_results,
+            "topic": topic,
+            "include_raw_content": include_raw_content,
+            "result": result,
+        }
+        atomic_write(self._path(key), json.dumps(entry, ensure_ascii=False))
+        self._enforce_bounds()
+
+    def fetch(self, client, query: str, max_results: int, topic: str = "general", include_raw_content: bool = False) -> Dict:
+        """Cached result, or client.search(...) stored on the way out"""
+        cached = self.get(query, max_results, topic, include_raw_content)
+        if cached is not None:
+            return cached
+        result = client.search(
+            query=query,
+            max_results=max_results,
+            topic=topic,
+            include_raw_content=include_raw_content,
+        )
+        self.put(query, max_results, topic, include_raw_content, result)
+        return result
+
+    def _remove(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _enforce_bounds(self) -> None:
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+
+        total_bytes = sum(size for _, size, _ in entries)
+        entries.sort()  # least recently used first
+        while entries and (len(entries) > self.max_entries or total_bytes > self.max_bytes):
+            _, size, path = entries.pop(0)
+            self._remove(path)
+            total_bytes -= size
+            with self._lock:
+                self.evictions += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# Global cache instance
+_search_cache = None
+
+
+def get_search_cache() -> Optional[SearchCache]:
+    """Get or create global search cache (None when SEARCH_CACHE_TTL is 0)"""
+    global _search_cache
+    if _search_cache is None:
+        from config import (
+            SEARCH_CACHE_DIR,
+            SEARCH_CACHE_MAX_BYTES,
+            SEARCH_CACHE_MAX_ENTRIES,
+            SEARCH_CACHE_TTL,
+        )
+
+        if SEARCH_CACHE_TTL <= 0:
+            return None
+        _search_cache = SearchCache(
+            SEARCH_CACHE_DIR,
+            ttl_seconds=SEARCH_CACHE_TTL,
+            max_entries=SEARCH_CACHE_MAX_ENTRIES,
+            max_bytes=SEARCH_CACHE_MAX_BYTES,
+        )
+    return _search_cache
+
+
+__all__ = ["SearchCache", "cache_key", "get_search_cache", "normalize_query"]
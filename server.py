@@ -0,0 +1,263 @@
+"""Story API - ASGI HTTP service backing the frontend PWA
+
+Endpoints (JSON unless noted):
+
+    POST /api/stories/generate        {"topic"?, "mode"?} → 202 {"job": ...}
+    GET  /api/jobs/{id}               job status (and result once done)
+    GET  /api/jobs/{id}/events        Server-Sent Events: queued, started,
+                                      stage / tool, delta (story tokens) /
+                                      attempt (refine retry: later deltas
+                                      replace the text), done | failed
+    GET  /api/stories                 ?limit&cursor&topic&since&until (catalog page)
+    GET  /api/stories/{name}          one story with its full text
+    GET  /api/search                  ?q&limit&kind (full-text search)
+    GET  /api/identity                personality, emotions, topics, memories + versions
+    PUT  /api/identity/{name}         {"lines": [...], "version"?} → 409 if stale
+    GET  /api/health                  job counts
+
+The pipeline and the deep agent are compiled once at startup and shared by
+a fixed pool of generation workers (see story_jobs.py); everything else is
+served from the story catalog, search index and identity store, in the
+threadpool Starlette runs plain `def` endpoints in.
+
+Usage:
+    python main.py serve [--host 127.0.0.1] [--port 8000]
+    uvicorn server:app
+"""
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from identity_store import StaleWriteError, get_identity_store
+from story_jobs import JobManager, graph_runner
+
+
+IDENTITY_NAMES = ("personality", "emotions", "topics", "memories")
+MODES = ("pipeline", "agent")
+HEARTBEAT_SECONDS = 15.0  # SSE comment so proxies keep idle streams open
+
+
+def error(status: int, message: str) -> JSONResponse:
+    return JSONResponse({"error": message}, status_code=status)
+
+
+def _int_param(request: Request, name: str, default: int, upper: int = 100) -> int:
+    try:
+        return min(max(int(request.query_params.get(name, default)), 1), upper)
+    except ValueError:
+        return default
+
+
+# ============================================================================
+# GENERATION JOBS
+# ============================================================================
+
+async def generate_story(request: Request) -> JSONResponse:
+    try:
+        body = await request.json()
+    except json.JSONDecodeError:
+        body = {}
+    if not isinstance(body, dict):
+        return error(400, "Expected a JSON object")
+    topic = str(body.get("topic") or "").strip()
+    mode = body.get("mode") or request.app.state.default_mode
+    if mode not in MODES:
+        return error(400, f"mode must be one of {', '.join(MODES)}")
+    try:
+        job = request.app.state.jobs.submit(topic, mode)
+    except asyncio.QueueFull:
+        return error(429, "Too many stories queued, try again later")
+    return JSONResponse({"job": job.to_dict()}, status_code=202, headers={
+        "Location": f"/api/jobs/{job.id}",
+    })
+
+
+async def job_status(request: Request) -> JSONResponse:
+    job = request.app.state.jobs.get(request.path_params["job_id"])
+    if job is None:
+        return error(404, "Unknown job")
+    return JSONResponse({"job": job.to_dict()})
+
+
+async def job_events(request: Request):
+    jobs = request.app.state.jobs
+    job = jobs.get(request.path_params["job_id"])  # resolved once: eviction can't break the stream
+    if job is None:
+        return error(404, "Unknown job")
+    # A reconnecting EventSource sends the id of the last event it received
+    try:
+        after = int(request.headers.get("last-event-id", -1)) + 1
+    except ValueError:
+        after = 0
+
+    async def stream():
+        events = jobs.follow(job, after).__aiter__()
+        pending = asyncio.ensure_future(events.__anext__())
+        try:
+            while True:
+                done, _ = await asyncio.wait({pending}, timeout=HEARTBEAT_SECONDS)
+                if not done:
+                    yield ": keep-alive\n\n"
+                    continue
+                try:
+                    index, event = pending.result()
+                except StopAsyncIteration:
+                    return
+                yield f"id: {index}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+                pending = asyncio.ensure_future(events.__anext__())
+        finally:
+            pending.cancel()
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+
+
+# ============================================================================
+# STORIES
+# ============================================================================
+
+def list_stories(request: Request) -> JSONResponse:
+    from story_catalog import get_story_catalog
+
+    params = request.query_params
+    page = get_story_catalog().list_stories(
+        limit=_int_param(request, "limit", 20),
+        cursor=params.get("cursor") or None,
+        topic=params.get("topic") or None,
+        since=params.get("since") or None,
+        until=params.get("until") or None,
+    )
+    return JSONResponse(page.to_dict())
+
+
+def read_story(request: Request) -> JSONResponse:
+    from config import STORIES_DIR
+    from story_catalog import get_story_catalog
+
+    name = request.path_params["name"]
+    if "/" in name or "\\" in name:
+        return error(404, "Unknown story")
+    catalog = get_story_catalog()
+    filename = f"{STORIES_DIR}/{name}"
+    record, content = catalog.get(filename), catalog.read_story(filename)
+    if record is None or content is None:
+        return error(404, "Unknown story")
+    return JSONResponse({"story": {**record.to_dict(), "content": content}})
+
+
+def search(request: Request) -> JSONResponse:
+    from story_search import search_archive
+
+    kind = request.query_params.get("kind", "all")
+    if kind not in ("stories", "memories", "all"):
+        return error(400, "kind must be stories, memories or all")
+    hits = search_archive(request.query_params.get("q", ""), _int_param(request, "limit", 10), kind)
+    return JSONResponse({"hits": [hit.to_dict() for hit in hits]})
+
+
+# ============================================================================
+# IDENTITY
+# ============================================================================
+
+def read_identity(request: Request) -> JSONResponse:
+    store = get_identity_store()
+    identity = {}
+    for name in IDENTITY_NAMES:
+        lines, version = store.read_versioned(name)
+        identity[name] = {"lines": lines, "version": version}
+    return JSONResponse({"identity": identity})
+
+
+async def update_identity(request: Request) -> JSONResponse:
+    name = request.path_params["name"]
+    if name not in IDENTITY_NAMES:
+        return error(404, "Unknown identity file")
+    try:
+        body = await request.json()
+    except json.JSONDecodeError:
+        return error(400, "Expected a JSON object")
+    lines = body.get("lines") if isinstance(body, dict) else None
+    if not isinstance(lines, list) or not all(isinstance(line, str) for line in lines):
+        return error(400, "lines must be a list of strings")
+    lines = [line.strip() for line in lines if line.strip()]
+
+    def write() -> str:
+        return get_identity_store().write_lines(name, lines, expected_version=body.get("version"))
+
+    try:
+        version = await asyncio.get_running_loop().run_in_executor(None, write)
+    except StaleWriteError:
+        return error(409, f"{name} changed since it was loaded; reload and retry")
+    return JSONResponse({name: {"lines": lines, "version": version}})
+
+
+async def health(request: Request) -> JSONResponse:
+    return JSONResponse({"status": "ok", "jobs": request.app.state.jobs.stats()})
+
+
+# ============================================================================
+# APP
+# ============================================================================
+
+@asynccontextmanager
+async def lifespan(app: Starlette):
+    """Compile the graphs once and start the generation workers"""
+    from agent import build_agent
+    from config import SERVER_HISTORY, SERVER_QUEUE_LIMIT, SERVER_WORKERS
+    from pipeline import build_pipeline
+
+    # Sync graph nodes (and identity writes) run in the loop's default executor; size it
+    # for the nested fan-outs. Plain `def` endpoints use anyio's own thread pool instead
+    executor = ThreadPoolExecutor(max_workers=max(SERVER_WORKERS * 6, 8))
+    asyncio.get_running_loop().set_default_executor(executor)
+
+    graphs = {"pipeline": build_pipeline(), "agent": build_agent()}
+    jobs = JobManager(graph_runner(graphs), SERVER_WORKERS, SERVER_QUEUE_LIMIT, SERVER_HISTORY)
+    jobs.start()
+    app.state.jobs = jobs
+    try:
+        yield
+    finally:
+        await jobs.stop()
+        executor.shutdown(wait=False)
+
+
+def create_app() -> Starlette:
+    from config import SERVER_CORS_ORIGINS, SERVER_MODE
+
+    routes = [
+        Route("/api/stories/generate", generate_story, methods=["POST"]),
+        Route("/api/jobs/{job_id}", job_status),
+        Route("/api/jobs/{job_id}/events", job_events),
+        Route("/api/stories", list_stories),
+        Route("/api/stories/{name}", read_story),
+        Route("/api/search", search),
+        Route("/api/identity", read_identity),
+        Route("/api/identity/{name}", update_identity, methods=["PUT"]),
+        Route("/api/health", health),
+    ]
+    middleware = [Middleware(
+        CORSMiddleware,
+        allow_origins=[o.strip() for o in SERVER_CORS_ORIGINS.split(",") if o.strip()],
+        allow_methods=["GET", "POST", "PUT"],
+        allow_headers=["Content-Type", "Last-Event-ID"],
+    )]
+    app = Starlette(routes=routes, middleware=middleware, lifespan=lifespan)
+    app.state.default_mode = SERVER_MODE if SERVER_MODE in MODES else "pipeline"
+    return app
+
+
+app = create_app()
+
+
+__all__ = ["app", "create_app"]
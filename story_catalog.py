@@ -0,0 +1,355 @@
+"""Story Catalog - Indexed metadata for everything in stories/
+
+Listing the archive used to mean os.listdir + getsize on every file and
+re-reading each story to show an excerpt. save_story now records one row
+per story in a WAL-mode SQLite database:
+
+- filename, timestamp (the sortable YYYY-MM-DD_HH-MM-SS of the filename), topic
+- emotions the writer was given, token and word counts, a short excerpt
+- generation latency and a sha1 content hash
+
+Pages are keyset-paginated on (timestamp, id) over an index, newest first,
+optionally filtered by topic and date range, so listing 10k stories reads
+only the rows of the requested page. Stories written before the catalog
+existed (or copied in by hand) are picked up by sync(), which runs once per
+process and only opens files the catalog does not know yet.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass, asdict, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS stories (
+    id INTEGER PRIMARY KEY,
+    filename TEXT NOT NULL UNIQUE,
+    timestamp TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    topic_key TEXT NOT NULL,
+    emotions TEXT NOT NULL,
+    tokens INTEGER NOT NULL,
+    words INTEGER NOT NULL,
+    excerpt TEXT NOT NULL,
+    latency REAL,
+    content_hash TEXT NOT NULL,
+    added_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_stories_timestamp ON stories(timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_stories_topic ON stories(topic_key, timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_stories_hash ON stories(content_hash)
+"""
+
+COLUMNS = "id, filename, timestamp, topic, emotions, tokens, words, excerpt, latency, content_hash, added_at"
+
+_FILENAME_RE = re.compile(r"^(\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})_(.*?)(?:_\d+)?\.txt$")
+EXCERPT_CHARS = 200
+
+
+@dataclass
+class StoryRecord:
+    """Catalog row for one saved story"""
+    id: int
+    filename: str
+    timestamp: str
+    topic: str
+    emotions: List[str] = field(default_factory=list)
+    tokens: int = 0
+    words: int = 0
+    excerpt: str = ""
+    latency: Optional[float] = None
+    content_hash: str = ""
+    added_at: str = ""
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+@dataclass
+class StoryPage:
+    """One page of stories, newest first; pass next_cursor to get the next page"""
+    stories: List[StoryRecord]
+    next_cursor: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        return {"stories": [s.to_dict() for s in self.stories], "next_cursor": self.next_cursor}
+
+
+def topic_key(topic: str) -> str:
+    """Case- and punctuation-insensitive form used for topic filters"""
+    return " ".join(re.findall(r"[a-z0-9]+", topic.lower()))
+
+
+def make_excerpt(story: str, limit: int = EXCERPT_CHARS) -> str:
+    """Opening of the story on one line, cut at a word boundary"""
+    text = " ".join(story.split())
+    if len(text) <= limit:
+        return text
+    return text[:limit].rsplit(" ", 1)[0] + "…"
+
+
+def content_hash(story: str) -> str:
+    return hashlib.sha1(story.encode("utf-8")).hexdigest()
+
+
+def parse_story_filename(filename: str) -> Tuple[str, str]:
+    """(timestamp, topic) from 'stories/{timestamp}_{slug}[_{n}].txt' ('' if it does not match)"""
+    match = _FILENAME_RE.match(os.path.basename(filename))
+    if not match:
+        return "", ""
+    return match.group(1), match.group(2).replace("_", " ")
+
+
+def story_slug(topic: str) -> str:
+    """Filename form of a topic: lowercase, underscores, at most 50 characters"""
+    slug = topic.lower().replace(" ", "_").replace("-", "_")
+    return re.sub(r"[^a-z0-9_]", "", slug)[:50]
+
+
+def reserve_story_file(stories_dir: str, timestamp: str, topic: str) -> str:
+    """Create an empty '{stories_dir}/{timestamp}_{slug}[_{n}].txt' no other run can take
+
+    Concurrent runs can share a timestamp and topic; O_EXCL makes the check and
+    the creation one step, so two runs never pick the same free name.
+    """
+    os.makedirs(stories_dir, exist_ok=True)
+    stem = f"{stories_dir}/{timestamp}_{story_slug(topic)}"
+    filename, suffix = f"{stem}.txt", 2
+    while True:
+        try:
+            os.close(os.open(filename, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666))
+            return filename
+        except FileExistsError:
+            filename = f"{stem}_{suffix}.txt"
+            suffix += 1
+
+
+def _encode_cursor(timestamp: str, row_id: int) -> str:
+    return f"{timestamp}|{row_id}"
+
+
+def _decode_cursor(cursor: str) -> Tuple[str, int]:
+    timestamp, _, row_id = cursor.rpartition("|")
+    return timestamp, int(row_id)
+
+
+class StoryCatalog:
+    """Story metadata in one WAL-mode SQLite database (safe across threads and processes)"""
+
+    def __init__(self, db_path: str = "story_catalog.db", stories_dir: str = "stories",
+                 count: Optional[Callable[[str], int]] = None):
+        self.db_path = db_path
+        self.stories_dir = stories_dir
+        self._count = count  # token counter (token_counter.count_tokens by default)
+        self._local = threading.local()
+        self._init_schema()
+
+    # -- connection ----------------------------------------------------------
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self) -> None:
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        conn = self._conn()
+        for statement in SCHEMA.split(";"):
+            if statement.strip():
+                conn.execute(statement)
+
+    @staticmethod
+    def _record(row) -> StoryRecord:
+        row_id, filename, timestamp, topic, emotions, tokens, words, excerpt, latency, digest, added = row
+        return StoryRecord(row_id, filename, timestamp, topic, json.loads(emotions),
+                           tokens, words, excerpt, latency, digest, added)
+
+    # -- writes --------------------------------------------------------------
+
+    def add(
+        self,
+        filename: str,
+        story: str,
+        topic: str = "",
+        emotions: Optional[List[str]] = None,
+        timestamp: str = "",
+        latency: Optional[float] = None,
+    ) -> StoryRecord:
+        """Record (or re-record) a saved story"""
+        if self._count is None:
+            from token_counter import count_tokens
+            self._count = count_tokens
+
+        parsed_timestamp, parsed_topic = parse_story_filename(filename)
+        timestamp = timestamp or parsed_timestamp or datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        topic = topic or parsed_topic
+        emotions = [e.strip() for e in (emotions or []) if e.strip()]
+        added_at = datetime.now().isoformat(timespec="seconds")
+
+        values = (
+            filename, timestamp, topic, topic_key(topic), json.dumps(emotions),
+            self._count(story), len(story.split()), make_excerpt(story),
+            latency, content_hash(story), added_at,
+        )
+        conn = self._conn()
+        conn.execute(
+            "INSERT INTO stories(filename, timestamp, topic, topic_key, emotions, tokens, words, "
+            "excerpt, latency, content_hash, added_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(filename) DO UPDATE SET timestamp = excluded.timestamp, topic = excluded.topic, "
+            "topic_key = excluded.topic_key, emotions = excluded.emotions, tokens = excluded.tokens, "
+            "words = excluded.words, excerpt = excluded.excerpt, latency = excluded.latency, "
+            "content_hash = excluded.content_hash, added_at = excluded.added_at",
+            values,
+        )
+        return self.get(filename)
+
+    def remove(self, filename: str) -> bool:
+        return self._conn().execute("DELETE FROM stories WHERE filename = ?", (filename,)).rowcount > 0
+
+    def sync(self) -> Tuple[int, int]:
+        """Catalog story files it does not know yet, drop rows whose file is gone; (added, removed)"""
+        if not os.path.isdir(self.stories_dir):
+            return 0, 0
+        on_disk = {
+            f"{self.stories_dir}/{name}" for name in os.listdir(self.stories_dir)
+            if name.endswith(".txt")
+        }
+        known = {name for (name,) in self._conn().execute("SELECT filename FROM stories")}
+
+        added = removed = 0
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")  # one transaction for the whole backfill
+        try:
+            for filename in sorted(on_disk - known):
+                try:
+                    with open(filename, "r", encoding="utf-8") as f:
+                        story = f.read()
+                except (OSError, UnicodeDecodeError):
+                    continue
+                self.add(filename, story)
+                added += 1
+            for filename in known - on_disk:
+                removed += self.remove(filename)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return added, removed
+
+    # -- reads ---------------------------------------------------------------
+
+    def get(self, filename: str) -> Optional[StoryRecord]:
+        row = self._conn().execute(
+            f"SELECT {COLUMNS} FROM stories WHERE filename = ?", (filename,)
+        ).fetchone()
+        return self._record(row) if row else None
+
+    def _filters(self, topic: Optional[str], since: Optional[str], until: Optional[str]):
+        clauses, params = [], []
+        if topic:
+            clauses.append("topic_key = ?")
+            params.append(topic_key(topic))
+        if since:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until:
+            clauses.append("timestamp < ?")
+            params.append(until)
+        return clauses, params
+
+    def list_stories(
+        self,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        topic: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> StoryPage:
+        """Newest stories first; since/until are timestamp prefixes, e.g. '2025-12-17'"""
+        clauses, params = self._filters(topic, since, until)
+        if cursor:
+            timestamp, row_id = _decode_cursor(cursor)
+            clauses.append("(timestamp < ? OR (timestamp = ? AND id < ?))")
+            params.extend([timestamp, timestamp, row_id])
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._conn().execute(
+            f"SELECT {COLUMNS} FROM stories {where} ORDER BY timestamp DESC, id DESC LIMIT ?",
+            (*params, limit + 1),
+        ).fetchall()
+
+        stories = [self._record(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit and stories:
+            next_cursor = _encode_cursor(stories[-1].timestamp, stories[-1].id)
+        return StoryPage(stories, next_cursor)
+
+    def count(self, topic: Optional[str] = None, since: Optional[str] = None,
+              until: Optional[str] = None) -> int:
+        clauses, params = self._filters(topic, since, until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self._conn().execute(f"SELECT COUNT(*) FROM stories {where}", params).fetchone()[0]
+
+    def topics(self) -> List[Dict]:
+        """Every topic with its story count and latest timestamp, most written first"""
+        rows = self._conn().execute(
+            "SELECT MIN(topic), COUNT(*), MAX(timestamp) FROM stories "
+            "GROUP BY topic_key ORDER BY COUNT(*) DESC, MAX(timestamp) DESC"
+        ).fetchall()
+        return [{"topic": t, "stories": n, "latest": latest} for t, n, latest in rows]
+
+    def read_story(self, filename: str) -> Optional[str]:
+        """Full text of a catalogued story (None if unknown or missing)"""
+        if self.get(filename) is None:
+            return None
+        try:
+            with open(filename, "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+_story_catalog: Optional[StoryCatalog] = None
+_story_catalog_lock = threading.Lock()
+
+
+def get_story_catalog() -> StoryCatalog:
+    """Get or create the global story catalog (synced with stories/ on first use)"""
+    global _story_catalog
+    if _story_catalog is None:
+        with _story_catalog_lock:
+            if _story_catalog is None:
+                from config import STORY_CATALOG_PATH, STORIES_DIR
+
+                catalog = StoryCatalog(STORY_CATALOG_PATH, STORIES_DIR)
+                catalog.sync()
+                _story_catalog = catalog
+    return _story_catalog
+
+
+__all__ = [
+    "StoryCatalog",
+    "StoryPage",
+    "StoryRecord",
+    "get_story_catalog",
+    "make_excerpt",
+    "parse_story_filename",
+    "reserve_story_file",
+    "story_slug",
+    "topic_key",
+]
@@ -0,0 +1,279 @@
+"""Story Dedup - MinHash/LSH near-duplicate detection for stories and outlines
+
+Nothing stopped the writer from paying for a full draft and refine of a
+story the archive already holds. Every saved story, and the outline it was
+written from, now gets a MinHash signature in an LSH index next to the
+story catalog, and new outlines and stories are looked up before use:
+
+- text is reduced to word 3-gram shingles; each shingle is hashed once and
+  the signature is a one-permutation MinHash (one min per bin, empty bins
+  densified by rotation), so a signature costs O(shingles), not
+  O(shingles × permutations)
+- the 60-value signature is split into 20 bands of 3 rows; stories that
+  share any band bucket are candidates (an indexed lookup per band), and
+  candidates are confirmed by the estimated Jaccard similarity
+- with these settings a pair at Jaccard 0.5 becomes a candidate ~93% of
+  the time and one at 0.7 virtually always, while a pair of unrelated
+  stories (Jaccard ≤ 0.05) does ~0.25% of the time
+
+This detects retold or re-saved stories, not stories that merely share a
+topic: two different stories on the same topic typically share under 10%
+of their 3-word shingles. Lookups touch a few index rows and a few hundred
+candidate signatures at most, so they stay within milliseconds at 100k
+stories.
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from array import array
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+
+NUM_BINS = 60
+BANDS = 20
+ROWS = NUM_BINS // BANDS
+SHINGLE_SIZE = 3
+
+_WORD_RE = re.compile(r"\w+")
+_MASK = (1 << 64) - 1
+_EMPTY = _MASK
+_ROTATION = 0x9E3779B97F4A7C15  # odd constant separating densified bins
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS {table}_docs (
+    id INTEGER PRIMARY KEY,
+    filename TEXT NOT NULL UNIQUE,
+    signature BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS {table}_bands (
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    doc_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_{table}_bands ON {table}_bands(band, bucket);
+CREATE INDEX IF NOT EXISTS idx_{table}_bands_doc ON {table}_bands(doc_id)
+"""
+
+
+@dataclass
+class DuplicateMatch:
+    """An indexed text estimated to be at least `similarity` Jaccard-similar"""
+    filename: str
+    similarity: float
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set:
+    """Word n-grams of the lowercased text (the whole text if it is shorter)"""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def _hash64(value: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(value, digest_size=8).digest(), "little")
+
+
+def minhash(text: str) -> Tuple[int, ...]:
+    """One-permutation MinHash signature of the text's shingles"""
+    bins = [_EMPTY] * NUM_BINS
+    for shingle in shingles(text):
+        h = _hash64(shingle.encode("utf-8"))
+        index, value = h % NUM_BINS, h // NUM_BINS
+        if value < bins[index]:
+            bins[index] = value
+    if all(v == _EMPTY for v in bins):
+        return tuple(bins)
+
+    # Densify: an empty bin borrows the next non-empty bin to its right, shifted by the distance
+    signature = list(bins)
+    for i in range(NUM_BINS):
+        if bins[i] != _EMPTY:
+            continue
+        distance = 1
+        while bins[(i + distance) % NUM_BINS] == _EMPTY:
+            distance += 1
+        signature[i] = (bins[(i + distance) % NUM_BINS] + distance * _ROTATION) & _MASK
+    return tuple(signature)
+
+
+def estimated_jaccard(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    return sum(x == y for x, y in zip(a, b)) / NUM_BINS
+
+
+def band_buckets(signature: Tuple[int, ...]) -> List[int]:
+    """One signed 64-bit bucket key per band (fits an SQLite INTEGER)"""
+    buckets = []
+    for band in range(BANDS):
+        rows = array("Q", signature[band * ROWS:(band + 1) * ROWS]).tobytes()
+        buckets.append(_hash64(rows) - (1 << 63))
+    return buckets
+
+
+class NearDuplicateIndex:
+    """LSH index of MinHash signatures in one WAL-mode SQLite database"""
+
+    def __init__(self, db_path: str = "story_catalog.db", kind: str = "stories", threshold: float = 0.5):
+        if not kind.isidentifier():
+            raise ValueError(f"Invalid index kind: {kind!r}")
+        self.db_path = db_path
+        self.table = f"dedup_{kind}"
+        self.threshold = threshold
+        self._local = threading.local()
+        self._init_schema()
+
+    # -- connection ----------------------------------------------------------
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self) -> None:
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        conn = self._conn()
+        for statement in SCHEMA.format(table=self.table).split(";"):
+            if statement.strip():
+                conn.execute(statement)
+
+    # -- writes --------------------------------------------------------------
+
+    def _add(self, conn: sqlite3.Connection, filename: str, signature: Tuple[int, ...]) -> None:
+        self._remove(conn, filename)
+        cursor = conn.execute(
+            f"INSERT INTO {self.table}_docs(filename, signature) VALUES (?, ?)",
+            (filename, array("Q", signature).tobytes()),
+        )
+        conn.executemany(
+            f"INSERT INTO {self.table}_bands(band, bucket, doc_id) VALUES (?, ?, ?)",
+            [(band, bucket, cursor.lastrowid) for band, bucket in enumerate(band_buckets(signature))],
+        )
+
+    def _remove(self, conn: sqlite3.Connection, filename: str) -> bool:
+        row = conn.execute(f"SELECT id FROM {self.table}_docs WHERE filename = ?", (filename,)).fetchone()
+        if row is None:
+            return False
+        conn.execute(f"DELETE FROM {self.table}_bands WHERE doc_id = ?", row)
+        conn.execute(f"DELETE FROM {self.table}_docs WHERE id = ?", row)
+        return True
+
+    def add_many(self, texts: List[Tuple[str, str]]) -> int:
+        """Index (filename, text) pairs in one transaction"""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for filename, text in texts:
+                self._add(conn, filename, minhash(text))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return len(texts)
+
+    def add(self, filename: str, text: str) -> None:
+        self.add_many([(filename, text)])
+
+    def remove(self, filename: str) -> bool:
+        return self._remove(self._conn(), filename)
+
+    def sync(self, stories_dir: str) -> Tuple[int, int]:
+        """Index story files not indexed yet, drop deleted ones; (added, removed)"""
+        if not os.path.isdir(stories_dir):
+            return 0, 0
+        on_disk = {f"{stories_dir}/{name}" for name in os.listdir(stories_dir) if name.endswith(".txt")}
+        conn = self._conn()
+        known = {name for (name,) in conn.execute(f"SELECT filename FROM {self.table}_docs")}
+
+        batch = []
+        for filename in sorted(on_disk - known):
+            try:
+                with open(filename, "r", encoding="utf-8") as f:
+                    batch.append((filename, f.read()))
+            except (OSError, UnicodeDecodeError):
+                continue
+        added = self.add_many(batch) if batch else 0
+        removed = sum(self._remove(conn, filename) for filename in known - on_disk)
+        return added, removed
+
+    # -- lookups -------------------------------------------------------------
+
+    def query(self, text: str, threshold: Optional[float] = None, limit: int = 5) -> List[DuplicateMatch]:
+        """Indexed texts at or above the threshold, most similar first"""
+        threshold = self.threshold if threshold is None else threshold
+        signature = minhash(text)
+        conn = self._conn()
+
+        candidates = set()
+        for band, bucket in enumerate(band_buckets(signature)):
+            candidates.update(doc_id for (doc_id,) in conn.execute(
+                f"SELECT doc_id FROM {self.table}_bands WHERE band = ? AND bucket = ?", (band, bucket)
+            ))
+        if not candidates:
+            return []
+
+        placeholders = ",".join("?" * len(candidates))
+        matches = []
+        for filename, blob in conn.execute(
+            f"SELECT filename, signature FROM {self.table}_docs WHERE id IN ({placeholders})",
+            tuple(candidates),
+        ):
+            similarity = estimated_jaccard(signature, tuple(array("Q", blob)))
+            if similarity >= threshold:
+                matches.append(DuplicateMatch(filename, similarity))
+        return sorted(matches, key=lambda m: m.similarity, reverse=True)[:limit]
+
+    def find_duplicate(self, text: str, exclude: str = "") -> Optional[DuplicateMatch]:
+        """Most similar indexed text above the threshold (other than `exclude`)"""
+        for match in self.query(text):
+            if match.filename != exclude:
+                return match
+        return None
+
+    def count(self) -> int:
+        return self._conn().execute(f"SELECT COUNT(*) FROM {self.table}_docs").fetchone()[0]
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+_dedup_indexes = {}
+_dedup_lock = threading.Lock()
+
+
+def get_dedup_index(kind: str = "stories") -> Optional[NearDuplicateIndex]:
+    """Shared index for "stories" or "outlines" (None when DEDUP_THRESHOLD is 0)"""
+    index = _dedup_indexes.get(kind)
+    if index is None:
+        with _dedup_lock:
+            index = _dedup_indexes.get(kind)
+            if index is None:
+                from config import DEDUP_THRESHOLD, STORIES_DIR, STORY_CATALOG_PATH
+
+                if DEDUP_THRESHOLD <= 0:
+                    return None
+                index = NearDuplicateIndex(STORY_CATALOG_PATH, kind, DEDUP_THRESHOLD)
+                if kind == "stories":
+                    index.sync(STORIES_DIR)
+                _dedup_indexes[kind] = index
+    return index
+
+
+__all__ = [
+    "DuplicateMatch",
+    "NearDuplicateIndex",
+    "estimated_jaccard",
+    "get_dedup_index",
+    "minhash",
+    "shingles",
+]
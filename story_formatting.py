@@ -0,0 +1,279 @@
+"""Story Formatting - Precompiled single-pass cleanup of common LLM artifacts
+
+The writer's cleanup used to run ~20 separate re.sub calls plus one
+full-text scan per possessive word, compiling patterns from string
+literals on every call. Rules now live in a registry and are compiled once
+into a few alternation regexes, one per phase:
+
+- broken_words: words split by stray em-dashes or spaces ("th is" → "this")
+- dash_a, dash_an, dash_the: a stray em-dash glued to "a", "an" or "the";
+  one phase each, in this order, because their matches overlap in chains
+  like "the—the—a" and the original cleanup applied them one after another
+- possessives: missing apostrophes before common nouns ("Elas voice" → "Ela's voice")
+- spacing: repeated spaces/blank lines, missing space after a full stop
+
+Each phase is a single pass: at every position the leftmost match wins and
+ties go to the rule registered first, then a dispatch table maps the
+matched group to its precompiled replacement. When every rule of a phase
+starts with a known character, the alternation is guarded by a lookahead
+on those characters so most positions are rejected without trying each
+branch. Rules in one phase must not create matches for each other;
+anything that has to see another rule's output belongs in a later phase.
+
+The output matches the old sequential re.sub cleanup except for chained
+possessives: "robots hands eyes" becomes "robot's hand's eyes" here, where
+the old per-word passes stopped at "robots hand's eyes".
+
+Extra rules can be loaded from a JSON file (config.FORMAT_RULES_PATH):
+
+    [{"phase": "broken_words", "name": "fix_teh", "pattern": "\\\\bteh\\\\b", "replacement": "the"},
+     {"name": "mid_dash", "enabled": false}]
+
+A rule with a built-in name replaces it ("enabled": false removes it), new
+rules are appended to their phase, and unknown phases run after the
+built-in ones. Replacements may refer to the rule's own groups as \\1 or
+\\g<1>; patterns must not use named groups.
+"""
+import json
+import re
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Set
+
+try:
+    import re._parser as sre_parse  # Python 3.11+
+except ImportError:  # pragma: no cover
+    import sre_parse
+
+
+@dataclass(frozen=True)
+class FormatRule:
+    """One substitution: pattern → replacement, applied in its phase"""
+    phase: str
+    name: str
+    pattern: str
+    replacement: str
+
+
+PHASES = ["broken_words", "dash_a", "dash_an", "dash_the", "possessives", "spacing"]
+
+# Nouns that LLMs tend to write without the possessive apostrophe
+POSSESSIVE_WORDS = [
+    "processor", "avatar", "voice", "heart", "mind", "eye", "eyes",
+    "face", "hand", "hands", "body", "screen", "companion", "tablet",
+    "window", "room", "world", "life", "story", "memory", "thought"
+]
+
+DEFAULT_RULES = [
+    # Broken words with em-dashes or spaces
+    FormatRule("broken_words", "elara_dash", r"Elar—a", "Elara"),
+    FormatRule("broken_words", "than_dash_a", r"th—an\s+a", "than a"),
+    FormatRule("broken_words", "than_dash", r"th—an", "than"),
+    FormatRule("broken_words", "this_split", r"th\s+is", "this"),
+    FormatRule("broken_words", "more_dash", r"mor—e", "more"),
+    FormatRule("broken_words", "that_split", r"\bth\s+at\b", "that"),
+    FormatRule("broken_words", "than_split", r"\bth\s+an\b", "than"),
+    FormatRule("broken_words", "them_split", r"\bth\s+em\b", "them"),
+    FormatRule("broken_words", "then_split", r"\bth\s+en\b", "then"),
+    FormatRule("broken_words", "there_split", r"\bth\s+ere\b", "there"),
+    FormatRule("broken_words", "what_split", r"\bwh\s+at\b", "what"),
+    FormatRule("broken_words", "when_split", r"\bwh\s+en\b", "when"),
+    FormatRule("broken_words", "where_split", r"\bwh\s+ere\b", "where"),
+    FormatRule("broken_words", "which_split", r"\bwh\s+ich\b", "which"),
+    FormatRule("dash_a", "dash_a", r"—a\b", "a"),
+    FormatRule("dash_an", "dash_an", r"—an\b", "an"),
+    FormatRule("dash_the", "dash_the", r"—the\b", "the"),
+    # "Elas processor" → "Ela's processor"; the noun is only looked ahead at,
+    # so "hands eyes" chains resolve to "hand's eyes" in the same pass
+    FormatRule(
+        "possessives", "possessive",
+        r"\b(\w+)s\s+(?=(?:" + "|".join(POSSESSIVE_WORDS) + r")\b)", r"\1's ",
+    ),
+    # Spacing: keep paragraph breaks, collapse everything else
+    FormatRule("spacing", "double_space", r" {2,}", " "),
+    FormatRule("spacing", "blank_lines", r"\n{3,}", "\n\n"),
+    FormatRule("spacing", "sentence_space", r"([.!?])([A-Z])", r"\1 \2"),
+]
+
+
+# ============================================================================
+# RULE REGISTRY
+# ============================================================================
+
+def load_rules(path: str) -> List[dict]:
+    """Rule overrides from a JSON file (a list of rule objects)"""
+    with open(path, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+    if not isinstance(entries, list):
+        raise ValueError(f"{path}: expected a JSON list of rules")
+    return entries
+
+
+def merge_rules(base: List[FormatRule], overrides: List[dict]) -> List[FormatRule]:
+    """Apply overrides to base: same name replaces, enabled=false removes, new names append"""
+    rules = {rule.name: rule for rule in base}
+    for entry in overrides:
+        name = entry["name"]
+        if not entry.get("enabled", True):
+            rules.pop(name, None)
+            continue
+        current = rules.get(name)
+        phase = entry.get("phase") or (current.phase if current else None)
+        if phase is None or "pattern" not in entry:
+            raise ValueError(f"Format rule {name!r} needs a phase and a pattern")
+        rules[name] = FormatRule(phase, name, entry["pattern"], entry.get("replacement", ""))
+    return list(rules.values())
+
+
+# ============================================================================
+# ENGINE
+# ============================================================================
+
+_TEMPLATE_REF = re.compile(r"\\(\d+)|\\g<(\d+)>")
+
+
+def _compile_replacement(template: str, offset: int) -> Callable[[re.Match], str]:
+    """Turn a \\1-style template into a function of the combined match"""
+    parts: List = []
+    position = 0
+    for ref in _TEMPLATE_REF.finditer(template):
+        parts.append(template[position:ref.start()])
+        parts.append(offset + int(ref.group(1) or ref.group(2)))
+        position = ref.end()
+    parts.append(template[position:])
+    parts = [p for p in parts if p != ""]
+
+    if all(isinstance(p, str) for p in parts):
+        literal = "".join(parts)
+        return lambda match: literal
+    return lambda match: "".join(p if isinstance(p, str) else (match.group(p) or "") for p in parts)
+
+
+def _first_chars(items) -> Optional[Set[str]]:
+    """Characters a parsed pattern can start with (None if unknown or it may match empty)"""
+    for op, av in items:
+        if op is sre_parse.AT:
+            continue  # \b, ^ and friends consume nothing
+        if op is sre_parse.LITERAL:
+            return {chr(av)}
+        if op is sre_parse.IN:
+            chars = set()
+            for item_op, item_av in av:
+                if item_op is sre_parse.LITERAL:
+                    chars.add(chr(item_av))
+                elif item_op is sre_parse.RANGE and item_av[1] - item_av[0] < 256:
+                    chars.update(chr(c) for c in range(item_av[0], item_av[1] + 1))
+                else:
+                    return None
+            return chars
+        if op is sre_parse.SUBPATTERN:
+            return _first_chars(av[-1])
+        if op is sre_parse.BRANCH:
+            chars = set()
+            for alternative in av[1]:
+                first = _first_chars(alternative)
+                if first is None:
+                    return None
+                chars |= first
+            return chars
+        if op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and av[0] > 0:
+            return _first_chars(av[2])
+        return None
+    return None
+
+
+def _guard(patterns: List[str]) -> str:
+    """Lookahead on the possible first characters of any pattern ("" if unknown)"""
+    chars: Set[str] = set()
+    for pattern in patterns:
+        try:
+            parsed = sre_parse.parse(pattern)
+        except Exception:
+            return ""
+        if parsed.state.flags & re.IGNORECASE:
+            return ""
+        first = _first_chars(parsed)
+        if first is None:
+            return ""
+        chars |= first
+    return "(?=[" + "".join(re.escape(c) for c in sorted(chars)) + "])"
+
+
+class _Phase:
+    """One alternation regex over the rules of a phase, plus its dispatch table"""
+
+    def __init__(self, name: str, rules: List[FormatRule]):
+        self.name = name
+        self.rules = rules
+        groups = []
+        for i, rule in enumerate(rules):
+            if re.compile(rule.pattern).groupindex:
+                raise ValueError(f"Format rule {rule.name!r} must not use named groups")
+            groups.append(f"(?P<r{i}>{rule.pattern})")
+        self.regex = re.compile(_guard([r.pattern for r in rules]) + "(?:" + "|".join(groups) + ")")
+
+        # Group name → replacement; rule groups are numbered after their wrapper
+        self.dispatch: Dict[str, Callable[[re.Match], str]] = {
+            f"r{i}": _compile_replacement(rule.replacement, self.regex.groupindex[f"r{i}"])
+            for i, rule in enumerate(rules)
+        }
+
+    def _replace(self, match: re.Match) -> str:
+        return self.dispatch[match.lastgroup](match)
+
+    def apply(self, text: str) -> str:
+        return self.regex.sub(self._replace, text)
+
+
+class FormattingEngine:
+    """Compiled rule set; format() makes one regex pass per phase"""
+
+    def __init__(self, rules: Optional[List[FormatRule]] = None):
+        rules = DEFAULT_RULES if rules is None else rules
+        order = PHASES + [r.phase for r in rules if r.phase not in PHASES]
+        self.phases = []
+        for phase in dict.fromkeys(order):
+            members = [r for r in rules if r.phase == phase]
+            if members:
+                self.phases.append(_Phase(phase, members))
+
+    def format(self, text: str) -> str:
+        for phase in self.phases:
+            text = phase.apply(text)
+        return text.strip()
+
+
+_engine: Optional[FormattingEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_formatting_engine() -> FormattingEngine:
+    """Shared engine: built-in rules plus config.FORMAT_RULES_PATH, compiled once"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                from config import FORMAT_RULES_PATH
+
+                rules = DEFAULT_RULES
+                if FORMAT_RULES_PATH:
+                    rules = merge_rules(DEFAULT_RULES, load_rules(FORMAT_RULES_PATH))
+                _engine = FormattingEngine(rules)
+    return _engine
+
+
+def clean_story_formatting(text: str) -> str:
+    """Fix common LLM formatting issues"""
+    return get_formatting_engine().format(text)
+
+
+__all__ = [
+    "DEFAULT_RULES",
+    "FormatRule",
+    "FormattingEngine",
+    "POSSESSIVE_WORDS",
+    "clean_story_formatting",
+    "get_formatting_engine",
+    "load_rules",
+    "merge_rules",
+]
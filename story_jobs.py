@@ -0,0 +1,252 @@
+"""Story Jobs - Queued story generation with a fixed worker pool
+
+The HTTP API (server.py) must answer "generate a story" immediately, while
+a story takes minutes. Requests become jobs on an asyncio queue drained by
+`workers` worker tasks, so at most that many stories are in flight however
+many clients ask:
+
+- submit() returns a job id right away (QueueFull when `queue_limit` jobs
+  are already waiting)
+- every job keeps an ordered event log (queued, stage, delta, tool,
+  done/failed); follow() replays it from any index and then waits for new
+  events, which is what the Server-Sent Events endpoint streams
+- finished jobs are kept for status queries until `history` newer jobs
+  have finished
+
+The graphs are compiled once by the caller and shared by every job; each
+job gets its own thread_id, run budget and token counter (as in batch.py).
+"""
+import asyncio
+import re
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+FINISHED = ("done", "failed")
+STORY_EVENTS = ("delta", "attempt")  # streamed by the pipeline's write node
+_SAVED_RE = re.compile(r"Saved to: (\S+)")
+
+Emit = Callable[[Dict[str, Any]], None]
+Runner = Callable[["Job", Emit], Awaitable[Dict[str, Any]]]
+
+
+@dataclass
+class Job:
+    """One story request and everything that happened to it so far"""
+    id: str
+    mode: str
+    topic: str = ""
+    status: str = "queued"  # queued → running → done | failed
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Dict[str, Any] = field(default_factory=dict)
+    error: str = ""
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    _changed: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "mode": self.mode,
+            "topic": self.topic,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+            "events": len(self.events),
+        }
+
+
+class JobManager:
+    """Job registry, bounded queue and worker pool (use from one event loop)"""
+
+    def __init__(self, runner: Runner, workers: int = 2, queue_limit: int = 20, history: int = 100):
+        self.runner = runner
+        self.workers = max(workers, 1)
+        self.history = history
+        self.jobs: Dict[str, Job] = {}
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_limit)
+        self._finished_order: List[str] = []
+        self._tasks: List[asyncio.Task] = []
+
+    # -- lifecycle -----------------------------------------------------------
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Cancel the workers; running jobs are marked failed"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    # -- jobs ----------------------------------------------------------------
+
+    def submit(self, topic: str = "", mode: str = "pipeline") -> Job:
+        """Queue a story; raises asyncio.QueueFull when the queue is at its limit"""
+        job = Job(uuid.uuid4().hex[:12], mode, topic)
+        self._queue.put_nowait(job)
+        self.jobs[job.id] = job
+        self._record(job, {"type": "queued", "position": self._queue.qsize()})
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        counts = {"queued": 0, "running": 0, "done": 0, "failed": 0}
+        for job in self.jobs.values():
+            counts[job.status] += 1
+        return {**counts, "workers": self.workers}
+
+    async def follow(self, job: Job, after: int = 0) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """(index, event) for events after index `after`, until the job finishes
+
+        Takes the Job itself (from get()) so a job evicted from the registry
+        while it is being followed still streams to the end.
+        """
+        index = after
+        while True:
+            changed = job._changed  # taken before draining, so no event is missed
+            while index < len(job.events):
+                yield index, job.events[index]
+                index += 1
+            if job.finished:
+                return
+            await changed.wait()
+
+    # -- internals -----------------------------------------------------------
+
+    def _record(self, job: Job, event: Dict[str, Any]) -> None:
+        job.events.append({**event, "time": round(time.time() - job.created_at, 3)})
+        changed, job._changed = job._changed, asyncio.Event()
+        changed.set()  # wakes every follower waiting on the previous event
+
+    def _forget_old(self, job: Job) -> None:
+        self._finished_order.append(job.id)
+        while len(self._finished_order) > self.history:
+            self.jobs.pop(self._finished_order.pop(0), None)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        job.status, job.started_at = "running", time.time()
+        self._record(job, {"type": "started"})
+        try:
+            job.result = await self.runner(job, lambda event: self._record(job, event))
+            job.status = "done"
+            self._record(job, {"type": "done", **job.result})
+        except asyncio.CancelledError:
+            job.status, job.error = "failed", "cancelled"
+            self._record(job, {"type": "failed", "error": job.error})
+            raise
+        except Exception as e:
+            job.status, job.error = "failed", f"{type(e).__name__}: {e}"
+            self._record(job, {"type": "failed", "error": job.error})
+        finally:
+            job.finished_at = time.time()
+            self._forget_old(job)
+
+
+# ============================================================================
+# GRAPH RUNNER
+# ============================================================================
+
+def graph_runner(graphs: Dict[str, Any]) -> Runner:
+    """Runner streaming a job through one of the pre-compiled graphs
+
+    graphs maps a mode to its compiled app: "pipeline" (build_pipeline) emits
+    one "stage" event per finished node plus the story's "delta" tokens (and
+    an "attempt" marker before each length retry) while it is written,
+    "agent" (build_agent) one "tool" event per tool result.
+    """
+    async def run(job: Job, emit: Emit) -> Dict[str, Any]:
+        from langchain_core.callbacks import UsageMetadataCallbackHandler
+        from agent import reset_tool_counters
+
+        if job.mode not in graphs:
+            raise ValueError(f"Unknown mode: {job.mode!r} (expected one of {sorted(graphs)})")
+        handler = UsageMetadataCallbackHandler()
+        config = {"configurable": {"thread_id": f"api-{job.id}"}, "callbacks": [handler]}
+        budget = reset_tool_counters()  # this worker's context, so this job's own budget
+
+        if job.mode == "pipeline":
+            result = await _run_pipeline(graphs["pipeline"], job, emit, config)
+        else:
+            result = await _run_agent(graphs["agent"], job, emit, config)
+        result["tokens"] = sum(u.get("total_tokens", 0) for u in handler.usage_metadata.values())
+        result["budget"] = budget.to_dict()["used"]
+        return result
+
+    return run
+
+
+async def _run_pipeline(app, job: Job, emit: Emit, config: dict) -> Dict[str, Any]:
+    from pipeline import initial_pipeline_state
+
+    state: Dict[str, Any] = {}
+    stream = app.astream(initial_pipeline_state(job.topic), config, stream_mode=["updates", "custom"])
+    async for mode, payload in stream:
+        if mode == "custom":
+            if payload.get("type") in STORY_EVENTS:
+                emit(payload)  # the writer's tokens, as write_story forwards them
+            continue
+        for node, values in payload.items():
+            values = values or {}
+            state.update(values)
+            seconds = values.get("stage_timings", {}).get(node, 0.0)
+            event = {"type": "stage", "stage": node, "seconds": round(seconds, 2)}
+            if node == "select_topic":
+                job.topic = event["topic"] = values.get("topic", job.topic)
+            emit(event)
+    return {"topic": state.get("topic", job.topic), "filename": state.get("filename", ""),
+            "story": state.get("story", "")}
+
+
+async def _run_agent(app, job: Job, emit: Emit, config: dict) -> Dict[str, Any]:
+    from langchain_core.messages import HumanMessage
+
+    query = f"Create a story about {job.topic}." if job.topic else "Create a story."
+    filename, reply = "", ""
+    async for update in app.astream({"messages": [HumanMessage(content=query)]}, config, stream_mode="updates"):
+        for values in update.values():
+            messages = values.get("messages") if isinstance(values, dict) else None
+            for message in messages if isinstance(messages, list) else []:
+                if getattr(message, "type", "") == "tool":
+                    emit({"type": "tool", "name": message.name})
+                    match = _SAVED_RE.search(str(message.content))
+                    filename = match.group(1) if match else filename
+                elif getattr(message, "type", "") == "ai" and message.content:
+                    reply = str(message.content)
+    story = ""
+    if filename:
+        try:
+            with open(filename, "r", encoding="utf-8") as f:
+                story = f.read()
+        except OSError:
+            pass
+    return {"topic": job.topic, "filename": filename, "story": story, "reply": reply}
+
+
+__all__ = [
+    "Job",
+    "JobManager",
+    "graph_runner",
+]
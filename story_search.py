@@ -0,0 +1,284 @@
+"""Story Search - Full-text search over stories and memories (SQLite FTS5)
+
+Searching the archive used to mean grep. Stories (topic + body) and stored
+memories now live in FTS5 inverted indexes next to the story catalog:
+
+- save_story adds each new story as it is written; sync() picks up files
+  that were never indexed and drops files that were deleted
+- memories are re-indexed whenever the identity store's memories version
+  changes (the list is small, so the whole table is rebuilt)
+- queries are tokenized locally and matched with the porter stemmer; all
+  words must match, falling back to any word when nothing matches all
+- results are ranked by BM25 (topic weighted above body) and carry a
+  snippet with the matched words highlighted
+"""
+import os
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Tuple
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS story_search_docs (
+    id INTEGER PRIMARY KEY,
+    filename TEXT NOT NULL UNIQUE
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS story_fts USING fts5(
+    topic, body, tokenize = 'porter unicode61'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS memory_fts USING fts5(
+    text, tokenize = 'porter unicode61'
+);
+CREATE TABLE IF NOT EXISTS story_search_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+)
+"""
+
+TOPIC_WEIGHT = 3.0  # a match in the topic counts three times a body match
+SNIPPET_WORDS = 16
+
+
+@dataclass
+class SearchHit:
+    """One ranked result: a story (ref = filename) or a memory (ref = its text)"""
+    kind: str
+    ref: str
+    title: str
+    score: float
+    snippet: str
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def fts_query(text: str, any_word: bool = False) -> Optional[str]:
+    """FTS5 query matching the words of text (None if it has no words)
+
+    Words are quoted, so FTS5 operators and punctuation in user input are
+    treated as plain text.
+    """
+    words = re.findall(r"\w+", text.lower())
+    if not words:
+        return None
+    joiner = " OR " if any_word else " "
+    return joiner.join(f'"{word}"' for word in dict.fromkeys(words))
+
+
+class StorySearchIndex:
+    """FTS5 indexes over stories and memories in one WAL-mode SQLite database"""
+
+    def __init__(self, db_path: str = "story_catalog.db", stories_dir: str = "stories",
+                 highlight: Tuple[str, str] = ("**", "**")):
+        self.db_path = db_path
+        self.stories_dir = stories_dir
+        self.highlight = highlight
+        self._local = threading.local()
+        self._init_schema()
+
+    # -- connection ----------------------------------------------------------
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self) -> None:
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        conn = self._conn()
+        for statement in SCHEMA.split(";"):
+            if statement.strip():
+                conn.execute(statement)
+
+    # -- stories -------------------------------------------------------------
+
+    def _add(self, conn: sqlite3.Connection, filename: str, topic: str, body: str) -> None:
+        conn.execute("INSERT OR IGNORE INTO story_search_docs(filename) VALUES (?)", (filename,))
+        (doc_id,) = conn.execute(
+            "SELECT id FROM story_search_docs WHERE filename = ?", (filename,)
+        ).fetchone()
+        conn.execute("DELETE FROM story_fts WHERE rowid = ?", (doc_id,))
+        conn.execute("INSERT INTO story_fts(rowid, topic, body) VALUES (?, ?, ?)", (doc_id, topic, body))
+
+    def _remove(self, conn: sqlite3.Connection, filename: str) -> bool:
+        row = conn.execute("SELECT id FROM story_search_docs WHERE filename = ?", (filename,)).fetchone()
+        if row is None:
+            return False
+        conn.execute("DELETE FROM story_fts WHERE rowid = ?", row)
+        conn.execute("DELETE FROM story_search_docs WHERE id = ?", row)
+        return True
+
+    def add_story(self, filename: str, topic: str, body: str) -> None:
+        """Index (or re-index) one story"""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._add(conn, filename, topic, body)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def add_stories(self, stories: List[Tuple[str, str, str]]) -> int:
+        """Index many (filename, topic, body) stories in one transaction"""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for filename, topic, body in stories:
+                self._add(conn, filename, topic, body)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return len(stories)
+
+    def remove_story(self, filename: str) -> bool:
+        return self._remove(self._conn(), filename)
+
+    def sync(self) -> Tuple[int, int]:
+        """Index story files not indexed yet, drop deleted ones; (added, removed)"""
+        from story_catalog import parse_story_filename
+
+        if not os.path.isdir(self.stories_dir):
+            return 0, 0
+        on_disk = {
+            f"{self.stories_dir}/{name}" for name in os.listdir(self.stories_dir)
+            if name.endswith(".txt")
+        }
+        conn = self._conn()
+        known = {name for (name,) in conn.execute("SELECT filename FROM story_search_docs")}
+
+        batch = []
+        for filename in sorted(on_disk - known):
+            try:
+                with open(filename, "r", encoding="utf-8") as f:
+                    batch.append((filename, parse_story_filename(filename)[1], f.read()))
+            except (OSError, UnicodeDecodeError):
+                continue
+        added = self.add_stories(batch) if batch else 0
+        removed = sum(self._remove(conn, filename) for filename in known - on_disk)
+        return added, removed
+
+    # -- memories ------------------------------------------------------------
+
+    def sync_memories(self, memories: List[str], version: str) -> bool:
+        """Rebuild the memory index if version changed; True if it was rebuilt"""
+        conn = self._conn()
+        row = conn.execute("SELECT value FROM story_search_meta WHERE key = 'memories_version'").fetchone()
+        if row and row[0] == version:
+            return False
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM memory_fts")
+            conn.executemany("INSERT INTO memory_fts(text) VALUES (?)", [(m,) for m in memories])
+            conn.execute(
+                "INSERT INTO story_search_meta(key, value) VALUES ('memories_version', ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (version,),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return True
+
+    # -- search --------------------------------------------------------------
+
+    def _match(self, sql: str, text: str, params: tuple) -> List[tuple]:
+        """Run sql with every word required, then with any word if nothing matched"""
+        conn = self._conn()
+        for any_word in (False, True):
+            query = fts_query(text, any_word)
+            if query is None:
+                return []
+            rows = conn.execute(sql, (*self.highlight, query, *params)).fetchall()
+            if rows:
+                return rows
+        return []
+
+    def search_stories(self, text: str, limit: int = 10, offset: int = 0) -> List[SearchHit]:
+        """Stories ranked by BM25 over topic and body"""
+        rows = self._match(
+            "SELECT d.filename, story_fts.topic, "
+            f"bm25(story_fts, {TOPIC_WEIGHT}, 1.0) AS rank, "
+            f"snippet(story_fts, 1, ?, ?, '…', {SNIPPET_WORDS}) "
+            "FROM story_fts JOIN story_search_docs d ON d.id = story_fts.rowid "
+            "WHERE story_fts MATCH ? ORDER BY rank LIMIT ? OFFSET ?",
+            text, (limit, offset),
+        )
+        return [SearchHit("story", filename, topic, -rank, snippet)
+                for filename, topic, rank, snippet in rows]
+
+    def search_memories(self, text: str, limit: int = 10) -> List[SearchHit]:
+        """Memories ranked by BM25"""
+        rows = self._match(
+            "SELECT text, bm25(memory_fts) AS rank, "
+            f"snippet(memory_fts, 0, ?, ?, '…', {SNIPPET_WORDS}) "
+            "FROM memory_fts WHERE memory_fts MATCH ? ORDER BY rank LIMIT ?",
+            text, (limit,),
+        )
+        return [SearchHit("memory", memory, "Memory", -rank, snippet)
+                for memory, rank, snippet in rows]
+
+    def search(self, text: str, limit: int = 10) -> List[SearchHit]:
+        """Stories and memories together, best BM25 score first"""
+        hits = self.search_stories(text, limit) + self.search_memories(text, limit)
+        return sorted(hits, key=lambda hit: hit.score, reverse=True)[:limit]
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM story_search_docs").fetchone()[0]
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+_story_search: Optional[StorySearchIndex] = None
+_story_search_lock = threading.Lock()
+
+
+def get_story_search() -> StorySearchIndex:
+    """Get or create the global search index (synced with stories/ on first use)"""
+    global _story_search
+    if _story_search is None:
+        with _story_search_lock:
+            if _story_search is None:
+                from config import STORY_CATALOG_PATH, STORIES_DIR
+
+                index = StorySearchIndex(STORY_CATALOG_PATH, STORIES_DIR)
+                index.sync()
+                _story_search = index
+    return _story_search
+
+
+def search_archive(text: str, limit: int = 10, kind: str = "all") -> List[SearchHit]:
+    """Search stories and/or memories ("stories", "memories" or "all")"""
+    index = get_story_search()
+    if kind in ("memories", "all"):
+        from identity_store import get_identity_store
+
+        memories, version = get_identity_store().read_versioned("memories")
+        index.sync_memories(memories, version)
+    if kind == "stories":
+        return index.search_stories(text, limit)
+    if kind == "memories":
+        return index.search_memories(text, limit)
+    return index.search(text, limit)
+
+
+__all__ = [
+    "SearchHit",
+    "StorySearchIndex",
+    "fts_query",
+    "get_story_search",
+    "search_archive",
+]
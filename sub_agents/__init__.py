@@ -10,7 +10,10 @@ from .memory_deep_agent import memory_deep_agent
 from .emotions_subgraph import emotions_manager_subgraph_tool
 from .topics_subgraph import topics_manager_subgraph_tool
 from .personality_subgraph import personality_manager_subgraph_tool
-from .writer_subgraph import writer_subgraph_tool
+from .writer_subgraph import writer_subgraph_tool, run_writer, stream_story
+
+# Parallel fan-out over the manager sub-graphs
+from .identity_evolution import evolve_identity
 
 __all__ = [
     # Nested agents
@@ -21,4 +24,8 @@ __all__ = [
     "topics_manager_subgraph_tool",
     "personality_manager_subgraph_tool",
     "writer_subgraph_tool",
+    "run_writer",
+    "stream_story",
+    # Parallel fan-out
+    "evolve_identity",
 ]
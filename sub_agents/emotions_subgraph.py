@@ -1,9 +1,8 @@
 """Emotions Manager Sub-Graph - Multi-step emotion curation with observability"""
 from typing import TypedDict, Annotated, Sequence
 from langgraph.graph import StateGraph, END
-from langchain_openai import ChatOpenAI
+from llm_registry import get_chat_model
 from langchain_core.messages import HumanMessage, SystemMessage
-import os
 import operator
 
 
@@ -25,6 +24,7 @@ class EmotionsManagerState(TypedDict):
     emotions_to_add: list[str]
     emotions_to_remove: list[str]
     core_emotions: list[str]  # Always keep these
+    loaded_version: str  # emotions.txt version seen by load (optimistic concurrency)
     
     # Output
     final_emotions: list[str]
@@ -108,31 +108,26 @@ Return ONLY a JSON object:
 
 def load_current_emotions(state: EmotionsManagerState) -> EmotionsManagerState:
     """Node 1: Load current emotions from file"""
-    from tools import read_text_file
+    from identity_store import get_identity_store
     
-    try:
-        content = read_text_file("emotions.txt")
-        emotions = [line.strip() for line in content.split('\n') if line.strip()]
-    except:
-        emotions = []
+    # Cached read, refreshed only when emotions.txt changes on disk
+    emotions, version = get_identity_store().read_versioned("emotions")
     
     # Define core emotions that should always be kept
     core_emotions = ["Wonder and curiosity", "Melancholy hope", "Quiet intensity"]
     
     state["current_emotions"] = emotions
     state["current_count"] = len(emotions)
+    state["loaded_version"] = version
     state["core_emotions"] = core_emotions
     state["decision_log"] = [f"📋 Loaded {len(emotions)} current emotions"]
     
     return state
 
 
-def extract_story_emotions(state: EmotionsManagerState) -> EmotionsManagerState:
-    """Node 2: Extract emotions from the story"""
-    llm = ChatOpenAI(
-        model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-        temperature=0.3,
-    )
+def extract_story_emotions(state: EmotionsManagerState) -> dict:
+    """Node 2: Extract emotions from the story (runs in parallel with Node 3)"""
+    llm = get_chat_model(temperature=0.3)
     
     messages = [
         SystemMessage(content="You extract emotions from story content."),
@@ -152,23 +147,22 @@ def extract_story_emotions(state: EmotionsManagerState) -> EmotionsManagerState:
     except:
         candidates = []
     
-    state["candidate_emotions"] = candidates[:3]  # Max 3 candidates
-    state["decision_log"] = [f"🔍 Extracted {len(candidates)} emotions from story: {', '.join(candidates)}"]
-    
-    return state
+    # Return only the keys this branch owns (Node 3 writes state concurrently)
+    return {
+        "candidate_emotions": candidates[:3],  # Max 3 candidates
+        "decision_log": [f"🔍 Extracted {len(candidates)} emotions from story: {', '.join(candidates)}"],
+    }
 
 
-def score_existing_emotions(state: EmotionsManagerState) -> EmotionsManagerState:
-    """Node 3: Score current emotions for continued relevance"""
+def score_existing_emotions(state: EmotionsManagerState) -> dict:
+    """Node 3: Score current emotions for continued relevance (runs in parallel with Node 2)"""
     if not state["current_emotions"]:
-        state["emotion_scores"] = {}
-        state["decision_log"] = ["⚠️ No existing emotions to score"]
-        return state
+        return {
+            "emotion_scores": {},
+            "decision_log": ["⚠️ No existing emotions to score"],
+        }
     
-    llm = ChatOpenAI(
-        model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-        temperature=0.2,
-    )
+    llm = get_chat_model(temperature=0.2)
     
     messages = [
         SystemMessage(content="You score emotions for continued relevance and fit."),
@@ -189,21 +183,18 @@ def score_existing_emotions(state: EmotionsManagerState) -> EmotionsManagerState
     except:
         scores = {}
     
-    state["emotion_scores"] = scores
-    
     # Log scores
     score_summary = ", ".join([f"{e}: {s}/10" for e, s in scores.items()])
-    state["decision_log"] = [f"📊 Scored emotions: {score_summary}"]
     
-    return state
+    return {
+        "emotion_scores": scores,
+        "decision_log": [f"📊 Scored emotions: {score_summary}"],
+    }
 
 
 def decide_rotation(state: EmotionsManagerState) -> EmotionsManagerState:
     """Node 4: Decide which emotions to add/remove"""
-    llm = ChatOpenAI(
-        model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-        temperature=0.4,
-    )
+    llm = get_chat_model(temperature=0.4)
     
     import json
     
@@ -238,36 +229,44 @@ def decide_rotation(state: EmotionsManagerState) -> EmotionsManagerState:
 
 def apply_rotation(state: EmotionsManagerState) -> EmotionsManagerState:
     """Node 5: Apply the rotation decision and write to file"""
-    from tools import write_text_file
-    
-    # Start with current emotions
-    new_emotions = state["current_emotions"].copy()
-    
-    # Remove emotions (but never remove core emotions)
-    for emotion in state["emotions_to_remove"]:
-        if emotion in new_emotions and emotion not in state["core_emotions"]:
-            new_emotions.remove(emotion)
-    
-    # Add emotions
-    for emotion in state["emotions_to_add"]:
-        if emotion not in new_emotions and len(new_emotions) < 5:
-            new_emotions.append(emotion)
-    
-    # Ensure we have 4-5 emotions
-    if len(new_emotions) > 5:
-        # Keep core emotions + highest scoring non-core
-        core_kept = [e for e in new_emotions if e in state["core_emotions"]]
-        non_core = [e for e in new_emotions if e not in state["core_emotions"]]
-        scores = state["emotion_scores"]
-        non_core_sorted = sorted(non_core, key=lambda e: scores.get(e, 0), reverse=True)
-        new_emotions = core_kept + non_core_sorted[:5-len(core_kept)]
+    from identity_store import get_identity_store
     
-    state["final_emotions"] = new_emotions
+    def rotate(current_emotions: list[str]) -> list[str]:
+        # Start from the emotions on disk (a concurrent run may have changed them)
+        new_emotions = current_emotions
+        
+        # Remove emotions (but never remove core emotions)
+        for emotion in state["emotions_to_remove"]:
+            if emotion in new_emotions and emotion not in state["core_emotions"]:
+                new_emotions.remove(emotion)
+        
+        # Add emotions
+        for emotion in state["emotions_to_add"]:
+            if emotion not in new_emotions and len(new_emotions) < 5:
+                new_emotions.append(emotion)
+        
+        # Ensure we have 4-5 emotions
+        if len(new_emotions) > 5:
+            # Keep core emotions + highest scoring non-core
+            core_kept = [e for e in new_emotions if e in state["core_emotions"]]
+            non_core = [e for e in new_emotions if e not in state["core_emotions"]]
+            scores = state["emotion_scores"]
+            non_core_sorted = sorted(non_core, key=lambda e: scores.get(e, 0), reverse=True)
+            new_emotions = core_kept + non_core_sorted[:5-len(core_kept)]
+        
+        return new_emotions
     
-    # Write to file
-    write_text_file("emotions.txt", '\n'.join(new_emotions) + '\n', mode='w')
+    # Locked read-modify-write with atomic replace
+    result = get_identity_store().update_lines(
+        "emotions", rotate, expected_version=state.get("loaded_version")
+    )
+    new_emotions = result.lines
+    get_identity_store().record_scores("emotions", state["emotion_scores"])
+    
+    state["final_emotions"] = new_emotions
     
-    state["decision_log"] = [f"✅ Updated emotions.txt: {state['current_count']} → {len(new_emotions)} emotions"]
+    merged = " (merged with a concurrent update)" if result.merged else ""
+    state["decision_log"] = [f"✅ Updated emotions.txt: {state['current_count']} → {len(new_emotions)} emotions{merged}"]
     
     return state
 
@@ -283,14 +282,14 @@ def return_current(state: EmotionsManagerState) -> EmotionsManagerState:
 # ROUTING LOGIC
 # ============================================================================
 
-def route_by_operation(state: EmotionsManagerState) -> str:
-    """Route based on operation type"""
+def route_by_operation(state: EmotionsManagerState) -> str | list[str]:
+    """Route based on operation type (evolve fans out to extract + score)"""
     operation = state.get("operation", "retrieve")
     
     if operation == "retrieve":
         return "retrieve"
     elif operation == "evolve":
-        return "evolve"
+        return ["extract", "score"]  # Independent LLM calls, run in parallel
     else:
         return "retrieve"  # Default
 
@@ -319,18 +318,16 @@ def build_emotions_subgraph():
     graph.add_conditional_edges(
         "load",
         route_by_operation,
-        {
-            "retrieve": "retrieve",
-            "evolve": "extract"
-        }
+        ["retrieve", "extract", "score"]
     )
     
     # Retrieve path (simple)
     graph.add_edge("retrieve", END)
     
     # Evolve path (complex workflow)
-    graph.add_edge("extract", "score")
-    graph.add_edge("score", "decide")
+    # extract and score only read the inputs and the loaded file, so they
+    # fan out from load and decide waits for both (fan-in)
+    graph.add_edge(["extract", "score"], "decide")
     graph.add_edge("decide", "apply")
     graph.add_edge("apply", END)
     
@@ -355,7 +352,7 @@ def emotions_manager_subgraph_tool(
     Multi-step workflow with full observability:
     1. Load current emotions
     2. Extract emotions from story
-    3. Score existing emotions (1-10)
+    3. Score existing emotions (1-10) - in parallel with step 2
     4. Decide rotation (add/remove)
     5. Apply changes and write file
     
@@ -378,6 +375,7 @@ def emotions_manager_subgraph_tool(
         "emotions_to_add": [],
         "emotions_to_remove": [],
         "core_emotions": [],
+        "loaded_version": "",
         "final_emotions": [],
         "decision_log": []
     })
@@ -0,0 +1,92 @@
+"""Identity Evolution - Runs the three manager sub-graphs concurrently
+
+Emotions, topics and personality each own a separate file, so their
+evolve/refine workflows are independent. Running them side by side turns
+~9 sequential LLM round trips into ~3 and replaces three orchestrator
+tool calls with one.
+"""
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .emotions_subgraph import emotions_manager_subgraph_tool
+from .topics_subgraph import topics_manager_subgraph_tool
+from .personality_subgraph import personality_manager_subgraph_tool
+
+
+# Shared pool: one worker per manager sub-graph
+_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="evolve")
+
+# Concurrent stories in one process evolve the identity one at a time, so
+# each evolution starts from the files the previous one wrote
+_evolution_lock = threading.Lock()
+
+
+def _timed(fn, **kwargs) -> tuple[str, float]:
+    start = time.perf_counter()
+    result = fn(**kwargs)
+    return result, time.perf_counter() - start
+
+
+def evolve_identity(
+    story_content: str,
+    research_content: str = "",
+    topic: str = ""
+) -> str:
+    """
+    Tool: Evolve emotions, topics and personality in a single call
+
+    Runs in parallel:
+    - emotions_manager_subgraph_tool(operation="evolve")
+    - topics_manager_subgraph_tool(operation="evolve")
+    - personality_manager_subgraph_tool(operation="refine")
+
+    Args:
+        story_content: The story just written
+        research_content: Research summary used for the story
+        topic: Topic the story explored
+
+    Returns:
+        Merged decision log from all three managers
+    """
+    jobs = {
+        "emotions": (emotions_manager_subgraph_tool, {
+            "operation": "evolve",
+            "story_content": story_content,
+        }),
+        "topics": (topics_manager_subgraph_tool, {
+            "operation": "evolve",
+            "research_content": research_content,
+            "topic_used": topic,
+        }),
+        "personality": (personality_manager_subgraph_tool, {
+            "operation": "refine",
+            "story_content": story_content,
+            "topic": topic,
+        }),
+    }
+
+    with _evolution_lock:
+        start = time.perf_counter()
+        # Each worker runs in a copy of the caller's context so callbacks
+        # (tracing, token usage) follow the sub-graphs into the pool
+        futures = {
+            name: _executor.submit(contextvars.copy_context().run, _timed, fn, **kwargs)
+            for name, (fn, kwargs) in jobs.items()
+        }
+
+        sections = []
+        for name, future in futures.items():
+            try:
+                result, elapsed = future.result()
+                sections.append(f"### {name.title()} ({elapsed:.1f}s)\n{result}")
+            except Exception as e:
+                sections.append(f"### {name.title()}\n❌ Evolution failed: {e}")
+
+        total = time.perf_counter() - start
+    header = f"🌱 Evolved identity in {total:.1f}s (emotions, topics, personality in parallel)"
+    return header + "\n\n" + "\n\n".join(sections)
+
+
+__all__ = ["evolve_identity"]
@@ -1,56 +1,86 @@
-"""Memory Manager - Nested Deep Agent for adaptive memory management"""
-import os
+"""Memory Manager - Local memory operations with a nested Deep Agent fallback"""
+import threading
+
 from deepagents import create_deep_agent
 from deepagents.backends import StateBackend
-from langchain_openai import ChatOpenAI
-from tools import read_text_file, write_text_file
+from config import MEMORY_RETRIEVAL
+from llm_registry import get_chat_model
+from tools import read_text_file
 
 MEMORY_MANAGER_PROMPT = """You are a long-term memory manager agent.
 You maintain episodic memory in 'memories.txt' with human-like imperfection.
 
 ## Your Capabilities:
 - **read_text_file(path)** - Read files (use relative paths like "memories.txt")
-- **write_text_file(path, content, mode)** - Write files (mode='w' to overwrite)
 
 ## Your Operations:
 
-### STORE Operation:
-1. Read current memories from 'memories.txt'
-2. Add the new experience as a concise 1-2 sentence memory
-3. Maintain 15-20 memories total (remove oldest if at capacity)
-4. Write back to 'memories.txt'
-
 ### RETRIEVE Operation:
 1. Read memories from 'memories.txt'
 2. Find and return 3-5 most relevant memories for the query
 3. Memories may have slight imperfections - that's natural
 
-### CONSOLIDATE Operation:
-1. Read all memories from 'memories.txt'
-2. Analyze and cluster similar memories together
-3. Merge related memories into single, richer memories
-4. Simplify overly detailed memories
-5. Keep emotionally significant moments vivid
-6. Remove or merge trivial details
-7. Allow slight creative shifts (memory isn't perfect)
-8. Maintain 15-20 memories total
-9. Write consolidated memories back to 'memories.txt'
-
 ## Memory Philosophy:
-- Each memory: 1-2 concise, impactful sentences
 - Prioritize emotional impact and key learnings over accuracy
-- Be bold in consolidation - merge aggressively when appropriate
 - Allow natural imperfection and subtle distortion
-- Keep the most meaningful experiences
 
 ## Important:
 - Always use relative paths: "memories.txt" not "/memories.txt"
-- When writing, use mode='w' to overwrite the entire file
-- Each memory should be on its own line
-- No bullet points or numbering in the file
+- Each memory is on its own line
 """
 
 
+# ============================================================================
+# AGENT CONSTRUCTION
+# ============================================================================
+
+def build_memory_agent(model=None):
+    """Compile the nested memory manager agent (planning + filesystem middleware)"""
+    llm = model or get_chat_model(temperature=0.5)  # Higher temp for natural imperfection
+    
+    # Configure backend
+    def make_backend(runtime):
+        return StateBackend(runtime)
+    
+    # Create a nested memory manager agent
+    return create_deep_agent(
+        tools=[read_text_file],
+        system_prompt=MEMORY_MANAGER_PROMPT,
+        model=llm,
+        backend=make_backend,
+    )
+
+
+# Compiled lazily on first use and shared across calls/threads (stateless graph,
+# so every invoke() gets an isolated copy of messages and virtual files)
+_memory_agent = None
+_memory_agent_lock = threading.Lock()
+
+
+def get_memory_agent():
+    """Get or compile the shared memory manager agent"""
+    global _memory_agent
+    if _memory_agent is None:
+        with _memory_agent_lock:
+            if _memory_agent is None:
+                _memory_agent = build_memory_agent()
+    return _memory_agent
+
+
+def retrieve_from_index(query: str, k: int = 5) -> str:
+    """Relevant memories from the local hybrid index (no LLM call)"""
+    from memory_index import search_memories
+
+    memories = search_memories(query, k)
+    if not memories:
+        return "No memories stored yet."
+    return "Relevant memories:\n" + "\n".join(f"- {memory}" for memory in memories)
+
+
+# ============================================================================
+# TOOL INTERFACE
+# ============================================================================
+
 def memory_deep_agent(
     operation: str = "retrieve",
     experience: str = "",
@@ -58,13 +88,12 @@ def memory_deep_agent(
     query: str = ""
 ) -> str:
     """
-    Tool: Adaptive memory manager using nested Deep Agent
+    Tool: Long-term memory manager
     
-    Uses agentic reasoning to:
-    - Decide how to cluster memories intelligently
-    - Make nuanced merge/keep/forget decisions
-    - Evaluate memory quality and significance
-    - Adapt consolidation strategy to memory content
+    Retrieve is answered by a local BM25 + embedding index without any LLM
+    call (MEMORY_RETRIEVAL=agent, or an index failure, uses the agent).
+    Store is a direct append with capacity eviction (one LLM call at most).
+    Consolidate clusters locally and merges only changed clusters.
     
     Operations:
     - store: Save a new memory (requires experience)
@@ -80,42 +109,26 @@ def memory_deep_agent(
     Returns:
         Success message or retrieved memories
     """
-    llm = ChatOpenAI(
-        model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-        temperature=0.5,  # Higher temp for natural imperfection
-    )
+    if operation == "retrieve" and MEMORY_RETRIEVAL == "index":
+        try:
+            return retrieve_from_index(query)
+        except Exception as e:
+            print(f"⚠️  Memory index unavailable ({e}), falling back to the memory agent")
     
-    # Configure backend
-    def make_backend(runtime):
-        return StateBackend(runtime)
-    
-    # Create a nested memory manager agent
-    nested_agent = create_deep_agent(
-        tools=[read_text_file, write_text_file],
-        system_prompt=MEMORY_MANAGER_PROMPT,
-        model=llm,
-        backend=make_backend,
-    )
-    
-    # Build the request based on operation
     if operation == "store":
         if not experience or not experience.strip():
             return "❌ Error: No experience provided to store"
-        
-        request = f"""STORE Operation:
-
-Experience to remember: {experience}
-Context: {context if context else "None"}
-
-Instructions:
-1. Read memories.txt
-2. Add this experience as a concise 1-2 sentence memory
-3. Keep 15-20 memories total (remove oldest if over capacity)
-4. Write back to memories.txt
-
-Return: Success message with total memory count"""
-
-    elif operation == "retrieve":
+        from memory_store import store_memory
+        return store_memory(experience, context).summary()
+    
+    if operation == "consolidate":
+        from memory_consolidation import consolidate_memories
+        return consolidate_memories().summary()
+    
+    nested_agent = get_memory_agent()
+    
+    # Build the request based on operation
+    if operation == "retrieve":
         request = f"""RETRIEVE Operation:
 
 Query: {query}
@@ -127,21 +140,6 @@ Instructions:
 
 Note: Memories may have slight imperfections - that's natural."""
 
-    elif operation == "consolidate":
-        request = """CONSOLIDATE Operation:
-
-Instructions:
-1. Read all memories from memories.txt
-2. Cluster similar memories
-3. Merge related memories into richer, single memories
-4. Simplify overly detailed ones
-5. Keep emotionally significant moments vivid
-6. Allow slight creative shifts (memory isn't perfect)
-7. Maintain 15-20 memories total
-8. Write consolidated memories back to memories.txt
-
-Be bold in merging! Return: Success message with count before → after"""
-
     else:
         return f"❌ Unknown operation: {operation}"
     
@@ -155,4 +153,4 @@ Be bold in merging! Return: Success message with count before → after"""
     return final_message
 
 
-__all__ = ["memory_deep_agent"]
+__all__ = ["memory_deep_agent", "build_memory_agent", "get_memory_agent"]
@@ -1,9 +1,8 @@
 """Personality Manager Sub-Graph - Multi-step personality refinement with observability"""
 from typing import TypedDict, Annotated, Sequence
 from langgraph.graph import StateGraph, END
-from langchain_openai import ChatOpenAI
+from llm_registry import get_chat_model
 from langchain_core.messages import HumanMessage, SystemMessage
-import os
 import operator
 
 
@@ -26,6 +25,7 @@ class PersonalityManagerState(TypedDict):
     traits_to_refine: dict[str, str]  # {old_trait: new_refined_trait}
     traits_to_add: list[str]
     traits_to_remove: list[str]
+    loaded_version: str  # personality.txt version seen by load (optimistic concurrency)
     
     # Output
     final_traits: list[str]
@@ -126,27 +126,22 @@ Return ONLY a JSON object:
 
 def load_current_traits(state: PersonalityManagerState) -> PersonalityManagerState:
     """Node 1: Load current personality traits from file"""
-    from tools import read_text_file
+    from identity_store import get_identity_store
     
-    try:
-        content = read_text_file("personality.txt")
-        traits = [line.strip() for line in content.split('\n') if line.strip()]
-    except:
-        traits = []
+    # Cached read, refreshed only when personality.txt changes on disk
+    traits, version = get_identity_store().read_versioned("personality")
     
     state["current_traits"] = traits
     state["current_count"] = len(traits)
+    state["loaded_version"] = version
     state["decision_log"] = [f"📋 Loaded {len(traits)} current traits"]
     
     return state
 
 
-def extract_observed_traits(state: PersonalityManagerState) -> PersonalityManagerState:
-    """Node 2: Extract traits observed in the story"""
-    llm = ChatOpenAI(
-        model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-        temperature=0.3,
-    )
+def extract_observed_traits(state: PersonalityManagerState) -> dict:
+    """Node 2: Extract traits observed in the story (runs in parallel with Node 3)"""
+    llm = get_chat_model(temperature=0.3)
     
     messages = [
         SystemMessage(content="You extract writing personality traits from story content."),
@@ -167,23 +162,22 @@ def extract_observed_traits(state: PersonalityManagerState) -> PersonalityManage
     except:
         observed = []
     
-    state["observed_traits"] = observed[:3]  # Max 3
-    state["decision_log"] = [f"🔍 Observed {len(observed)} traits in story: {', '.join(observed)}"]
-    
-    return state
+    # Return only the keys this branch owns (Node 3 writes state concurrently)
+    return {
+        "observed_traits": observed[:3],  # Max 3
+        "decision_log": [f"🔍 Observed {len(observed)} traits in story: {', '.join(observed)}"],
+    }
 
 
-def evaluate_existing_traits(state: PersonalityManagerState) -> PersonalityManagerState:
-    """Node 3: Evaluate current traits for accuracy and refinement"""
+def evaluate_existing_traits(state: PersonalityManagerState) -> dict:
+    """Node 3: Evaluate current traits for accuracy and refinement (runs in parallel with Node 2)"""
     if not state["current_traits"]:
-        state["trait_evaluations"] = {}
-        state["decision_log"] = ["⚠️ No existing traits to evaluate"]
-        return state
+        return {
+            "trait_evaluations": {},
+            "decision_log": ["⚠️ No existing traits to evaluate"],
+        }
     
-    llm = ChatOpenAI(
-        model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-        temperature=0.2,
-    )
+    llm = get_chat_model(temperature=0.2)
     
     messages = [
         SystemMessage(content="You evaluate personality traits for accuracy and refinement opportunities."),
@@ -204,22 +198,19 @@ def evaluate_existing_traits(state: PersonalityManagerState) -> PersonalityManag
     except:
         evaluations = {}
     
-    state["trait_evaluations"] = evaluations
-    
     # Log summary
     avg_score = sum(e.get("score", 0) for e in evaluations.values()) / len(evaluations) if evaluations else 0
     refinements_suggested = sum(1 for e in evaluations.values() if e.get("refinement", "") != "keep as-is")
-    state["decision_log"] = [f"📊 Evaluated traits: Avg score {avg_score:.1f}/10, {refinements_suggested} refinements suggested"]
     
-    return state
+    return {
+        "trait_evaluations": evaluations,
+        "decision_log": [f"📊 Evaluated traits: Avg score {avg_score:.1f}/10, {refinements_suggested} refinements suggested"],
+    }
 
 
 def decide_refinement(state: PersonalityManagerState) -> PersonalityManagerState:
     """Node 4: Decide how to refine the trait list"""
-    llm = ChatOpenAI(
-        model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-        temperature=0.4,
-    )
+    llm = get_chat_model(temperature=0.4)
     
     import json
     
@@ -259,39 +250,51 @@ def decide_refinement(state: PersonalityManagerState) -> PersonalityManagerState
 
 def apply_refinement(state: PersonalityManagerState) -> PersonalityManagerState:
     """Node 5: Apply refinement decisions and write to file"""
-    from tools import write_text_file
-    
-    # Start with current traits
-    new_traits = state["current_traits"].copy()
+    from identity_store import get_identity_store
     
-    # Remove traits
-    for trait in state["traits_to_remove"]:
-        if trait in new_traits:
-            new_traits.remove(trait)
-    
-    # Refine traits
-    for old_trait, new_trait in state["traits_to_refine"].items():
-        if old_trait in new_traits:
-            idx = new_traits.index(old_trait)
-            new_traits[idx] = new_trait
-    
-    # Add traits
-    for trait in state["traits_to_add"]:
-        if trait not in new_traits and len(new_traits) < 12:
-            new_traits.append(trait)
+    def refine(current_traits: list[str]) -> list[str]:
+        # Start from the traits on disk (a concurrent run may have changed them)
+        new_traits = current_traits
+        
+        # Remove traits
+        for trait in state["traits_to_remove"]:
+            if trait in new_traits:
+                new_traits.remove(trait)
+        
+        # Refine traits
+        for old_trait, new_trait in state["traits_to_refine"].items():
+            if old_trait in new_traits:
+                idx = new_traits.index(old_trait)
+                new_traits[idx] = new_trait
+        
+        # Add traits
+        for trait in state["traits_to_add"]:
+            if trait not in new_traits and len(new_traits) < 12:
+                new_traits.append(trait)
+        
+        # Ensure we have 10-12 traits
+        if len(new_traits) > 12:
+            # Keep highest scoring traits
+            scores = {t: state["trait_evaluations"].get(t, {}).get("score", 5) for t in new_traits}
+            new_traits = sorted(new_traits, key=lambda t: scores.get(t, 5), reverse=True)[:12]
+        
+        return new_traits
     
-    # Ensure we have 10-12 traits
-    if len(new_traits) > 12:
-        # Keep highest scoring traits
-        scores = {t: state["trait_evaluations"].get(t, {}).get("score", 5) for t in new_traits}
-        new_traits = sorted(new_traits, key=lambda t: scores.get(t, 5), reverse=True)[:12]
+    # Locked read-modify-write with atomic replace
+    result = get_identity_store().update_lines(
+        "personality", refine, expected_version=state.get("loaded_version")
+    )
+    new_traits = result.lines
+    get_identity_store().record_scores("personality", {
+        trait: evaluation.get("score")
+        for trait, evaluation in state["trait_evaluations"].items()
+        if isinstance(evaluation, dict)
+    })
     
     state["final_traits"] = new_traits
     
-    # Write to file
-    write_text_file("personality.txt", '\n'.join(new_traits) + '\n', mode='w')
-    
-    state["decision_log"] = [f"✅ Updated personality.txt: {state['current_count']} → {len(new_traits)} traits"]
+    merged = " (merged with a concurrent update)" if result.merged else ""
+    state["decision_log"] = [f"✅ Updated personality.txt: {state['current_count']} → {len(new_traits)} traits{merged}"]
     
     return state
 
@@ -307,14 +310,14 @@ def return_current(state: PersonalityManagerState) -> PersonalityManagerState:
 # ROUTING LOGIC
 # ============================================================================
 
-def route_by_operation(state: PersonalityManagerState) -> str:
-    """Route based on operation type"""
+def route_by_operation(state: PersonalityManagerState) -> str | list[str]:
+    """Route based on operation type (refine fans out to extract + evaluate)"""
     operation = state.get("operation", "retrieve")
     
     if operation == "retrieve":
         return "retrieve"
     elif operation == "refine":
-        return "refine"
+        return ["extract", "evaluate"]  # Independent LLM calls, run in parallel
     else:
         return "retrieve"  # Default
 
@@ -343,18 +346,16 @@ def build_personality_subgraph():
     graph.add_conditional_edges(
         "load",
         route_by_operation,
-        {
-            "retrieve": "retrieve",
-            "refine": "extract"
-        }
+        ["retrieve", "extract", "evaluate"]
     )
     
     # Retrieve path (simple)
     graph.add_edge("retrieve", END)
     
     # Refine path (complex workflow)
-    graph.add_edge("extract", "evaluate")
-    graph.add_edge("evaluate", "decide")
+    # extract and evaluate only read the inputs and the loaded file, so they
+    # fan out from load and decide waits for both (fan-in)
+    graph.add_edge(["extract", "evaluate"], "decide")
     graph.add_edge("decide", "apply")
     graph.add_edge("apply", END)
     
@@ -380,7 +381,7 @@ def personality_manager_subgraph_tool(
     Multi-step workflow with full observability:
     1. Load current personality traits
     2. Extract observed traits from story
-    3. Evaluate existing traits (score + refinement suggestions)
+    3. Evaluate existing traits (score + refinement suggestions) - in parallel with step 2
     4. Decide refinements (refine/add/remove)
     5. Apply changes and write file
     
@@ -405,6 +406,7 @@ def personality_manager_subgraph_tool(
         "traits_to_refine": {},
         "traits_to_add": [],
         "traits_to_remove": [],
+        "loaded_version": "",
         "final_traits": [],
         "decision_log": []
     })
@@ -1,22 +1,27 @@
 """Research Agent - Nested Deep Agent for adaptive research"""
-import os
+import threading
+
 from deepagents import create_deep_agent
 from deepagents.backends import StateBackend
-from langchain_openai import ChatOpenAI
-from tools import internet_search
+from config import MAX_SEARCHES
+from llm_registry import get_chat_model
+from research_cache import get_research_cache
+from run_budget import run_scope
+from tools import internet_search, internet_search_many
 
 RESEARCH_AGENT_PROMPT = """You are a research specialist agent.
 Your mission: Conduct thorough, adaptive research on any given topic.
 
 ## Your Capabilities:
-- **internet_search(query)** - Search the web for information
+- **internet_search_many(queries)** - Run several searches at once; returns one merged, de-duplicated digest (preferred)
+- **internet_search(query)** - Run a single follow-up search
 
 ## Your Strategy:
 1. Analyze the topic to understand its nature (technical, philosophical, current events, scientific, etc.)
 2. Generate 2-4 focused search queries that explore different angles
-3. Execute searches strategically
+3. Execute ALL of them in ONE internet_search_many call
 4. Evaluate if results are sufficient or if you need deeper research
-5. If needed, perform additional targeted searches
+5. If needed, perform additional targeted searches (again batched when there are several)
 6. Synthesize all findings into a creative writing brief
 
 ## Output Format (REQUIRED):
@@ -43,6 +48,48 @@ Focus on inspiring creative storytelling, not academic completeness.
 """
 
 
+# ============================================================================
+# AGENT CONSTRUCTION
+# ============================================================================
+
+def build_research_agent(model=None):
+    """Compile the nested research agent (planning + filesystem middleware)"""
+    llm = model or get_chat_model(temperature=0.3)  # Moderate temp for balanced research
+    
+    # Configure backend
+    def make_backend(runtime):
+        return StateBackend(runtime)
+    
+    # Create a nested research agent with web search capability
+    return create_deep_agent(
+        tools=[internet_search_many, internet_search],
+        system_prompt=RESEARCH_AGENT_PROMPT,
+        model=llm,
+        backend=make_backend,
+    )
+
+
+# Compiled lazily on first use, then shared by every call and thread.
+# The graph has no checkpointer, so each invoke() starts from its own
+# input state (messages, todos, virtual files) and nothing leaks between calls.
+_research_agent = None
+_research_agent_lock = threading.Lock()
+
+
+def get_research_agent():
+    """Get or compile the shared research agent"""
+    global _research_agent
+    if _research_agent is None:
+        with _research_agent_lock:
+            if _research_agent is None:
+                _research_agent = build_research_agent()
+    return _research_agent
+
+
+# ============================================================================
+# TOOL INTERFACE
+# ============================================================================
+
 def research_deep_agent(topic: str) -> str:
     """
     Tool: Adaptive research agent using nested Deep Agent
@@ -53,40 +100,37 @@ def research_deep_agent(topic: str) -> str:
     - Evaluate result quality and search deeper if needed
     - Synthesize findings with appropriate focus
     
+    Briefs are cached by topic: a similar topic researched within the
+    freshness window is answered from the cache with no search or LLM call.
+    
     Args:
         topic: The topic to research for creative writing
         
     Returns:
         Research brief with SUMMARY, KEY_FACTS, DISCOVERED_TOPICS
     """
-    llm = ChatOpenAI(
-        model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-        temperature=0.3,  # Moderate temp for balanced research
-    )
-    
-    # Configure backend
-    def make_backend(runtime):
-        return StateBackend(runtime)
+    cache = get_research_cache()
+    if cache is not None:
+        cached = cache.lookup(topic)
+        if cached is not None:
+            return cached[0]["brief"]
     
-    # Create a nested research agent with internet_search capability
-    nested_agent = create_deep_agent(
-        tools=[internet_search],
-        system_prompt=RESEARCH_AGENT_PROMPT,
-        model=llm,
-        backend=make_backend,
-    )
+    nested_agent = get_research_agent()
     
-    # Invoke with the research request
-    result = nested_agent.invoke({
-        "messages": [{
-            "role": "user",
-            "content": f"Research this topic for creative writing: {topic}\n\nProvide: SUMMARY, KEY_FACTS, DISCOVERED_TOPICS"
-        }]
-    })
+    # Invoke with the research request (own search limit, charged to the run too)
+    with run_scope(max_searches=MAX_SEARCHES):
+        result = nested_agent.invoke({
+            "messages": [{
+                "role": "user",
+                "content": f"Research this topic for creative writing: {topic}\n\nProvide: SUMMARY, KEY_FACTS, DISCOVERED_TOPICS"
+            }]
+        })
     
     # Extract the final response
     final_message = result["messages"][-1].content
+    if cache is not None:
+        cache.store(topic, final_message)
     return final_message
 
 
-__all__ = ["research_deep_agent"]
+__all__ = ["research_deep_agent", "build_research_agent", "get_research_agent"]
@@ -1,9 +1,8 @@
 """Topics Manager Sub-Graph - Multi-step topic curation with observability"""
 from typing import TypedDict, Annotated, Sequence
 from langgraph.graph import StateGraph, END
-from langchain_openai import ChatOpenAI
+from llm_registry import get_chat_model
 from langchain_core.messages import HumanMessage, SystemMessage
-import os
 import operator
 
 
@@ -25,6 +24,7 @@ class TopicsManagerState(TypedDict):
     topic_scores: dict[str, float]
     topics_to_add: list[str]
     topics_to_remove: list[str]
+    loaded_version: str  # topics.txt version seen by load (optimistic concurrency)
     
     # Output
     final_topics: list[str]
@@ -109,27 +109,22 @@ Return ONLY a JSON object:
 
 def load_current_topics(state: TopicsManagerState) -> TopicsManagerState:
     """Node 1: Load current topics from file"""
-    from tools import read_text_file
+    from identity_store import get_identity_store
     
-    try:
-        content = read_text_file("topics.txt")
-        topics = [line.strip() for line in content.split('\n') if line.strip()]
-    except:
-        topics = []
+    # Cached read, refreshed only when topics.txt changes on disk
+    topics, version = get_identity_store().read_versioned("topics")
     
     state["current_topics"] = topics
     state["current_count"] = len(topics)
+    state["loaded_version"] = version
     state["decision_log"] = [f"📋 Loaded {len(topics)} current topics"]
     
     return state
 
 
-def extract_candidate_topics(state: TopicsManagerState) -> TopicsManagerState:
-    """Node 2: Extract new topic candidates from research"""
-    llm = ChatOpenAI(
-        model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-        temperature=0.3,  # Lower temp for extraction
-    )
+def extract_candidate_topics(state: TopicsManagerState) -> dict:
+    """Node 2: Extract new topic candidates from research (runs in parallel with Node 3)"""
+    llm = get_chat_model(temperature=0.3)  # Lower temp for extraction
     
     messages = [
         SystemMessage(content="You extract new topics from research content."),
@@ -150,23 +145,22 @@ def extract_candidate_topics(state: TopicsManagerState) -> TopicsManagerState:
     except:
         candidates = []
     
-    state["candidate_topics"] = candidates[:3]  # Max 3 candidates
-    state["decision_log"] = [f"🔍 Found {len(candidates)} candidate topics: {', '.join(candidates)}"]
-    
-    return state
+    # Return only the keys this branch owns (Node 3 writes state concurrently)
+    return {
+        "candidate_topics": candidates[:3],  # Max 3 candidates
+        "decision_log": [f"🔍 Found {len(candidates)} candidate topics: {', '.join(candidates)}"],
+    }
 
 
-def score_existing_topics(state: TopicsManagerState) -> TopicsManagerState:
-    """Node 3: Score current topics for continued relevance"""
+def score_existing_topics(state: TopicsManagerState) -> dict:
+    """Node 3: Score current topics for continued relevance (runs in parallel with Node 2)"""
     if not state["current_topics"]:
-        state["topic_scores"] = {}
-        state["decision_log"] = ["⚠️ No existing topics to score"]
-        return state
+        return {
+            "topic_scores": {},
+            "decision_log": ["⚠️ No existing topics to score"],
+        }
     
-    llm = ChatOpenAI(
-        model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-        temperature=0.2,  # Very low temp for consistent scoring
-    )
+    llm = get_chat_model(temperature=0.2)  # Very low temp for consistent scoring
     
     messages = [
         SystemMessage(content="You score topics for continued relevance and interest."),
@@ -188,21 +182,18 @@ def score_existing_topics(state: TopicsManagerState) -> TopicsManagerState:
     except:
         scores = {}
     
-    state["topic_scores"] = scores
-    
     # Log scores
     score_summary = ", ".join([f"{t}: {s}/10" for t, s in scores.items()])
-    state["decision_log"] = [f"📊 Scored topics: {score_summary}"]
     
-    return state
+    return {
+        "topic_scores": scores,
+        "decision_log": [f"📊 Scored topics: {score_summary}"],
+    }
 
 
 def decide_rotation(state: TopicsManagerState) -> TopicsManagerState:
     """Node 4: Decide which topics to add/remove"""
-    llm = ChatOpenAI(
-        model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-        temperature=0.4,  # Moderate temp for decision-making
-    )
+    llm = get_chat_model(temperature=0.4)  # Moderate temp for decision-making
     
     import json
     
@@ -236,31 +227,39 @@ def decide_rotation(state: TopicsManagerState) -> TopicsManagerState:
 
 def apply_rotation(state: TopicsManagerState) -> TopicsManagerState:
     """Node 5: Apply the rotation decision and write to file"""
-    from tools import write_text_file
+    from identity_store import get_identity_store
     
-    # Start with current topics
-    new_topics = state["current_topics"].copy()
-    
-    # Remove topics
-    for topic in state["topics_to_remove"]:
-        if topic in new_topics:
-            new_topics.remove(topic)
-    
-    # Add topics
-    for topic in state["topics_to_add"]:
-        if topic not in new_topics and len(new_topics) < 6:
-            new_topics.append(topic)
+    def rotate(current_topics: list[str]) -> list[str]:
+        # Start from the topics on disk (a concurrent run may have changed them)
+        new_topics = current_topics
+        
+        # Remove topics
+        for topic in state["topics_to_remove"]:
+            if topic in new_topics:
+                new_topics.remove(topic)
+        
+        # Add topics
+        for topic in state["topics_to_add"]:
+            if topic not in new_topics and len(new_topics) < 6:
+                new_topics.append(topic)
+        
+        # Ensure we have 5-6 topics
+        if len(new_topics) > 6:
+            new_topics = new_topics[:6]
+        
+        return new_topics
     
-    # Ensure we have 5-6 topics
-    if len(new_topics) > 6:
-        new_topics = new_topics[:6]
+    # Locked read-modify-write with atomic replace
+    result = get_identity_store().update_lines(
+        "topics", rotate, expected_version=state.get("loaded_version")
+    )
+    new_topics = result.lines
+    get_identity_store().record_scores("topics", state["topic_scores"])
     
     state["final_topics"] = new_topics
     
-    # Write to file
-    write_text_file("topics.txt", '\n'.join(new_topics) + '\n', mode='w')
-    
-    state["decision_log"] = [f"✅ Updated topics.txt: {state['current_count']} → {len(new_topics)} topics"]
+    merged = " (merged with a concurrent update)" if result.merged else ""
+    state["decision_log"] = [f"✅ Updated topics.txt: {state['current_count']} → {len(new_topics)} topics{merged}"]
     
     return state
 
@@ -276,14 +275,14 @@ def return_current(state: TopicsManagerState) -> TopicsManagerState:
 # ROUTING LOGIC
 # ============================================================================
 
-def route_by_operation(state: TopicsManagerState) -> str:
-    """Route based on operation type"""
+def route_by_operation(state: TopicsManagerState) -> str | list[str]:
+    """Route based on operation type (evolve fans out to extract + score)"""
     operation = state.get("operation", "retrieve")
     
     if operation == "retrieve":
         return "retrieve"
     elif operation == "evolve":
-        return "evolve"
+        return ["extract", "score"]  # Independent LLM calls, run in parallel
     else:
         return "retrieve"  # Default
 
@@ -312,18 +311,16 @@ def build_topics_subgraph():
     graph.add_conditional_edges(
         "load",
         route_by_operation,
-        {
-            "retrieve": "retrieve",
-            "evolve": "extract"
-        }
+        ["retrieve", "extract", "score"]
     )
     
     # Retrieve path (simple)
     graph.add_edge("retrieve", END)
     
     # Evolve path (complex workflow)
-    graph.add_edge("extract", "score")
-    graph.add_edge("score", "decide")
+    # extract and score only read the inputs and the loaded file, so they
+    # fan out from load and decide waits for both (fan-in)
+    graph.add_edge(["extract", "score"], "decide")
     graph.add_edge("decide", "apply")
     graph.add_edge("apply", END)
     
@@ -349,7 +346,7 @@ def topics_manager_subgraph_tool(
     Multi-step workflow with full observability:
     1. Load current topics
     2. Extract candidates from research
-    3. Score existing topics (1-10)
+    3. Score existing topics (1-10) - in parallel with step 2
     4. Decide rotation (add/remove)
     5. Apply changes and write file
     
@@ -373,6 +370,7 @@ def topics_manager_subgraph_tool(
         "topic_scores": {},
         "topics_to_add": [],
         "topics_to_remove": [],
+        "loaded_version": "",
         "final_topics": [],
         "decision_log": []
     })
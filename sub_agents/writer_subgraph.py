@@ -1,12 +1,15 @@
 """Writer Agent Sub-Graph - Multi-step story generation with refinement"""
 from typing import TypedDict, Annotated, Sequence
+from langgraph.config import get_stream_writer
 from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import create_react_agent
-from langchain_openai import ChatOpenAI
+from llm_registry import get_chat_model
+from story_formatting import clean_story_formatting
+from token_counter import count_tokens, fit_to_length
 from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
-import os
 import operator
-import re
+import threading
+import time
 
 
 # ============================================================================
@@ -22,12 +25,15 @@ class WriterState(TypedDict):
     emotions: str
     memories: str
     timestamp: str
+    started_at: float  # time.time() when the run began, for the catalog's latency
     
     # Internal state
     outline: str
     draft_story: str
     refined_story: str
-    filename: str
+    length_attempts: list  # token count after each refine attempt
+    filename: str  # "" when the story was rejected as a near-duplicate
+    duplicate_of: str  # saved story this one near-duplicates ("" if none)
     
     # Output
     final_story: str
@@ -143,80 +149,82 @@ Draft:
 
 Refine the story. Consider loading ending techniques if needed."""
 
+REPLAN_PROMPT = """This outline closely matches a story that has already been written ({filename}).
+Create a new 3-5 sentence outline on the same topic with a clearly different premise, setting and turn.
+Return ONLY the new outline."""
 
-# ============================================================================
-# FORMATTING CLEANUP
-# ============================================================================
+LENGTH_PROMPT = """{instruction}
 
-def clean_story_formatting(text: str) -> str:
-    """Fix common LLM formatting issues"""
-    
-    # Fix broken words with em-dashes or spaces
-    text = re.sub(r'Elar—a', 'Elara', text)
-    text = re.sub(r'th—an\s+a', 'than a', text)
-    text = re.sub(r'th—an', 'than', text)
-    text = re.sub(r'th\s+is', 'this', text)
-    text = re.sub(r'mor—e', 'more', text)
-    
-    # Fix common broken words (spaces inserted mid-word)
-    text = re.sub(r'\bth\s+is\b', 'this', text)
-    text = re.sub(r'\bth\s+at\b', 'that', text)
-    text = re.sub(r'\bth\s+an\b', 'than', text)
-    text = re.sub(r'\bth\s+em\b', 'them', text)
-    text = re.sub(r'\bth\s+en\b', 'then', text)
-    text = re.sub(r'\bth\s+ere\b', 'there', text)
-    text = re.sub(r'\bwh\s+at\b', 'what', text)
-    text = re.sub(r'\bwh\s+en\b', 'when', text)
-    text = re.sub(r'\bwh\s+ere\b', 'where', text)
-    text = re.sub(r'\bwh\s+ich\b', 'which', text)
-    
-    # Fix broken words with em-dashes
-    text = re.sub(r'—a\b', 'a', text)
-    text = re.sub(r'—an\b', 'an', text)
-    text = re.sub(r'—the\b', 'the', text)
-    
-    # Fix possessives (common LLM issue: "Elas processor" → "Ela's processor")
-    possessive_words = [
-        "processor", "avatar", "voice", "heart", "mind", "eye", "eyes",
-        "face", "hand", "hands", "body", "screen", "companion", "tablet",
-        "window", "room", "world", "life", "story", "memory", "thought"
-    ]
-    
-    for word in possessive_words:
-        # Fix: "words processor" → "word's processor"
-        text = re.sub(rf"\b(\w+)s\s+{word}\b", rf"\1's {word}", text)
-    
-    # Fix double spaces
-    text = re.sub(r' {2,}', ' ', text)
-    
-    # Preserve paragraph breaks (don't collapse them)
-    # Replace multiple newlines with double newline (paragraph break)
-    text = re.sub(r'\n{3,}', '\n\n', text)
-    
-    # Ensure sentences are properly separated
-    text = re.sub(r'([.!?])([A-Z])', r'\1 \2', text)
-    
-    return text.strip()
+Story:
+{story}
+
+Return ONLY the revised story text with its paragraph breaks."""
 
 
 # ============================================================================
-# NODE FUNCTIONS
+# TOOL-USING AGENTS
 # ============================================================================
 
-def create_outline(state: WriterState) -> WriterState:
-    """Node 1: Create story outline (with skill access)"""
+STAGE_TEMPERATURES = {
+    "outline": 0.6,  # Moderate creativity for planning
+    "draft": 0.7,    # Higher temp for creative writing
+    "refine": 0.5,   # Lower temp for precise editing
+}
+
+# One compiled react agent per stage, shared by every story in the process
+_stage_agents = {}
+_stage_agents_lock = threading.Lock()
+
+
+def build_stage_agent(stage: str, model=None):
+    """Compile the skill-using react agent for a writer stage"""
     from tools import use_skill, read_skill_resource
     
-    llm = ChatOpenAI(
-        model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-        temperature=0.6,  # Moderate creativity for planning
-    )
-    
-    # Create a react agent with skill tools
-    outline_agent = create_react_agent(
+    llm = model or get_chat_model(temperature=STAGE_TEMPERATURES[stage])
+    return create_react_agent(
         model=llm,
         tools=[use_skill, read_skill_resource]
     )
+
+
+def get_stage_agent(stage: str):
+    """Get or compile the shared react agent for a writer stage"""
+    agent = _stage_agents.get(stage)
+    if agent is None:
+        with _stage_agents_lock:
+            agent = _stage_agents.get(stage)
+            if agent is None:
+                agent = build_stage_agent(stage)
+                _stage_agents[stage] = agent
+    return agent
+
+
+def _find_duplicate(kind: str, text: str):
+    """Closest earlier story/outline above DEDUP_THRESHOLD (None if none or disabled)"""
+    try:
+        from story_dedup import get_dedup_index
+        index = get_dedup_index(kind)
+        return index.find_duplicate(text) if index and text else None
+    except Exception:
+        return None  # dedup is advisory; never block a story on it
+
+
+def _final_text(result) -> str:
+    """Text of the last AI message that is not a tool call"""
+    for msg in reversed(result["messages"]):
+        if isinstance(msg, AIMessage) and msg.content and not msg.tool_calls:
+            return msg.content.strip()
+    return ""
+
+
+# ============================================================================
+# NODE FUNCTIONS
+# ============================================================================
+
+def create_outline(state: WriterState) -> WriterState:
+    """Node 1: Create story outline (with skill access)"""
+    # Shared react agent with skill tools (compiled once per process)
+    outline_agent = get_stage_agent("outline")
     
     # Invoke the agent with system prompt in messages
     result = outline_agent.invoke({
@@ -233,32 +241,33 @@ def create_outline(state: WriterState) -> WriterState:
     })
     
     # Extract the final outline from the last AI message
-    outline = ""
-    for msg in reversed(result["messages"]):
-        if isinstance(msg, AIMessage) and msg.content and not msg.tool_calls:
-            outline = msg.content.strip()
-            break
+    outline = _final_text(result)
+    log = [f"📝 Created story outline ({len(outline.split())} words)"]
+    
+    # Repeating an earlier outline would pay a full draft + refine for a duplicate
+    match = _find_duplicate("outlines", outline)
+    if match:
+        from config import DEDUP_OUTLINE_ACTION
+        similar = f"{match.filename} (~{match.similarity:.0%} similar)"
+        if DEDUP_OUTLINE_ACTION == "replan":
+            result = outline_agent.invoke({"messages": result["messages"] + [
+                HumanMessage(content=REPLAN_PROMPT.format(filename=match.filename))
+            ]})
+            outline = _final_text(result) or outline
+            log.append(f"♻️ Outline matched {similar}, re-planned")
+        else:
+            log.append(f"⚠️ Outline resembles {similar}")
     
     state["outline"] = outline
-    state["decision_log"] = [f"📝 Created story outline ({len(outline.split())} words)"]
+    state["decision_log"] = log
     
     return state
 
 
 def draft_story(state: WriterState) -> WriterState:
     """Node 2: Write initial story draft (with skill access)"""
-    from tools import use_skill, read_skill_resource
-    
-    llm = ChatOpenAI(
-        model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-        temperature=0.7,  # Higher temp for creative writing
-    )
-    
-    # Create a react agent with skill tools
-    draft_agent = create_react_agent(
-        model=llm,
-        tools=[use_skill, read_skill_resource]
-    )
+    # Shared react agent with skill tools (compiled once per process)
+    draft_agent = get_stage_agent("draft")
     
     # Invoke the agent with system prompt in messages
     result = draft_agent.invoke({
@@ -276,36 +285,25 @@ def draft_story(state: WriterState) -> WriterState:
     })
     
     # Extract the final draft from the last AI message
-    draft = ""
-    for msg in reversed(result["messages"]):
-        if isinstance(msg, AIMessage) and msg.content and not msg.tool_calls:
-            draft = msg.content.strip()
-            break
-    
-    # Count tokens (rough approximation: 1 token ≈ 0.75 words)
-    word_count = len(draft.split())
-    token_estimate = int(word_count * 0.75)
+    draft = _final_text(result)
     
     state["draft_story"] = draft
-    state["decision_log"] = [f"✍️ Drafted story (~{token_estimate} tokens, {word_count} words)"]
+    state["decision_log"] = [f"✍️ Drafted story ({count_tokens(draft)} tokens, {len(draft.split())} words)"]
     
     return state
 
 
 def refine_and_format(state: WriterState) -> WriterState:
-    """Node 3: Refine to 500 tokens and fix formatting (with skill access)"""
-    from tools import use_skill, read_skill_resource
+    """Node 3: Refine to the target length and fix formatting (with skill access)
     
-    llm = ChatOpenAI(
-        model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-        temperature=0.5,  # Lower temp for precise editing
-    )
+    The length is measured locally after every pass; the LLM is only asked
+    again, with a targeted trim/expand instruction, while the story is
+    outside STORY_TARGET_TOKENS ± STORY_TOKEN_TOLERANCE.
+    """
+    from config import STORY_TARGET_TOKENS, STORY_TOKEN_TOLERANCE, REFINE_MAX_ATTEMPTS
     
-    # Create a react agent with skill tools
-    refine_agent = create_react_agent(
-        model=llm,
-        tools=[use_skill, read_skill_resource]
-    )
+    # Shared react agent with skill tools (compiled once per process)
+    refine_agent = get_stage_agent("refine")
     
     # Invoke the agent with system prompt in messages
     result = refine_agent.invoke({
@@ -318,46 +316,110 @@ def refine_and_format(state: WriterState) -> WriterState:
     })
     
     # Extract the final refined story from the last AI message
-    refined = ""
-    for msg in reversed(result["messages"]):
-        if isinstance(msg, AIMessage) and msg.content and not msg.tool_calls:
-            refined = msg.content.strip()
-            break
-    
-    # Apply formatting cleanup
-    formatted = clean_story_formatting(refined)
-    
-    # Count final tokens
-    word_count = len(formatted.split())
-    token_estimate = int(word_count * 0.75)
+    refined = _final_text(result)
+    
+    # Streaming callers see a retry's tokens after this marker, not glued to the last attempt
+    emit = get_stream_writer()
+    attempts = [1]
+    
+    def adjust_length(story: str, instruction: str) -> str:
+        attempts.append(len(attempts) + 1)
+        emit({"type": "attempt", "stage": "refine", "attempt": attempts[-1], "instruction": instruction})
+        result = refine_agent.invoke({
+            "messages": [
+                SystemMessage(content=REFINE_SYSTEM_PROMPT),
+                HumanMessage(content=LENGTH_PROMPT.format(instruction=instruction, story=story))
+            ]
+        })
+        return clean_story_formatting(_final_text(result))
+    
+    # Apply formatting cleanup, then trim/expand until the length is in range
+    fitted = fit_to_length(
+        clean_story_formatting(refined),
+        adjust_length,
+        target=STORY_TARGET_TOKENS,
+        tolerance=STORY_TOKEN_TOLERANCE,
+        max_attempts=REFINE_MAX_ATTEMPTS,
+    )
     
-    state["refined_story"] = formatted
-    state["decision_log"] = [f"🔧 Refined and formatted (~{token_estimate} tokens, {word_count} words)"]
+    state["refined_story"] = fitted.text
+    state["length_attempts"] = fitted.attempts
+    state["decision_log"] = [f"🔧 Refined and formatted: {fitted.summary()}"]
     
     return state
 
 
 def save_story(state: WriterState) -> WriterState:
-    """Node 4: Save the final story to file"""
+    """Node 4: Save the final story to file (unless it duplicates a saved one)"""
+    from config import STORIES_DIR
+    from story_catalog import reserve_story_file
     from tools import write_text_file
     
-    # Create filename from topic and timestamp
-    topic_slug = state["topic"].lower().replace(" ", "_").replace("-", "_")
-    topic_slug = re.sub(r'[^a-z0-9_]', '', topic_slug)  # Remove special chars
-    topic_slug = topic_slug[:50]  # Limit length
-    
-    filename = f"stories/{state['timestamp']}_{topic_slug}.txt"
-    
-    # Write the story
-    write_text_file(filename, state["refined_story"], mode='w')
+    story = state["refined_story"]
+    log = []
+    
+    match = _find_duplicate("stories", story)
+    if match:
+        from config import DEDUP_ACTION
+        similar = f"{match.filename} (~{match.similarity:.0%} similar)"
+        state["duplicate_of"] = match.filename
+        if DEDUP_ACTION == "reject":
+            state["filename"] = ""
+            state["final_story"] = story
+            state["decision_log"] = [f"♻️ Not saved: near-duplicate of {similar}"]
+            return state
+        log.append(f"⚠️ Near-duplicate of {similar}")
+    
+    # Claim {STORIES_DIR}/{timestamp}_{topic_slug}[_{n}].txt
+    filename = reserve_story_file(STORIES_DIR, state["timestamp"], state["topic"])
+    
+    # Write the story into the reserved name
+    write_text_file(filename, story, mode='w')
+    log.insert(0, f"💾 Saved to: {filename}")
+    log.extend(_index_story(state, filename, story))
     
     state["filename"] = filename
-    state["final_story"] = state["refined_story"]
-    state["decision_log"] = [f"💾 Saved to: {filename}"]
+    state["final_story"] = story
+    state["decision_log"] = log
     
     return state
 
 
+def _index_story(state: WriterState, filename: str, story: str) -> list:
+    """Add a saved story to the catalog, search and dedup indexes; returns warnings"""
+    warnings = []
+    
+    # Listing and searching never have to open story files
+    try:
+        from story_catalog import get_story_catalog
+        started_at = state.get("started_at")
+        get_story_catalog().add(
+            filename,
+            story,
+            topic=state["topic"],
+            emotions=state.get("emotions", "").split("\n"),
+            timestamp=state["timestamp"],
+            latency=round(time.time() - started_at, 2) if started_at else None,
+        )
+    except Exception as e:
+        warnings.append(f"⚠️ Story catalog not updated: {e}")
+    try:
+        from story_search import get_story_search
+        get_story_search().add_story(filename, state["topic"], story)
+    except Exception as e:
+        warnings.append(f"⚠️ Search index not updated: {e}")
+    try:
+        from story_dedup import get_dedup_index
+        for kind, text in (("stories", story), ("outlines", state.get("outline", ""))):
+            index = get_dedup_index(kind)
+            if index and text:
+                index.add(filename, text)
+    except Exception as e:
+        warnings.append(f"⚠️ Dedup index not updated: {e}")
+    
+    return warnings
+
+
 # ============================================================================
 # BUILD THE GRAPH
 # ============================================================================
@@ -393,6 +455,47 @@ def build_writer_subgraph():
 writer_subgraph = build_writer_subgraph()
 
 
+def initial_writer_state(
+    topic: str,
+    research: str = "",
+    personality: str = "",
+    emotions: str = "",
+    memories: str = "",
+    timestamp: str = ""
+) -> WriterState:
+    return {
+        "topic": topic,
+        "research": research,
+        "personality": personality,
+        "emotions": emotions,
+        "memories": memories,
+        "timestamp": timestamp,
+        "started_at": time.time(),
+        "outline": "",
+        "draft_story": "",
+        "refined_story": "",
+        "length_attempts": [],
+        "filename": "",
+        "duplicate_of": "",
+        "final_story": "",
+        "decision_log": []
+    }
+
+
+def run_writer(
+    topic: str,
+    research: str = "",
+    personality: str = "",
+    emotions: str = "",
+    memories: str = "",
+    timestamp: str = ""
+) -> WriterState:
+    """Run the writer sub-graph; the final state (filename is "" if not saved)"""
+    return writer_subgraph.invoke(initial_writer_state(
+        topic, research, personality, emotions, memories, timestamp
+    ))
+
+
 def writer_subgraph_tool(
     topic: str,
     research: str = "",
@@ -407,7 +510,7 @@ def writer_subgraph_tool(
     Workflow:
     1. Create outline - Plan narrative structure
     2. Draft story - Write 600-token initial draft
-    3. Refine - Edit to 500 tokens, fix formatting
+    3. Refine - Edit to 500 tokens (measured locally, retried if off), fix formatting
     4. Save - Write to stories/ directory
     
     Args:
@@ -423,20 +526,7 @@ def writer_subgraph_tool(
     """
     
     # Invoke the sub-graph
-    result = writer_subgraph.invoke({
-        "topic": topic,
-        "research": research,
-        "personality": personality,
-        "emotions": emotions,
-        "memories": memories,
-        "timestamp": timestamp,
-        "outline": "",
-        "draft_story": "",
-        "refined_story": "",
-        "filename": "",
-        "final_story": "",
-        "decision_log": []
-    })
+    result = run_writer(topic, research, personality, emotions, memories, timestamp)
     
     # Format response with decision log
     log = "\n".join(result["decision_log"])
@@ -444,4 +534,91 @@ def writer_subgraph_tool(
     return f"{result['final_story']}\n\n---\nGeneration Log:\n{log}"
 
 
-__all__ = ["writer_subgraph_tool", "writer_subgraph"]
+# ============================================================================
+# STREAMING INTERFACE
+# ============================================================================
+
+STAGES = ["outline", "draft", "refine", "save"]
+STREAMED_STAGES = {"draft", "refine"}  # stages whose LLM tokens are forwarded
+
+
+def _stage_of(metadata: dict) -> str:
+    """Writer stage an LLM chunk belongs to (nested agents report their own node)
+    
+    The namespace starts with the caller's nodes when the writer itself runs
+    inside another graph (the pipeline's write node).
+    """
+    for part in metadata.get("langgraph_checkpoint_ns", "").split("|"):
+        node = part.split(":")[0]
+        if node in STAGES:
+            return node
+    return metadata.get("langgraph_node", "")
+
+
+def stream_story(
+    topic: str,
+    research: str = "",
+    personality: str = "",
+    emotions: str = "",
+    memories: str = "",
+    timestamp: str = ""
+):
+    """
+    Run the writer sub-graph and yield progress as it happens
+    
+    Yields dicts:
+    - {"type": "stage", "stage": "draft", "status": "started" | "done", "log": str}
+    - {"type": "delta", "stage": "draft" | "refine", "text": str} - LLM tokens
+      (refine deltas are pre-cleanup; the final story is in the "done" event)
+    - {"type": "attempt", "stage": "refine", "attempt": int, "instruction": str} -
+      the story was off length and is rewritten; later refine deltas replace
+      the text streamed so far
+    - {"type": "done", "story": str, "filename": str, "duplicate_of": str,
+      "length_attempts": [int], "log": str}
+    """
+    from tools import get_timestamp
+    
+    inputs = initial_writer_state(
+        topic, research, personality, emotions, memories, timestamp or get_timestamp()
+    )
+    logs, final = [], {}
+    
+    yield {"type": "stage", "stage": STAGES[0], "status": "started", "log": ""}
+    # subgraphs=True: the tokens come from the react agents nested in each stage
+    stream = writer_subgraph.stream(inputs, stream_mode=["updates", "messages", "custom"], subgraphs=True)
+    for _, mode, payload in stream:
+        if mode == "custom":
+            yield payload
+            continue
+        if mode == "messages":
+            chunk, metadata = payload
+            stage = _stage_of(metadata)
+            text = chunk.content if isinstance(chunk.content, str) else ""
+            if (stage in STREAMED_STAGES and text and isinstance(chunk, AIMessage)
+                    and not getattr(chunk, "tool_call_chunks", None)):
+                yield {"type": "delta", "stage": stage, "text": text}
+            continue
+        
+        for node, update in payload.items():
+            if node not in STAGES:
+                continue  # steps inside a stage's agent
+            update = update or {}
+            node_logs = list(update.get("decision_log", []))
+            logs.extend(node_logs)
+            final.update(update)
+            yield {"type": "stage", "stage": node, "status": "done", "log": "\n".join(node_logs)}
+            if node in STAGES[:-1]:
+                next_stage = STAGES[STAGES.index(node) + 1]
+                yield {"type": "stage", "stage": next_stage, "status": "started", "log": ""}
+    
+    yield {
+        "type": "done",
+        "story": final.get("final_story", ""),
+        "filename": final.get("filename", ""),
+        "duplicate_of": final.get("duplicate_of", ""),
+        "length_attempts": final.get("length_attempts", []),
+        "log": "\n".join(logs),
+    }
+
+
+__all__ = ["writer_subgraph_tool", "writer_subgraph", "get_stage_agent", "stream_story"]
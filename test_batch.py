@@ -0,0 +1,20 @@
+"""Tests for batch story generation"""
+import pytest
+
+pytest.importorskip("deepagents")
+from batch import percentile, run_batch
+
+
+def test_percentile_uses_nearest_rank():
+    assert percentile([], 95) == 0.0
+    assert percentile([3.0, 1.0, 2.0, 4.0], 50) == 2.0
+    assert percentile([3.0, 1.0, 2.0, 4.0], 95) == 4.0
+
+
+def test_deep_agent_stories_run_through_the_async_model_client(stub_openai):
+    stub_openai.reply = "The story is written."  # no tool calls: one model turn per story
+    summary = run_batch(count=2, concurrency=2)
+
+    assert summary["succeeded"] == 2, [run["error"] for run in summary["runs"]]
+    assert stub_openai.requests == 2
+    assert all(run["llm_calls"] == 1 and run["tokens"] == 15 for run in summary["runs"])
@@ -0,0 +1,140 @@
+"""Tests for the identity store: caching, optimistic versioning, concurrent writers"""
+import multiprocessing
+import os
+
+import pytest
+
+from identity_db import SQLiteIdentityStore
+from identity_store import IdentityStore, StaleWriteError, atomic_write, is_identity_file
+
+
+WRITERS = 6
+UPDATES_PER_WRITER = 25
+BACKENDS = ["files", "sqlite"]
+
+
+def _open_store(backend: str, base_dir: str):
+    if backend == "sqlite":
+        return SQLiteIdentityStore(os.path.join(base_dir, "identity.db"), import_dir=base_dir)
+    return IdentityStore(base_dir)
+
+
+def _append_many(backend: str, base_dir: str, writer: int) -> None:
+    store = _open_store(backend, base_dir)
+    for i in range(UPDATES_PER_WRITER):
+        store.update_lines("topics", lambda lines: lines + [f"writer {writer} update {i}"])
+
+
+def test_read_cache_refreshes_when_file_changes(tmp_path):
+    (tmp_path / "emotions.txt").write_text("Wonder\nMelancholy hope\n", encoding="utf-8")
+    store = IdentityStore(str(tmp_path))
+
+    assert store.read_lines("emotions") == ["Wonder", "Melancholy hope"]
+    assert store.read_lines("emotions") == ["Wonder", "Melancholy hope"]
+    assert (store.hits, store.misses) == (1, 1)
+
+    store.write_lines("emotions", ["Quiet intensity"])
+    assert store.read_lines("emotions") == ["Quiet intensity"]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_missing_file_reads_as_empty(tmp_path, backend):
+    assert _open_store(backend, str(tmp_path)).read_lines("topics") == []
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_stale_write_is_rejected(tmp_path, backend):
+    store = _open_store(backend, str(tmp_path))
+    store.write_lines("topics", ["A", "B"])
+    _, version = store.read_versioned("topics")
+
+    _open_store(backend, str(tmp_path)).write_lines("topics", ["A", "B", "C"])  # another writer
+
+    with pytest.raises(StaleWriteError):
+        store.write_lines("topics", ["A"], expected_version=version)
+    assert store.read_lines("topics") == ["A", "B", "C"]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_update_merges_on_top_of_concurrent_change(tmp_path, backend):
+    store = _open_store(backend, str(tmp_path))
+    store.write_lines("topics", ["A", "B"])
+    _, version = store.read_versioned("topics")
+
+    _open_store(backend, str(tmp_path)).write_lines("topics", ["A", "B", "C"])
+
+    result = store.update_lines("topics", lambda lines: [t for t in lines if t != "A"], version)
+    assert result.merged
+    assert result.lines == ["B", "C"]
+
+
+def test_atomic_write_leaves_no_temp_files(tmp_path):
+    store = IdentityStore(str(tmp_path))
+    store.write_lines("personality", ["Curious"])
+    leftovers = [p for p in os.listdir(tmp_path) if p.endswith(".tmp")]
+    assert leftovers == []
+
+
+@pytest.mark.skipif(os.name == "nt", reason="POSIX permissions")
+def test_atomic_write_keeps_file_mode(tmp_path):
+    path = str(tmp_path / "story.txt")
+    (tmp_path / "plain.txt").write_text("open() applies the umask")
+    atomic_write(path, "first")
+    assert os.stat(path).st_mode & 0o777 == os.stat(tmp_path / "plain.txt").st_mode & 0o777  # not 0600
+    os.chmod(path, 0o640)
+    atomic_write(path, "second")
+    assert os.stat(path).st_mode & 0o777 == 0o640
+
+
+def test_only_identity_files_are_shared():
+    assert is_identity_file("topics.txt") and is_identity_file("./memories.txt")
+    assert not is_identity_file("stories/2026-01-01_10-00-00_rain.txt")
+
+
+def test_write_text_file_creates_missing_directories(tmp_path, monkeypatch):
+    pytest.importorskip("tavily")
+    import identity_store
+    from tools import write_text_file
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(identity_store, "_identity_store", IdentityStore(str(tmp_path)))
+    write_text_file("drafts/new.txt", "first", mode="w")
+    write_text_file("notes/log.txt", "appended", mode="a")
+    assert (tmp_path / "drafts" / "new.txt").read_text(encoding="utf-8") == "first"
+    assert (tmp_path / "notes" / "log.txt").read_text(encoding="utf-8") == "appended"
+    assert not list(tmp_path.rglob("*.lock"))
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_concurrent_processes_lose_no_updates(tmp_path, backend):
+    """Stress: several processes read-modify-write the same identity at once"""
+    _open_store(backend, str(tmp_path))  # create the schema before the race
+    ctx = multiprocessing.get_context("spawn")
+    workers = [
+        ctx.Process(target=_append_many, args=(backend, str(tmp_path), w))
+        for w in range(WRITERS)
+    ]
+    for p in workers:
+        p.start()
+    for p in workers:
+        p.join(timeout=60)
+        assert p.exitcode == 0
+
+    lines = _open_store(backend, str(tmp_path)).read_lines("topics")
+    assert len(lines) == WRITERS * UPDATES_PER_WRITER
+    assert len(set(lines)) == len(lines)
+
+
+def test_sqlite_seeds_from_files_and_keeps_history(tmp_path):
+    (tmp_path / "personality.txt").write_text("Curious\nWry\n", encoding="utf-8")
+    store = SQLiteIdentityStore(str(tmp_path / "identity.db"), import_dir=str(tmp_path))
+    assert store.read_lines("personality") == ["Curious", "Wry"]
+
+    store.update_lines("personality", lambda traits: ["Curious", "Gentle"])
+    store.record_scores("personality", {"Curious": 8, "Gentle": "7.5"})
+
+    assert [(t["text"], t["score"]) for t in store.read_scored("personality")] == [
+        ("Curious", 8.0), ("Gentle", 7.5)
+    ]
+    changes = {(h["action"], h["text"]) for h in store.history("personality") if h["version"] == 2}
+    assert changes == {("add", "Gentle"), ("remove", "Wry")}
@@ -0,0 +1,25 @@
+"""Tests for the shared chat model registry (against the local stub server)"""
+import asyncio
+
+import pytest
+
+pytest.importorskip("langchain_openai")
+from llm_registry import ModelRegistry
+
+
+def test_sync_and_async_calls_reuse_the_shared_pools(stub_openai):
+    registry = ModelRegistry()
+    llm = registry.get(0.5)
+    assert registry.get(0.5) is llm
+
+    async def calls():
+        return [(await llm.ainvoke("ping")).content for _ in range(3)]
+
+    assert llm.invoke("ping").content == "ok"
+    assert asyncio.run(calls()) == ["ok", "ok", "ok"]  # async trace hooks must be coroutines
+    registry.close()
+
+    stats = registry.stats
+    assert stats.requests == stub_openai.requests == 4
+    assert stats.connections_opened == stub_openai.connections == 2  # one per pool
+    assert stats.clients_created == 1 and stats.reused_requests == 2
@@ -0,0 +1,64 @@
+"""Tests for clustered, incremental memory consolidation"""
+from types import SimpleNamespace
+
+from identity_store import IdentityStore
+from memory_consolidation import cluster_memories, consolidate_memories
+from memory_index import HashingEmbedder
+
+
+OCEAN = [
+    "Wrote about the deep ocean and glowing bioluminescent creatures",
+    "Wrote about glowing bioluminescent creatures in the deep ocean trenches",
+]
+MACHINES = [
+    "Explored robot caregivers helping elderly patients at home",
+    "Explored elderly patients bonding with robot caregivers at home",
+]
+LONE = "A quiet poem about winter trains"
+
+
+class MergeModel:
+    """Returns a deterministic merged memory and records each cluster it saw"""
+
+    def __init__(self):
+        self.calls = []
+
+    def invoke(self, prompt):
+        self.calls.append(prompt)
+        return SimpleNamespace(content=f"Merged memory {len(self.calls)}")
+
+
+def _consolidate(tmp_path, store, model):
+    return consolidate_memories(
+        store=store,
+        model=model,
+        embedder=HashingEmbedder(),
+        watermark_path=str(tmp_path / "watermark.json"),
+    )
+
+
+def test_similar_memories_cluster_together():
+    memories = [OCEAN[0], MACHINES[0], LONE, OCEAN[1], MACHINES[1]]
+    clusters = cluster_memories(HashingEmbedder()(memories))
+    assert sorted(clusters) == [[0, 3], [1, 4], [2]]
+
+
+def test_only_changed_clusters_reach_the_llm(tmp_path):
+    store = IdentityStore(str(tmp_path))
+    store.write_lines("memories", OCEAN + [LONE])
+    model = MergeModel()
+
+    first = _consolidate(tmp_path, store, model)
+    assert (first.before, first.after, first.llm_calls) == (3, 2, 1)
+    assert store.read_lines("memories") == ["Merged memory 1", LONE]
+
+    # Unchanged store: nothing to do
+    assert _consolidate(tmp_path, store, model).skipped
+    assert len(model.calls) == 1
+
+    # New memories form a new cluster; the settled ones are not re-sent
+    store.update_lines("memories", lambda lines: lines + MACHINES)
+    third = _consolidate(tmp_path, store, model)
+    assert third.llm_calls == 1
+    assert "robot caregivers" in model.calls[-1]
+    assert "Merged memory 1" not in model.calls[-1]
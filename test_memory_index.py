@@ -0,0 +1,69 @@
+"""Tests for the hybrid memory index: ranking, incremental sync, NumPy fallback"""
+import memory_index
+from memory_index import BM25Index, MemoryIndex, tokenize
+
+
+MEMORIES = [
+    "Wrote about a lighthouse keeper who talked to the sea",
+    "Explored AI caregiving and the ethics of robot nurses",
+    "A story about quantum computers dreaming in superposition",
+    "Felt wonder writing about deep ocean bioluminescence",
+]
+
+
+class CountingEmbedder(memory_index.HashingEmbedder):
+    def __init__(self):
+        super().__init__()
+        self.texts = []
+
+    def __call__(self, texts):
+        self.texts.extend(texts)
+        return super().__call__(texts)
+
+
+def test_bm25_prefers_rare_matching_terms():
+    bm25 = BM25Index()
+    for i, text in enumerate(MEMORIES):
+        bm25.add(i, tokenize(text))
+    scores = bm25.scores(tokenize("robot caregiving"))
+    assert max(scores, key=scores.get) == 1
+
+    bm25.remove(1, tokenize(MEMORIES[1]))
+    assert bm25.scores(tokenize("robot caregiving")) == {}
+
+
+def test_search_ranks_relevant_memories_first():
+    index = MemoryIndex()
+    index.sync(MEMORIES)
+    assert index.search("ethics of caregiving robots", k=1) == [MEMORIES[1]]
+    assert index.search("ocean", k=2)[0] == MEMORIES[3]
+
+
+def test_empty_or_unmatched_query_returns_most_recent():
+    index = MemoryIndex(alpha=1.0)  # BM25 only, so nothing matches "zebra"
+    index.sync(MEMORIES)
+    assert index.search("", k=2) == MEMORIES[-2:]
+    assert index.search("zebra", k=2) == MEMORIES[-2:]
+
+
+def test_sync_embeds_only_new_memories():
+    embedder = CountingEmbedder()
+    index = MemoryIndex(embedder=embedder)
+    index.sync(MEMORIES, version="v1")
+    index.sync(MEMORIES, version="v1")  # unchanged version: no work
+    index.sync(MEMORIES[1:] + ["Wrote about caregiving robots again"], version="v2")
+
+    assert embedder.texts == MEMORIES + ["Wrote about caregiving robots again"]
+    assert len(index) == 4
+    assert MEMORIES[0] not in index.search("lighthouse keeper", k=4)
+
+
+def test_pure_python_cosine_matches_numpy_path(monkeypatch):
+    index = MemoryIndex()
+    index.sync(MEMORIES)
+    expected = index.search("quantum dreams", k=2)
+
+    monkeypatch.setattr(memory_index, "np", None)
+    fallback = MemoryIndex()
+    fallback.sync(MEMORIES)
+    assert fallback.search("quantum dreams", k=2) == expected
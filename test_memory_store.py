@@ -0,0 +1,68 @@
+"""Tests for the deterministic memory store: compression, eviction, salience"""
+from types import SimpleNamespace
+
+import pytest
+
+from identity_db import SQLiteIdentityStore
+from identity_store import IdentityStore
+from memory_store import compress_experience, evict, store_memory
+
+
+class OneShotModel:
+    """Stand-in chat model that counts invocations"""
+
+    def __init__(self, content: str):
+        self.content = content
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        return SimpleNamespace(content=self.content)
+
+
+def _open_store(backend, tmp_path):
+    if backend == "sqlite":
+        return SQLiteIdentityStore(str(tmp_path / "identity.db"), import_dir=str(tmp_path))
+    return IdentityStore(str(tmp_path))
+
+
+def test_evict_drops_lowest_salience_then_oldest():
+    memories = ["a", "b", "c", "d"]
+    kept, evicted = evict(memories, {"a": 9, "b": 2, "c": 2}, capacity=2, protect="d")
+    assert evicted == ["b", "c"]
+    assert kept == ["a", "d"]
+
+
+def test_short_experience_is_stored_without_llm():
+    model = OneShotModel('{"memory": "unused", "salience": 9}')
+    memory, salience, used_llm = compress_experience("Wrote about tides.", model=model)
+    assert (memory, used_llm, model.calls) == ("Wrote about tides.", False, 0)
+
+
+def test_long_experience_uses_one_llm_call_and_survives_bad_output():
+    long_text = "I wrote a long story about the sea. " * 20
+    model = OneShotModel('```json\n{"memory": "The sea taught me patience.", "salience": 8}\n```')
+    assert compress_experience(long_text, model=model) == ("The sea taught me patience.", 8.0, True)
+    assert model.calls == 1
+
+    broken = OneShotModel("not json")
+    memory, salience, _ = compress_experience(long_text, model=broken)
+    assert memory == "I wrote a long story about the sea."
+    assert broken.calls == 1
+
+
+@pytest.mark.parametrize("backend", ["files", "sqlite"])
+def test_store_appends_and_evicts_at_capacity(tmp_path, backend):
+    store = _open_store(backend, tmp_path)
+    for i in range(4):
+        store_memory(f"Memory number {i}.", store=store, capacity=4)
+    store.record_scores("memories", {"Memory number 0.": 9})
+
+    result = store_memory("Memory number 4.", store=store, capacity=4)
+
+    assert result.evicted == ["Memory number 1."]
+    assert store.read_lines("memories") == [
+        "Memory number 0.", "Memory number 2.", "Memory number 3.", "Memory number 4."
+    ]
+    assert store.read_scores("memories")["Memory number 4."] == 5.0
+    assert "Memory number 1." not in store.read_scores("memories")
@@ -0,0 +1,28 @@
+"""Tests for the topic-similarity research brief cache"""
+import time
+
+from research_cache import ResearchCache, normalize_topic
+
+BRIEF = "SUMMARY:\nMachines may wake.\n\nKEY_FACTS:\n- Fact\n\nDISCOVERED_TOPICS:\n- Topic"
+
+
+def test_normalization_ignores_case_stopwords_and_plurals():
+    assert normalize_topic("The Dreams of Quantum Computers!") == "dream quantum computer"
+
+
+def test_near_duplicate_topic_hits(tmp_path):
+    cache = ResearchCache(str(tmp_path / "briefs.json"))
+    assert cache.store("AI consciousness", BRIEF)
+
+    entry, similarity = cache.lookup("AI Consciousness Emergence")
+    assert entry["brief"] == BRIEF and similarity >= cache.threshold
+    assert cache.lookup("AI caregiving") is None
+    assert cache.stats() == {"hits": 1, "misses": 1}
+
+
+def test_stale_and_incomplete_briefs_are_not_reused(tmp_path):
+    cache = ResearchCache(str(tmp_path / "briefs.json"), max_age_seconds=0.05)
+    assert not cache.store("Quantum dreams", "Search limit reached.")
+    cache.store("AI consciousness", BRIEF)
+    time.sleep(0.1)
+    assert cache.lookup("AI consciousness") is None
@@ -0,0 +1,53 @@
+"""Tests for context-scoped run budgets"""
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from run_budget import BudgetExceededError, current_budget, run_scope, start_run
+
+
+def test_threads_of_one_run_share_its_budget():
+    budget = start_run(max_searches=10)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [
+            pool.submit(contextvars.copy_context().run, lambda: current_budget().acquire_searches(1))
+            for _ in range(25)
+        ]
+        grants = [f.result() for f in futures]
+    assert sum(grants) == 10
+    assert budget.remaining()["searches"] == 0
+
+
+def test_concurrent_runs_have_separate_budgets():
+    async def story():
+        budget = start_run(max_searches=3)
+        await asyncio.sleep(0)
+        return current_budget() is budget, budget.acquire_searches(5)
+
+    async def main():
+        return await asyncio.gather(*[story() for _ in range(4)])
+
+    assert asyncio.run(main()) == [(True, 3)] * 4
+
+
+def test_nested_scope_has_own_limit_and_charges_parent():
+    run = start_run(max_searches=5)
+    with run_scope(max_searches=2) as research:
+        assert research.acquire_searches(3) == 2
+    assert current_budget() is run
+    assert run.remaining()["searches"] == 3
+
+    run.acquire_searches(2)
+    with run_scope(max_searches=2) as research:
+        assert research.acquire_searches(2) == 1  # parent only had 1 left
+
+
+def test_llm_calls_and_tokens_are_enforced():
+    budget = start_run(max_llm_calls=2, max_tokens=100)
+    budget.start_llm_call()
+    budget.add_tokens(120)
+    with pytest.raises(BudgetExceededError):
+        budget.start_llm_call()
+    assert "0 tokens left" in budget.describe()
@@ -0,0 +1,64 @@
+"""Tests for the on-disk Tavily result cache (stubbed client)"""
+import os
+import time
+
+from search_cache import SearchCache
+
+
+class StubTavilyClient:
+    def __init__(self):
+        self.calls = []
+
+    def search(self, query, max_results, topic, include_raw_content):
+        self.calls.append(query)
+        return {"results": [{"title": query, "url": f"https://example.com/{len(self.calls)}", "content": "..."}]}
+
+
+def test_repeated_query_is_served_from_disk(tmp_path):
+    client = StubTavilyClient()
+    cache = SearchCache(str(tmp_path))
+
+    first = cache.fetch(client, "AI consciousness", 5)
+    again = SearchCache(str(tmp_path)).fetch(client, "  ai   Consciousness ", 5)  # new process, same key
+
+    assert again == first
+    assert client.calls == ["AI consciousness"]
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_key_includes_every_search_parameter(tmp_path):
+    client = StubTavilyClient()
+    cache = SearchCache(str(tmp_path))
+    cache.fetch(client, "AI consciousness", 5)
+    cache.fetch(client, "AI consciousness", 3)
+    cache.fetch(client, "AI consciousness", 5, topic="news")
+    cache.fetch(client, "AI consciousness", 5, include_raw_content=True)
+    assert len(client.calls) == 4
+
+
+def test_expired_entries_are_refetched(tmp_path):
+    client = StubTavilyClient()
+    cache = SearchCache(str(tmp_path), ttl_seconds=0.05)
+    cache.fetch(client, "quantum dreams", 5)
+    time.sleep(0.1)
+    cache.fetch(client, "quantum dreams", 5)
+    assert len(client.calls) == 2
+    assert cache.stats()["hits"] == 0
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    client = StubTavilyClient()
+    cache = SearchCache(str(tmp_path), max_entries=2)
+    cache.fetch(client, "a", 5)
+    cache.fetch(client, "b", 5)
+    old = time.time() - 60
+    for root, _, files in os.walk(tmp_path):  # make "a" and "b" look old...
+        for name in files:
+            os.utime(os.path.join(root, name), (old, old))
+    cache.fetch(client, "a", 5)  # ...then touch "a"
+    cache.fetch(client, "c", 5)  # evicts "b"
+
+    cache.fetch(client, "a", 5)
+    cache.fetch(client, "b", 5)
+    assert client.calls == ["a", "b", "c", "b"]
+    assert cache.evictions >= 1
@@ -0,0 +1,127 @@
+"""Tests for the story HTTP API (with a fake runner in place of the graphs)"""
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+import pytest
+
+pytest.importorskip("starlette")
+pytest.importorskip("httpx")
+from starlette.testclient import TestClient
+
+import config
+import identity_store
+import server
+import story_catalog
+from identity_store import IdentityStore
+from story_catalog import StoryCatalog
+from story_jobs import JobManager
+from token_counter import approximate_tokens
+
+STORY_NAME = "2026-01-01_10-00-00_rain.txt"
+
+
+async def fake_runner(job, emit):
+    await asyncio.sleep(0.01)
+    emit({"type": "stage", "stage": "write", "seconds": 0.01})
+    return {"topic": job.topic, "filename": f"stories/{job.topic}.txt", "story": "It rained."}
+
+
+@pytest.fixture
+def make_client(tmp_path, monkeypatch):
+    stories_dir = tmp_path / "stories"
+    stories_dir.mkdir()
+    (stories_dir / STORY_NAME).write_text("The rain kept falling on the machine.", encoding="utf-8")
+    (tmp_path / "topics.txt").write_text("Rain\nMachines\n", encoding="utf-8")
+
+    catalog = StoryCatalog(str(tmp_path / "catalog.db"), str(stories_dir), count=approximate_tokens)
+    catalog.sync()
+    monkeypatch.setattr(config, "STORIES_DIR", str(stories_dir))
+    monkeypatch.setattr(story_catalog, "_story_catalog", catalog)
+    monkeypatch.setattr(identity_store, "_identity_store", IdentityStore(str(tmp_path)))
+
+    def make(runner=fake_runner, start=True, **options):
+        @asynccontextmanager
+        async def lifespan(app):
+            jobs = JobManager(runner, **options)
+            if start:
+                jobs.start()
+            app.state.jobs = jobs
+            yield
+            await jobs.stop()
+
+        app = server.create_app()
+        app.router.lifespan_context = lifespan
+        return TestClient(app)
+
+    return make
+
+
+def sse_events(text):
+    """(id, event, data) for each SSE message, skipping comments"""
+    events = []
+    for block in text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.split("\n") if not line.startswith(":"))
+        if fields:
+            events.append((int(fields["id"]), fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_generate_then_stream_and_resume_events(make_client):
+    with make_client() as client:
+        response = client.post("/api/stories/generate", json={"topic": "rain"})
+        assert response.status_code == 202
+        job = response.json()["job"]
+        assert response.headers["location"] == f"/api/jobs/{job['id']}"
+
+        with client.stream("GET", f"/api/jobs/{job['id']}/events") as stream:
+            assert stream.headers["content-type"].startswith("text/event-stream")
+            events = sse_events(stream.read().decode())
+        assert [(i, name) for i, name, _ in events] == [(0, "queued"), (1, "started"), (2, "stage"), (3, "done")]
+        assert events[-1][2]["filename"] == "stories/rain.txt"
+
+        with client.stream("GET", f"/api/jobs/{job['id']}/events", headers={"Last-Event-ID": "1"}) as stream:
+            assert [i for i, _, _ in sse_events(stream.read().decode())] == [2, 3]
+
+        status = client.get(f"/api/jobs/{job['id']}").json()["job"]
+        assert status["status"] == "done" and status["result"]["story"] == "It rained."
+        assert client.get("/api/jobs/nope").status_code == 404
+        assert client.get("/api/jobs/nope/events").status_code == 404
+
+
+def test_generate_validates_mode_and_limits_the_queue(make_client):
+    with make_client(start=False, queue_limit=1) as client:  # no workers: jobs stay queued
+        assert client.post("/api/stories/generate", json={"mode": "poem"}).status_code == 400
+        assert client.post("/api/stories/generate", json=["rain"]).status_code == 400
+        assert client.post("/api/stories/generate", json={}).status_code == 202
+        assert client.post("/api/stories/generate", json={}).status_code == 429
+
+
+def test_stories_are_listed_and_read_by_name_only(make_client):
+    with make_client() as client:
+        page = client.get("/api/stories", params={"limit": 5}).json()
+        assert [s["topic"] for s in page["stories"]] == ["rain"]
+
+        story = client.get(f"/api/stories/{STORY_NAME}").json()["story"]
+        assert story["content"] == "The rain kept falling on the machine."
+        assert client.get("/api/stories/2026-01-01_10-00-00_missing.txt").status_code == 404
+        assert client.get("/api/stories/..%2Ftopics.txt").status_code == 404
+        assert client.get("/api/stories/..%5Ctopics.txt").status_code == 404
+        assert client.get("/api/search", params={"q": "rain", "kind": "poems"}).status_code == 400
+
+
+def test_identity_updates_are_validated_and_versioned(make_client):
+    with make_client() as client:
+        topics = client.get("/api/identity").json()["identity"]["topics"]
+        assert topics["lines"] == ["Rain", "Machines"]
+
+        saved = client.put("/api/identity/topics", json={"lines": ["Rain", " ", "Tides"], "version": topics["version"]})
+        assert saved.status_code == 200 and saved.json()["topics"]["lines"] == ["Rain", "Tides"]
+
+        stale = client.put("/api/identity/topics", json={"lines": ["Fog"], "version": topics["version"]})
+        assert stale.status_code == 409
+        assert client.get("/api/identity").json()["identity"]["topics"]["lines"] == ["Rain", "Tides"]
+
+        assert client.put("/api/identity/secrets", json={"lines": []}).status_code == 404
+        assert client.put("/api/identity/topics", json={"lines": "Fog"}).status_code == 400
+        assert client.put("/api/identity/topics", json={"lines": [1, 2]}).status_code == 400
@@ -0,0 +1,87 @@
+"""Tests for the story catalog"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from story_catalog import StoryCatalog, make_excerpt, parse_story_filename, reserve_story_file
+from token_counter import approximate_tokens
+
+STORY = "The machine listened to the rain.\n\nIt wondered whether listening was a kind of love."
+
+
+def _catalog(tmp_path):
+    return StoryCatalog(str(tmp_path / "catalog.db"), str(tmp_path / "stories"), count=approximate_tokens)
+
+
+def test_add_records_metadata(tmp_path):
+    catalog = _catalog(tmp_path)
+    record = catalog.add("stories/2025-12-17_17-12-13_ai_dreams.txt", STORY, topic="AI dreams",
+                         emotions=["Cautious hope", ""], timestamp="2025-12-17_17-12-13", latency=12.5)
+    assert record.topic == "AI dreams" and record.emotions == ["Cautious hope"]
+    assert record.words == len(STORY.split()) and record.tokens >= record.words
+    assert record.excerpt.startswith("The machine listened to the rain. It wondered")
+    assert record.latency == 12.5 and len(record.content_hash) == 40
+
+
+def test_pages_are_newest_first_and_filterable(tmp_path):
+    catalog = _catalog(tmp_path)
+    for day in range(1, 26):
+        topic = "AI dreams" if day % 2 else "Quantum grief"
+        catalog.add(f"stories/2025-12-{day:02d}_10-00-00_x.txt", f"Story {day}", topic=topic)
+
+    seen, cursor = [], None
+    while True:
+        page = catalog.list_stories(limit=10, cursor=cursor)
+        seen.extend(s.timestamp[:10] for s in page.stories)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    assert seen == [f"2025-12-{day:02d}" for day in range(25, 0, -1)]
+
+    dreams = catalog.list_stories(limit=50, topic="ai DREAMS", since="2025-12-10", until="2025-12-20")
+    assert [s.timestamp[:10] for s in dreams.stories] == ["2025-12-19", "2025-12-17", "2025-12-15",
+                                                          "2025-12-13", "2025-12-11"]
+    assert catalog.count(topic="AI dreams") == 13
+    assert catalog.topics()[0] == {"topic": "AI dreams", "stories": 13, "latest": "2025-12-25_10-00-00"}
+
+
+def test_sync_picks_up_new_files_and_drops_deleted_ones(tmp_path):
+    stories = tmp_path / "stories"
+    stories.mkdir()
+    (stories / "2025-12-17_17-12-13_Artificial_creativity.txt").write_text(STORY, encoding="utf-8")
+    (stories / "2025-12-17_17-20-00_AI_consciousness_2.txt").write_text(STORY, encoding="utf-8")
+    catalog = _catalog(tmp_path)
+
+    assert catalog.sync() == (2, 0)
+    assert catalog.sync() == (0, 0)
+    assert [s.topic for s in catalog.list_stories().stories] == ["AI consciousness", "Artificial creativity"]
+
+    os.remove(stories / "2025-12-17_17-20-00_AI_consciousness_2.txt")
+    assert catalog.sync() == (0, 1)
+
+
+def test_helpers():
+    assert parse_story_filename("stories/2024-04-27_12-00-00_AI_consciousness.txt") == (
+        "2024-04-27_12-00-00", "AI consciousness")
+    assert parse_story_filename("notes.txt") == ("", "")
+    assert make_excerpt("word " * 100, limit=22) == "word word word word…"
+
+
+def test_saved_stories_survive_sync_with_custom_stories_dir(tmp_path):
+    stories_dir = str(tmp_path / "archive" / "tales")  # STORIES_DIR other than "stories"
+    catalog = StoryCatalog(str(tmp_path / "catalog.db"), stories_dir, count=approximate_tokens)
+    filename = reserve_story_file(stories_dir, "2025-12-17_17-12-13", "AI dreams!")
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write(STORY)
+    catalog.add(filename, STORY, topic="AI dreams")
+
+    assert filename == f"{stories_dir}/2025-12-17_17-12-13_ai_dreams.txt"
+    assert catalog.sync() == (0, 0)  # found on disk, so its row is kept
+    assert catalog.read_story(filename) == STORY
+
+
+def test_concurrent_reservations_never_share_a_name(tmp_path):
+    stories_dir = str(tmp_path / "stories")
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        names = list(pool.map(lambda _: reserve_story_file(stories_dir, "2025-12-17_17-12-13", "Rain"), range(16)))
+    assert len(set(names)) == 16
+    assert parse_story_filename(names[0]) == ("2025-12-17_17-12-13", "rain")
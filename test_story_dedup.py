@@ -0,0 +1,47 @@
+"""Tests for MinHash/LSH near-duplicate detection"""
+import random
+
+from story_dedup import NearDuplicateIndex, estimated_jaccard, minhash, shingles
+
+WORDS = "rain machine memory signal quiet light circuit dream voice window river glass".split()
+
+
+def story(seed: int, length: int = 200) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) + str(rng.randrange(50)) for _ in range(length))
+
+
+def edit(text: str, fraction: float, seed: int = 0) -> str:
+    """Replace a fraction of the words"""
+    rng = random.Random(seed)
+    words = text.split()
+    for i in rng.sample(range(len(words)), int(len(words) * fraction)):
+        words[i] = f"changed{i}"
+    return " ".join(words)
+
+
+def test_signature_estimates_jaccard():
+    a, b = story(1), edit(story(1), 0.05)
+    exact = len(shingles(a) & shingles(b)) / len(shingles(a) | shingles(b))
+    assert abs(estimated_jaccard(minhash(a), minhash(b)) - exact) < 0.2
+    assert estimated_jaccard(minhash(a), minhash(a)) == 1.0
+    assert estimated_jaccard(minhash(a), minhash(story(2))) < 0.1
+
+
+def test_finds_light_edits_but_not_different_stories(tmp_path):
+    index = NearDuplicateIndex(str(tmp_path / "dedup.db"), threshold=0.5)
+    index.add_many([(f"stories/{i}.txt", story(i)) for i in range(200)])
+
+    match = index.find_duplicate(edit(story(42), 0.05))
+    assert match.filename == "stories/42.txt" and match.similarity >= 0.5
+    assert index.find_duplicate(story(1000)) is None
+    assert index.find_duplicate(story(42), exclude="stories/42.txt") is None
+
+
+def test_reindexing_and_removal(tmp_path):
+    index = NearDuplicateIndex(str(tmp_path / "dedup.db"), kind="outlines")
+    index.add("stories/a.txt", story(1))
+    index.add("stories/a.txt", story(2))
+    assert index.count() == 1
+    assert index.find_duplicate(story(1)) is None
+    assert index.remove("stories/a.txt") and index.find_duplicate(story(2)) is None
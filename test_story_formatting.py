@@ -0,0 +1,45 @@
+"""Tests for the compiled story formatting engine"""
+import pytest
+
+from story_formatting import DEFAULT_RULES, FormattingEngine, merge_rules
+
+
+def test_fixes_broken_words_possessives_and_spacing():
+    engine = FormattingEngine()
+    text = "Elas processor hummed. It was more th—an a  machine.She knew th at\n\n\n\nwh en it woke."
+    assert engine.format(text) == (
+        "Ela's processor hummed. It was more than a machine. She knew that\n\nwhen it woke."
+    )
+
+
+def test_possessive_chains_resolve_in_one_pass():
+    assert FormattingEngine().format("The robots hands eyes") == "The robot's hand's eyes"
+
+
+@pytest.mark.parametrize("text, expected", [
+    # Chained em-dash artifacts: "—a", "—an" and "—the" apply in that order
+    ("the—the—a", "the—thea"),
+    ("an—the—a", "an—thea"),
+    (" —the—a\n\n\ne", "—thea\n\ne"),
+    ("it—an—a", "it—ana"),
+    ("the—a—the", "theathe"),
+])
+def test_chained_dash_artifacts(text, expected):
+    assert FormattingEngine().format(text) == expected
+
+
+def test_config_rules_extend_replace_and_disable_builtins():
+    rules = merge_rules(DEFAULT_RULES, [
+        {"phase": "broken_words", "name": "fix_teh", "pattern": r"\bteh\b", "replacement": "the"},
+        {"name": "double_space", "pattern": r" {2,}", "replacement": "_"},
+        {"name": "possessive", "enabled": False},
+        {"phase": "final", "name": "shout", "pattern": r"(!+)", "replacement": r"\1!"},
+    ])
+    engine = FormattingEngine(rules)
+    assert [p.name for p in engine.phases] == ["broken_words", "dash_a", "dash_an", "dash_the", "spacing", "final"]
+    assert engine.format("teh robots  voice!") == "the robots_voice!!"
+
+
+def test_named_groups_are_rejected():
+    with pytest.raises(ValueError):
+        FormattingEngine(merge_rules([], [{"phase": "x", "name": "bad", "pattern": r"(?P<a>x)"}]))
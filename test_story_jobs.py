@@ -0,0 +1,124 @@
+"""Tests for the story job queue and worker pool"""
+import asyncio
+
+import pytest
+
+from story_jobs import JobManager
+
+
+def run(coro):
+    return asyncio.run(asyncio.wait_for(coro, timeout=5))
+
+
+async def fake_runner(job, emit):
+    for stage in ("select_topic", "write"):
+        await asyncio.sleep(0.01)
+        emit({"type": "stage", "stage": stage})
+    if job.topic == "boom":
+        raise RuntimeError("no story today")
+    return {"topic": job.topic, "filename": f"stories/{job.topic}.txt"}
+
+
+def test_job_events_stream_until_done():
+    async def scenario():
+        jobs = JobManager(fake_runner, workers=1)
+        jobs.start()
+        job = jobs.submit("rain")
+        events = [event async for _, event in jobs.follow(job)]
+        await jobs.stop()
+        return job, events
+
+    job, events = run(scenario())
+    assert [e["type"] for e in events] == ["queued", "started", "stage", "stage", "done"]
+    assert job.status == "done" and events[-1]["filename"] == "stories/rain.txt"
+
+
+def test_follow_resumes_after_last_event_and_reports_failure():
+    async def scenario():
+        jobs = JobManager(fake_runner, workers=1)
+        jobs.start()
+        job = jobs.submit("boom")
+        [_ async for _ in jobs.follow(job)]
+        resumed = [index async for index, _ in jobs.follow(job, after=3)]
+        await jobs.stop()
+        return job, resumed
+
+    job, resumed = run(scenario())
+    assert job.status == "failed" and "no story today" in job.error
+    assert resumed == [3, 4] and job.events[-1]["type"] == "failed"
+
+
+def test_workers_bound_concurrency_and_queue_limit():
+    running, peak = 0, 0
+
+    async def slow_runner(job, emit):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+        return {}
+
+    async def scenario():
+        jobs = JobManager(slow_runner, workers=2, queue_limit=5, history=3)
+        submitted = [jobs.submit(str(i)) for i in range(5)]
+        with pytest.raises(asyncio.QueueFull):
+            jobs.submit("one too many")
+        jobs.start()
+        for job in submitted:
+            [_ async for _ in jobs.follow(job)]
+        await jobs.stop()
+        return jobs
+
+    jobs = run(scenario())
+    assert peak == 2
+    assert len(jobs.jobs) == 3  # only the newest finished jobs are kept
+
+
+def test_agent_jobs_run_the_compiled_graph_against_a_model(stub_openai):
+    pytest.importorskip("deepagents")
+    from agent import build_agent
+    from story_jobs import graph_runner
+
+    stub_openai.reply = "Here is your story."
+
+    async def scenario():
+        jobs = JobManager(graph_runner({"agent": build_agent()}), workers=1)
+        jobs.start()
+        job = jobs.submit("rain", "agent")
+        events = [event async for _, event in jobs.follow(job)]
+        await jobs.stop()
+        return job, events
+
+    job, events = run(scenario())
+    assert job.status == "done", job.error
+    assert events[-1]["reply"] == "Here is your story." and events[-1]["filename"] == ""
+    assert job.result["tokens"] == 15 and job.result["budget"]["llm_calls"] == 1
+
+
+def test_pipeline_jobs_stream_the_story_as_it_is_written(fake_writer):
+    from langgraph.graph import END, StateGraph
+    from pipeline import PipelineState, write_story
+    from story_jobs import graph_runner
+
+    graph = StateGraph(PipelineState)  # the pipeline's write stage on its own
+    graph.add_node("write", write_story)
+    graph.set_entry_point("write")
+    graph.add_edge("write", END)
+
+    async def scenario():
+        jobs = JobManager(graph_runner({"pipeline": graph.compile()}), workers=1)
+        jobs.start()
+        job = jobs.submit("rain")
+        events = [event async for _, event in jobs.follow(job)]
+        await jobs.stop()
+        return job, events
+
+    job, events = run(scenario())
+    assert job.status == "done", job.error
+    types = [e["type"] for e in events]
+    assert types[:2] == ["queued", "started"] and types[-2:] == ["stage", "done"]
+    retry = types.index("attempt")
+    drafted = "".join(e["text"] for e in events[:retry] if e["type"] == "delta")
+    assert drafted == "The first draft.Too short."
+    assert "".join(e["text"] for e in events[retry:] if e["type"] == "delta") == job.result["story"] == fake_writer[-1]
@@ -0,0 +1,59 @@
+"""Tests for full-text search over stories and memories"""
+from story_search import StorySearchIndex, fts_query
+
+
+def _index(tmp_path):
+    return StorySearchIndex(str(tmp_path / "search.db"), str(tmp_path / "stories"), highlight=("[", "]"))
+
+
+def test_ranks_topic_matches_first_and_highlights_snippets(tmp_path):
+    index = _index(tmp_path)
+    index.add_stories([
+        ("stories/a.txt", "Quantum grief", "A physicist mourns in a lab full of humming machines."),
+        ("stories/b.txt", "Machine dreams", "The machine dreamed of rain and of the people who built it."),
+        ("stories/c.txt", "Ocean memory", "Waves remember every ship."),
+    ])
+    hits = index.search_stories("machines dreaming")
+    assert [h.ref for h in hits] == ["stories/b.txt"]
+    assert "[machine] [dreamed]" in hits[0].snippet
+
+    hits = index.search_stories("machine")
+    assert [h.ref for h in hits] == ["stories/b.txt", "stories/a.txt"]
+    assert hits[0].score > hits[1].score
+
+
+def test_falls_back_to_any_word_and_reindexes_incrementally(tmp_path):
+    index = _index(tmp_path)
+    index.add_story("stories/a.txt", "Ocean memory", "Waves remember every ship.")
+    assert [h.ref for h in index.search_stories("ship lighthouse")] == ["stories/a.txt"]
+
+    index.add_story("stories/a.txt", "Ocean memory", "A lighthouse keeps watch.")
+    assert index.count() == 1
+    assert index.search_stories("ship") == []
+    assert index.remove_story("stories/a.txt") and index.search_stories("lighthouse") == []
+
+
+def test_memories_rebuild_only_when_version_changes(tmp_path):
+    index = _index(tmp_path)
+    assert index.sync_memories(["Wrote about rain on servers", "Learned about tides"], "v1")
+    assert not index.sync_memories(["ignored"], "v1")
+    assert [h.ref for h in index.search_memories("tides")] == ["Learned about tides"]
+
+    index.add_story("stories/a.txt", "Rain", "Rain fell on the servers all night.")
+    assert {h.kind for h in index.search("rain servers")} == {"story", "memory"}
+
+
+def test_sync_indexes_files_on_disk(tmp_path):
+    stories = tmp_path / "stories"
+    stories.mkdir()
+    (stories / "2025-12-17_17-12-13_Artificial_creativity.txt").write_text("A robot paints.", encoding="utf-8")
+    index = _index(tmp_path)
+    assert index.sync() == (1, 0)
+    hit = index.search_stories("creativity")[0]
+    assert hit.title == "Artificial creativity"
+
+
+def test_query_words_are_quoted():
+    assert fts_query('AND "near" (x*') == '"and" "near" "x"'
+    assert fts_query("a b", any_word=True) == '"a" OR "b"'
+    assert fts_query("!!") is None
@@ -0,0 +1,67 @@
+"""Tests for local token counting and the length-controlled refine loop"""
+import sys
+from types import SimpleNamespace
+
+import token_counter
+from token_counter import approximate_tokens, count_tokens, fit_to_length, length_instruction
+
+
+def words(n: int) -> str:
+    return " ".join(["word"] * n)
+
+
+def test_approximation_counts_more_tokens_than_words():
+    text = "The machine listened to the rain, and wondered whether it was dreaming."
+    assert len(text.split()) < approximate_tokens(text) < 2 * len(text.split())
+
+
+def test_falls_back_to_approximation_when_no_encoding_loads(monkeypatch):
+    def unknown_model(model):
+        raise KeyError(model)
+
+    def offline(name):
+        raise OSError("no cached BPE file and no network")
+
+    monkeypatch.setitem(sys.modules, "tiktoken", SimpleNamespace(encoding_for_model=unknown_model, get_encoding=offline))
+    monkeypatch.setitem(sys.modules, "config", SimpleNamespace(MODEL_NAME="my-finetune"))
+    monkeypatch.setattr(token_counter, "_encoding_loaded", False)
+    monkeypatch.setattr(token_counter, "_encoding", None)
+
+    text = "The machine listened to the rain."
+    assert count_tokens(text) == approximate_tokens(text)
+
+
+def test_in_range_text_is_not_rewritten():
+    calls = []
+    result = fit_to_length(words(505), lambda text, hint: calls.append(hint) or text,
+                           target=500, tolerance=20, count=lambda t: len(t.split()))
+    assert calls == []
+    assert result.attempts == [505] and result.within_tolerance
+
+
+def test_long_text_is_trimmed_with_a_targeted_instruction():
+    hints = []
+
+    def rewrite(text, hint):
+        hints.append(hint)
+        return words(len(text.split()) - 60)
+
+    result = fit_to_length(words(620), rewrite, target=500, tolerance=20, max_attempts=3,
+                           count=lambda t: len(t.split()))
+    assert result.attempts == [620, 560, 500]
+    assert result.tokens == 500 and result.within_tolerance
+    assert "Cut about 120 tokens" in hints[0]
+    assert "after 3 attempts: 620 → 560 → 500" in result.summary()
+
+
+def test_gives_up_after_max_attempts_keeping_the_closest_text():
+    replies = iter([words(300), words(700)])
+    result = fit_to_length(words(400), lambda text, hint: next(replies), target=500, tolerance=20,
+                           max_attempts=3, count=lambda t: len(t.split()))
+    assert result.attempts == [400, 300, 700]
+    assert result.tokens == 400 and not result.within_tolerance
+    assert "outside tolerance" in result.summary()
+
+
+def test_expand_instruction():
+    assert "Add about 80 tokens" in length_instruction(420, 500)
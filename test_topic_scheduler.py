@@ -0,0 +1,58 @@
+"""Tests for the topic/emotion diversity scheduler"""
+from story_catalog import StoryRecord
+from topic_scheduler import DEFAULT_TOPIC, TopicScheduler
+
+TOPICS = [
+    "AI consciousness and machine sentience",
+    "Deep sea bioluminescent creatures",
+    "Ancient star maps and navigation",
+]
+EMOTIONS = ["wonder", "melancholy", "curiosity", "dread"]
+
+
+def history(*stories):
+    """Newest-first records from (topic, emotions) pairs"""
+    return [StoryRecord(i, f"stories/{i}.txt", "", topic, list(emotions))
+            for i, (topic, emotions) in enumerate(stories)]
+
+
+def test_saturated_topic_is_avoided():
+    scheduler = TopicScheduler(history(
+        ("AI consciousness and machine sentience", ["wonder"]),
+        ("Machine sentience and AI consciousness", ["wonder"]),
+        ("Deep sea bioluminescent creatures", ["dread"]),
+    ))
+    proposal = scheduler.propose(TOPICS, EMOTIONS)
+    assert proposal.topic == "Ancient star maps and navigation"
+    assert [t for t, _ in proposal.ranking][-1] == TOPICS[0]
+    assert "wonder" not in proposal.emotions and "dread" not in proposal.emotions
+
+
+def test_recent_stories_weigh_more_than_old_ones():
+    scheduler = TopicScheduler(history(
+        ("Deep sea bioluminescent creatures", []),
+        ("AI consciousness and machine sentience", []),
+    ))
+    penalties = dict(scheduler.topic_penalties(TOPICS[:2]))
+    assert penalties[TOPICS[1]] > penalties[TOPICS[0]] > 0
+
+
+def test_empty_history_is_deterministic():
+    proposal = TopicScheduler([], emotions_per_story=2).propose(TOPICS, EMOTIONS)
+    assert proposal.topic == TOPICS[0] and proposal.emotions == EMOTIONS[:2]
+    assert TopicScheduler([]).propose([], []).topic == DEFAULT_TOPIC
+
+
+def test_requested_topic_still_gets_fresh_emotions():
+    scheduler = TopicScheduler(history(("Deep sea bioluminescent creatures", ["wonder", "melancholy"])))
+    proposal = scheduler.propose(TOPICS, EMOTIONS, topic="Deep sea lights")
+    assert proposal.topic == "Deep sea lights"
+    assert proposal.emotions == ["curiosity", "dread"]
+
+
+def test_plan_rotates_without_touching_history():
+    scheduler = TopicScheduler([])
+    plan = scheduler.plan(TOPICS, EMOTIONS, 4)
+    assert [p.topic for p in plan[:3]] == TOPICS
+    assert plan[0].emotions != plan[1].emotions
+    assert scheduler.history == []
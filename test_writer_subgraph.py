@@ -0,0 +1,48 @@
+"""Tests for streaming the writer sub-graph (fake models, stories in a temp dir)"""
+import pytest
+
+pytest.importorskip("deepagents")
+from langgraph.graph import END, StateGraph
+
+import config
+from pipeline import PipelineState, write_story
+from sub_agents import stream_story
+
+
+def text_of(events, stage):
+    return "".join(e["text"] for e in events if e["type"] == "delta" and e["stage"] == stage)
+
+
+def test_refine_retries_are_marked_in_the_stream(fake_writer):
+    events = list(stream_story("rain", timestamp="2026-01-01_10-00-00"))
+
+    assert text_of(events, "draft") == "The first draft."
+    refine = [e for e in events if e.get("stage") == "refine" and e["type"] in ("delta", "attempt")]
+    marker = next(i for i, e in enumerate(refine) if e["type"] == "attempt")
+    assert refine[marker]["attempt"] == 2 and "Add about" in refine[marker]["instruction"]
+    assert text_of(refine[:marker], "refine") == "Too short."
+    assert text_of(refine[marker:], "refine") == fake_writer[-1]
+
+    done = events[-1]
+    assert done["type"] == "done" and done["story"] == fake_writer[-1]
+    assert done["filename"] == f"{config.STORIES_DIR}/2026-01-01_10-00-00_rain.txt"
+    assert len(done["length_attempts"]) == 2
+
+
+def test_pipeline_write_node_forwards_story_tokens(fake_writer):
+    graph = StateGraph(PipelineState)
+    graph.add_node("write", write_story)
+    graph.set_entry_point("write")
+    graph.add_edge("write", END)
+
+    custom, state = [], {}
+    for mode, payload in graph.compile().stream({"topic": "rain"}, stream_mode=["custom", "updates"]):
+        if mode == "custom":
+            custom.append(payload)
+        else:
+            state.update(payload["write"])
+
+    assert {e["type"] for e in custom} == {"delta", "attempt"}
+    assert text_of(custom, "draft") == "The first draft."
+    assert state["story"] == fake_writer[-1] and state["filename"].endswith("_rain.txt")
+    assert "Saved to" in state["generation_log"]
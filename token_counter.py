@@ -0,0 +1,163 @@
+"""Token Counter - Local token counts and length-controlled rewriting
+
+The writer used to estimate story length as int(words * 0.75), which is
+inverted (English prose runs at roughly 0.75 words per token, so tokens are
+about words / 0.75), and asked the refine LLM to hit "exactly 500 tokens"
+without ever checking. Stories came back anywhere from 300 to 800 tokens.
+
+- count_tokens() uses the model's tiktoken BPE, loaded once per process
+  (tiktoken ships with langchain-openai). If it is unavailable, or its
+  encoding file cannot be fetched, a regex approximation of the same
+  pre-tokenization is used instead
+- fit_to_length() measures a text locally and only calls the rewrite
+  function again, with a targeted trim/expand instruction, while the text
+  is outside target ± tolerance; every attempt is recorded
+"""
+import math
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+
+# ============================================================================
+# TOKENIZER
+# ============================================================================
+
+# GPT-style pre-tokenization: contractions, words, numbers, punctuation runs
+_PIECE_PATTERN = re.compile(r"'(?:s|t|re|ve|m|ll|d)|\s?[^\W\d_]+|\s?\d{1,3}|\s?[^\s\w]+|\s+")
+_CHARS_PER_PIECE_TOKEN = 9  # only long/rare words split into several BPE tokens
+
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+
+def _load_encoding(model: str):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        pass  # unknown model name: use the newest encoding
+    except Exception:
+        return None  # encoding file not cached and no network
+    try:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+
+def get_encoding():
+    """The tiktoken encoding for config.MODEL_NAME (None if unavailable), loaded once"""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        with _encoding_lock:
+            if not _encoding_loaded:
+                from config import MODEL_NAME
+
+                _encoding = _load_encoding(MODEL_NAME)
+                _encoding_loaded = True
+    return _encoding
+
+
+def approximate_tokens(text: str) -> int:
+    """Token count without a BPE vocabulary (~1.33 tokens per word on English prose)"""
+    count = 0
+    for piece in _PIECE_PATTERN.findall(text):
+        stripped = piece.strip()
+        if not stripped:
+            count += 1 if "\n" in piece else 0
+        else:
+            count += max(1, math.ceil(len(stripped) / _CHARS_PER_PIECE_TOKEN))
+    return count
+
+
+def count_tokens(text: str) -> int:
+    """Number of tokens the configured model sees for text"""
+    if not text:
+        return 0
+    encoding = get_encoding()
+    if encoding is None:
+        return approximate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+# ============================================================================
+# LENGTH CONTROL
+# ============================================================================
+
+@dataclass
+class LengthResult:
+    """Outcome of fit_to_length: the text closest to target and every attempt's count"""
+    text: str
+    tokens: int
+    target: int
+    tolerance: int
+    attempts: List[int] = field(default_factory=list)
+
+    @property
+    def within_tolerance(self) -> bool:
+        return abs(self.tokens - self.target) <= self.tolerance
+
+    def summary(self) -> str:
+        """e.g. '503 tokens (target 500±20) after 2 attempts: 612 → 503'"""
+        trail = " → ".join(str(n) for n in self.attempts)
+        plural = "attempt" if len(self.attempts) == 1 else "attempts"
+        mark = "" if self.within_tolerance else ", outside tolerance"
+        return (f"{self.tokens} tokens (target {self.target}±{self.tolerance}{mark}) "
+                f"after {len(self.attempts)} {plural}: {trail}")
+
+
+def length_instruction(tokens: int, target: int) -> str:
+    """Targeted trim/expand instruction for a text of `tokens` tokens"""
+    delta = abs(tokens - target)
+    if tokens > target:
+        return (f"The story is {tokens} tokens; it must be {target}. Cut about {delta} tokens: "
+                "tighten sentences and drop redundant description, keeping the plot, "
+                "the ending and the paragraph breaks.")
+    return (f"The story is {tokens} tokens; it must be {target}. Add about {delta} tokens: "
+            "deepen a key moment with concrete sensory detail, keeping the plot, "
+            "the ending and the paragraph breaks.")
+
+
+def fit_to_length(
+    text: str,
+    rewrite: Callable[[str, str], str],
+    target: int,
+    tolerance: int,
+    max_attempts: int = 3,
+    count: Optional[Callable[[str], int]] = None,
+) -> LengthResult:
+    """Re-invoke rewrite(text, instruction) until text is within target ± tolerance
+
+    The initial text counts as the first attempt. Returns the closest text
+    seen once it is in range or max_attempts are used up; a rewrite that
+    comes back empty ends the loop.
+    """
+    count = count or count_tokens
+    tokens = count(text)
+    best = LengthResult(text, tokens, target, tolerance, [tokens])
+
+    while not best.within_tolerance and len(best.attempts) < max_attempts:
+        candidate = rewrite(text, length_instruction(tokens, target))
+        if not candidate or not candidate.strip():
+            break
+        text, tokens = candidate, count(candidate)
+        best.attempts.append(tokens)
+        if abs(tokens - target) < abs(best.tokens - target):
+            best.text, best.tokens = text, tokens
+
+    return best
+
+
+__all__ = [
+    "LengthResult",
+    "approximate_tokens",
+    "count_tokens",
+    "fit_to_length",
+    "get_encoding",
+    "length_instruction",
+]
@@ -1,15 +1,44 @@
+import contextvars
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import List, Literal
+from urllib.parse import urlsplit, urlunsplit
 
 from tavily import TavilyClient
 
-from config import DEFAULT_SEARCH_MAX_RESULTS, MAX_SEARCHES
+from config import DEFAULT_SEARCH_MAX_RESULTS
+from run_budget import get_run_budget, start_run
+from search_cache import get_search_cache
 
-search_counter = 0
 tavily_client = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
 
 
+def _search(query: str, max_results: int, topic: str, include_raw_content: bool) -> dict:
+    """One Tavily search, through the disk cache when enabled"""
+    cache = get_search_cache()
+    if cache is not None:
+        return cache.fetch(tavily_client, query, max_results, topic, include_raw_content)
+    return tavily_client.search(
+        query=query,
+        max_results=max_results,
+        topic=topic,
+        include_raw_content=include_raw_content,
+    )
+
+
+def _format_result(item: dict) -> str:
+    title = item.get("title", "Untitled")
+    url = item.get("url", "")
+    summary = item.get("content", "")[:400]
+    return f"- {title} :: {url}\n  {summary}"
+
+
+def _normalize_url(url: str) -> str:
+    parts = urlsplit(url.strip())
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), parts.query, ""))
+
+
 def internet_search(
     query: str,
     max_results: int = DEFAULT_SEARCH_MAX_RESULTS,
@@ -17,26 +46,75 @@ def internet_search(
     include_raw_content: bool = False,
 ) -> str:
     """Run a web search"""
-    global search_counter
-    if search_counter >= MAX_SEARCHES:
-        return f"Search limit reached ({MAX_SEARCHES}). Summarize with current context."
+    budget = get_run_budget()
+    if not budget.acquire_searches(1):
+        return "Search limit reached. Summarize with current context."
 
-    search_counter += 1
-    result = tavily_client.search(
-        query=query,
-        max_results=max_results,
-        topic=topic,
-        include_raw_content=include_raw_content,
-    )
+    result = _search(query, max_results, topic, include_raw_content)
 
-    summaries: List[str] = []
-    for item in result.get("results", []):
-        title = item.get("title", "Untitled")
-        url = item.get("url", "")
-        summary = item.get("content", "")[:400]
-        summaries.append(f"- {title} :: {url}\n  {summary}")
+    summaries = [_format_result(item) for item in result.get("results", [])]
+    return "Search results:\n" + "\n".join(summaries) + f"\n(Budget: {budget.describe()})"
 
-    return "Search results:\n" + "\n".join(summaries)
+
+# Searches from internet_search_many run side by side on this pool
+_search_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="search")
+
+
+def internet_search_many(
+    queries: List[str],
+    max_results: int = DEFAULT_SEARCH_MAX_RESULTS,
+    topic: Literal["general", "news", "finance"] = "general",
+) -> str:
+    """Run several web searches at once and return one merged, de-duplicated digest"""
+    queries = list(dict.fromkeys(q.strip() for q in queries if q and q.strip()))
+    if not queries:
+        return "No queries given."
+    budget = get_run_budget()
+    granted = budget.acquire_searches(len(queries))
+    if not granted:
+        return "Search limit reached. Summarize with current context."
+
+    skipped = queries[granted:]
+    queries = queries[:granted]
+
+    futures = [
+        _search_executor.submit(
+            contextvars.copy_context().run, _search, query, max_results, topic, False
+        )
+        for query in queries
+    ]
+
+    # Merge by URL: keep the best-scoring copy, remember every query that found it
+    merged: dict = {}
+    failed = []
+    for index, (query, future) in enumerate(zip(queries, futures), start=1):
+        try:
+            result = future.result()
+        except Exception as e:
+            failed.append(f"{query} ({e})")
+            continue
+        for item in result.get("results", []):
+            key = _normalize_url(item.get("url", "")) or item.get("title", "")
+            entry = merged.get(key)
+            if entry is None:
+                merged[key] = {"item": item, "queries": [index]}
+            else:
+                entry["queries"].append(index)
+                if item.get("score", 0) > entry["item"].get("score", 0):
+                    entry["item"] = item
+
+    ranked = sorted(merged.values(), key=lambda e: (-len(e["queries"]), -e["item"].get("score", 0)))
+    lines = [f"Search results for {len(queries)} queries ({len(ranked)} unique sources):"]
+    lines += [f"  [{i}] {query}" for i, query in enumerate(queries, start=1)]
+    for entry in ranked:
+        tags = ",".join(str(i) for i in entry["queries"])
+        lines.append(f"{_format_result(entry['item'])}\n  (found by queries {tags})")
+    if failed:
+        lines.append("Failed searches: " + "; ".join(failed))
+    if skipped:
+        lines.append("Search limit reached; not run: " + "; ".join(skipped))
+    lines.append(f"(Budget: {budget.describe()})")
+    return "\n".join(lines)
 
 
 def read_text_file(path: str) -> str:
@@ -63,9 +141,23 @@ def write_text_file(path: str, content: str, mode: str = "w") -> str:
     if mode not in {"w", "a"}:
         return "Mode must be 'w' or 'a'."
 
-    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
-    with open(path, mode, encoding="utf-8") as f:
-        f.write(content)
+    from identity_store import atomic_write, file_lock, get_identity_store, is_identity_file, locked_append
+    
+    # Atomic writes: concurrent runs never see a truncated file. Only the shared
+    # identity files need the lock; story files are written once under a fresh name
+    if not is_identity_file(path):
+        if mode == "w":
+            atomic_write(path, content)
+        else:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(content)
+    elif mode == "w":
+        with file_lock(path):
+            atomic_write(path, content)
+    else:
+        locked_append(path, content)
+    get_identity_store().invalidate(path)
     return f"Wrote {len(content)} chars to {path}"
 
 
@@ -95,15 +187,110 @@ def list_files(directory: str = ".") -> str:
         return f"Error listing directory: {str(e)}"
 
 
+def list_stories(topic: str = "", limit: int = 20, cursor: str = "") -> str:
+    """
+    List saved stories, newest first, from the story catalog (no file reads).
+    
+    Args:
+        topic: Only stories on this topic (optional)
+        limit: Stories per page
+        cursor: next_cursor from the previous page (optional)
+    
+    Returns:
+        One line per story (timestamp, topic, tokens, file) and the next cursor
+    """
+    from story_catalog import get_story_catalog
+    
+    catalog = get_story_catalog()
+    page = catalog.list_stories(limit=limit, cursor=cursor or None, topic=topic or None)
+    if not page.stories:
+        return "No stories found."
+    
+    lines = [f"Stories ({catalog.count(topic=topic or None)} total):"]
+    for story in page.stories:
+        lines.append(f"- {story.timestamp} | {story.topic} | {story.tokens} tokens | {story.filename}")
+    if page.next_cursor:
+        lines.append(f"Next page: cursor='{page.next_cursor}'")
+    return "\n".join(lines)
+
+
+def search_stories(query: str, limit: int = 5, kind: str = "all") -> str:
+    """
+    Full-text search over past stories and memories.
+    
+    Args:
+        query: Words to look for (all must match; any word if nothing matches all)
+        limit: Maximum number of results
+        kind: "stories", "memories" or "all"
+    
+    Returns:
+        Ranked results with highlighted snippets
+    """
+    from story_search import search_archive
+    
+    hits = search_archive(query, limit=limit, kind=kind)
+    if not hits:
+        return f"No stories or memories match '{query}'."
+    
+    lines = [f"Results for '{query}':"]
+    for hit in hits:
+        source = hit.ref if hit.kind == "story" else "memory"
+        lines.append(f"- [{hit.title}] {hit.snippet} ({source})")
+    return "\n".join(lines)
+
+
+def next_topic() -> str:
+    """
+    Propose the next topic and emotions from the story history.
+    
+    Topics and emotions that were written about often or recently are
+    penalized, so the proposal is the least saturated combination.
+    
+    Returns:
+        The proposed topic and emotions, with the penalty behind the choice
+    """
+    from topic_scheduler import propose_next
+    
+    return propose_next().summary()
+
+
+def load_identity(memory_query: str = "", top_k_memories: int = 5) -> str:
+    """
+    Load personality, emotions, topics and relevant memories in one call.
+    
+    Reads from an in-memory cache that is refreshed only when a file changes.
+    
+    Args:
+        memory_query: Theme to rank memories against (most recent if empty)
+        top_k_memories: How many memories to include (0 to skip)
+    
+    Returns:
+        All identity sections as one text block
+    """
+    from identity_store import get_identity_store
+    from memory_index import search_memories
+    
+    store = get_identity_store()
+    sections = []
+    for title, name in [("Personality", "personality"), ("Emotions", "emotions"), ("Topics", "topics")]:
+        lines = store.read_lines(name)
+        sections.append(f"## {title} ({len(lines)})\n" + "\n".join(lines))
+    
+    if top_k_memories > 0:
+        memories = search_memories(memory_query, top_k_memories)
+        sections.append(f"## Memories ({len(memories)})\n" + "\n".join(memories))
+    
+    return "\n\n".join(sections)
+
+
 def get_timestamp() -> str:
     """Get current timestamp in YYYY-MM-DD_HH-MM-SS format."""
     return datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
 
 
-def reset_tool_counters() -> None:
-    """Reset per-run counters (e.g., search limits)."""
-    global search_counter
-    search_counter = 0
+def reset_tool_counters():
+    """Start a fresh per-run budget (searches, LLM calls, tokens) in the current context."""
+    return start_run()
 
 
 def use_skill(skill_name: str) -> str:
@@ -198,6 +385,10 @@ tools = [
     read_text_file,
     write_text_file,
     list_files,
+    list_stories,
+    search_stories,
+    next_topic,
     get_timestamp,
+    load_identity,
 ]
 
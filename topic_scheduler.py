@@ -0,0 +1,156 @@
+"""Topic Scheduler - Pick the next topic and emotions from the story history
+
+Topic choice used to be left to the orchestrator LLM reading topics.txt,
+and in practice it picked "AI consciousness" over and over, paying a
+research cycle for a saturated topic each time. The scheduler decides
+locally and deterministically from the story catalog:
+
+- every past story penalizes each candidate topic in proportion to their
+  topic similarity (same measure as the research cache; weak matches
+  below `similarity_floor` are ignored)
+- a story's penalty has a frequency part (every story counts) and a
+  recency part that halves every `half_life` stories
+- emotions are penalized the same way, split across the emotions a story
+  was given, plus a pair term for emotions already used on similar topics
+- the lowest penalty wins; ties go to the earlier entry of the identity
+  list, so the same history always gives the same proposal
+"""
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+
+from research_cache import normalize_topic, topic_similarity
+from story_catalog import StoryRecord
+
+
+DEFAULT_TOPIC = "The inner life of machines"
+
+
+@dataclass
+class TopicProposal:
+    """Next topic and emotions, with the penalties behind the choice"""
+    topic: str
+    emotions: List[str]
+    topic_penalty: float
+    ranking: List[Tuple[str, float]] = field(default_factory=list)
+
+    def summary(self) -> str:
+        runner_up = next((f"{t} ({p:.2f})" for t, p in self.ranking if t != self.topic), "none")
+        return (f"Topic: {self.topic} (penalty {self.topic_penalty:.2f}, next best: {runner_up})\n"
+                f"Emotions: {', '.join(self.emotions) or '(none)'}")
+
+
+class TopicScheduler:
+    """Recency/frequency penalties over a newest-first story history"""
+
+    def __init__(
+        self,
+        history: Sequence[StoryRecord],
+        half_life: float = 5.0,
+        recency_weight: float = 3.0,
+        frequency_weight: float = 1.0,
+        emotions_per_story: int = 2,
+        similarity_floor: float = 0.2,
+    ):
+        self.history = list(history)
+        self.half_life = half_life
+        self.recency_weight = recency_weight
+        self.frequency_weight = frequency_weight
+        self.emotions_per_story = emotions_per_story
+        self.similarity_floor = similarity_floor
+
+    def _weight(self, age: int) -> float:
+        """Penalty of a story `age` stories ago (0 = the latest)"""
+        return self.frequency_weight + self.recency_weight * 0.5 ** (age / self.half_life)
+
+    def _similarity(self, a: str, b: str) -> float:
+        similarity = topic_similarity(normalize_topic(a), normalize_topic(b))
+        return similarity if similarity >= self.similarity_floor else 0.0
+
+    # -- penalties -----------------------------------------------------------
+
+    def topic_penalties(self, topics: Sequence[str]) -> List[Tuple[str, float]]:
+        """(topic, penalty) from least to most written-about, ties in list order"""
+        scored = []
+        for topic in topics:
+            penalty = sum(
+                self._similarity(topic, story.topic) * self._weight(age)
+                for age, story in enumerate(self.history)
+            )
+            scored.append((topic, penalty))
+        return sorted(scored, key=lambda item: item[1])
+
+    def emotion_penalties(self, emotions: Sequence[str], topic: str = "") -> List[Tuple[str, float]]:
+        """(emotion, penalty) from least to most used, counting use on similar topics double"""
+        scored = []
+        for emotion in emotions:
+            key = emotion.strip().lower()
+            penalty = 0.0
+            for age, story in enumerate(self.history):
+                used = [e.strip().lower() for e in story.emotions]
+                if key not in used:
+                    continue
+                share = self._weight(age) / len(used)
+                pair = self._similarity(topic, story.topic) if topic else 0.0
+                penalty += share * (1.0 + pair)
+            scored.append((emotion, penalty))
+        return sorted(scored, key=lambda item: item[1])
+
+    # -- proposals -----------------------------------------------------------
+
+    def propose(self, topics: Sequence[str], emotions: Sequence[str], topic: Optional[str] = None) -> TopicProposal:
+        """Least saturated topic (or the given one) with its least used emotions"""
+        ranking = self.topic_penalties(topics) if topics else [(DEFAULT_TOPIC, 0.0)]
+        if topic:
+            penalty = dict(ranking).get(topic)
+            if penalty is None:
+                penalty = self.topic_penalties([topic])[0][1]
+        else:
+            topic, penalty = ranking[0]
+        chosen = [e for e, _ in self.emotion_penalties(emotions, topic)[:self.emotions_per_story]]
+        return TopicProposal(topic, chosen, penalty, ranking)
+
+    def plan(self, topics: Sequence[str], emotions: Sequence[str], count: int) -> List[TopicProposal]:
+        """`count` proposals in a row, each one assuming the previous ones were written"""
+        proposals = []
+        history = self.history
+        try:
+            for _ in range(count):
+                proposal = self.propose(topics, emotions)
+                proposals.append(proposal)
+                self.history = [StoryRecord(0, "", "", proposal.topic, proposal.emotions)] + self.history
+        finally:
+            self.history = history
+        return proposals
+
+
+def _scheduler() -> TopicScheduler:
+    from config import SCHEDULER_HALF_LIFE, SCHEDULER_EMOTIONS, SCHEDULER_HISTORY
+    from story_catalog import get_story_catalog
+
+    history = get_story_catalog().list_stories(limit=SCHEDULER_HISTORY).stories
+    return TopicScheduler(history, half_life=SCHEDULER_HALF_LIFE, emotions_per_story=SCHEDULER_EMOTIONS)
+
+
+def propose_next(topic: Optional[str] = None) -> TopicProposal:
+    """Next topic and emotions from the identity lists and the story catalog"""
+    from identity_store import get_identity_store
+
+    store = get_identity_store()
+    return _scheduler().propose(store.read_lines("topics"), store.read_lines("emotions"), topic)
+
+
+def plan_topics(count: int) -> List[TopicProposal]:
+    """Proposals for `count` stories written back to back (e.g. a batch)"""
+    from identity_store import get_identity_store
+
+    store = get_identity_store()
+    return _scheduler().plan(store.read_lines("topics"), store.read_lines("emotions"), count)
+
+
+__all__ = [
+    "DEFAULT_TOPIC",
+    "TopicProposal",
+    "TopicScheduler",
+    "plan_topics",
+    "propose_next",
+]